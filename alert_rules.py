@@ -0,0 +1,303 @@
+"""
+Alert rules evaluated against every new squeeze/flow snapshot
+Rules are indexed by (field, ticker) in threshold-sorted lists, and the engine remembers the
+last value of every (ticker, field). A snapshot only touches the fields whose value changed,
+and for those a bisect over the sorted thresholds finds exactly the rules that fire, so
+thousands of rules over thousands of tickers cost little more than the changed fields.
+
+Operators:
+    above / below                  level: fires whenever a changed value is beyond the threshold
+    crosses_above / crosses_below  edge: fires only when the value moves across the threshold
+    becomes                        squeeze_type changed to the given label
+
+Alerts from one snapshot are delivered to every sink as one batch, on a background thread,
+so slow sinks never hold up a scan. Configured from the environment:
+    ALERT_RULES_PATH   JSON list of rules loaded at startup (default: alert_rules.json)
+    ALERT_LOG_PATH     append alerts as JSON lines to this file
+    ALERT_WEBHOOK_URL  POST each batch as JSON to this URL
+    ALERT_ADMIN_TOKEN  token (X-Alert-Token header) for adding/removing rules over the API;
+                       unset leaves the API read-only and rules come from ALERT_RULES_PATH
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+import itertools
+import json
+import os
+import queue
+import threading
+import urllib.request
+
+DEFAULT_RULES_PATH = 'alert_rules.json'
+NUMERIC_FIELDS = ['squeeze_score', 'short_interest', 'utilization', 'cost_to_borrow', 'days_to_cover', 'delta_flow']
+LABEL_FIELDS = ['squeeze_type']
+OPERATORS = ['above', 'below', 'crosses_above', 'crosses_below', 'becomes']
+MAX_RECENT = 500  # alerts kept in memory for /api/alerts
+
+
+def squeeze_values(row):
+    """Alertable fields of a scored squeeze row (see handle_squeeze_scan)"""
+    ortex = row.get('ortex_data') or {}
+    return {
+        'squeeze_score': row.get('squeeze_score'),
+        'squeeze_type': row.get('squeeze_type'),
+        'short_interest': ortex.get('short_interest'),
+        'utilization': ortex.get('utilization'),
+        'cost_to_borrow': ortex.get('cost_to_borrow'),
+        'days_to_cover': ortex.get('days_to_cover'),
+    }
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value == value else None
+
+
+class Rule:
+    def __init__(self, field, op, value, ticker=None, name=None, rule_id=None):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator '{op}'. Available: {', '.join(OPERATORS)}")
+        if op == 'becomes':
+            if field not in LABEL_FIELDS:
+                raise ValueError(f"'becomes' applies to {', '.join(LABEL_FIELDS)}")
+            value = str(value)
+        else:
+            if field not in NUMERIC_FIELDS:
+                raise ValueError(f"Unknown field '{field}'. Available: {', '.join(NUMERIC_FIELDS)}")
+            value = _number(value)
+            if value is None:
+                raise ValueError(f"Rule on '{field}' needs a numeric value")
+        self.id = rule_id
+        self.field = field
+        self.op = op
+        self.value = value
+        self.ticker = ticker.upper() if ticker else None
+        self.name = name or f"{self.ticker or 'any'} {field} {op.replace('_', ' ')} {value}"
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('field'), data.get('op'), data.get('value'), data.get('ticker'), data.get('name'), data.get('id'))
+
+    def to_dict(self):
+        return {'id': self.id, 'name': self.name, 'ticker': self.ticker, 'field': self.field, 'op': self.op, 'value': self.value}
+
+
+class ThresholdIndex:
+    """Rules of one (field, ticker, operator) sorted by threshold"""
+
+    def __init__(self):
+        self.thresholds = []
+        self.rules = []
+
+    def add(self, rule):
+        i = bisect_right(self.thresholds, rule.value)
+        self.thresholds.insert(i, rule.value)
+        self.rules.insert(i, rule)
+
+    def remove(self, rule):
+        i = self.rules.index(rule)
+        del self.thresholds[i]
+        del self.rules[i]
+
+    def below(self, value):
+        """Rules with threshold < value"""
+        return self.rules[:bisect_left(self.thresholds, value)]
+
+    def above(self, value):
+        """Rules with threshold > value"""
+        return self.rules[bisect_right(self.thresholds, value):]
+
+    def between(self, low, high):
+        """Rules with low < threshold <= high"""
+        return self.rules[bisect_right(self.thresholds, low):bisect_right(self.thresholds, high)]
+
+
+class AlertEngine:
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+        self.rules = {}  # id -> Rule
+        self._numeric = {}  # (field, ticker or None, op) -> ThresholdIndex
+        self._labels = {}  # (field, ticker or None) -> label -> [rules]
+        self._last = {}  # (ticker, field) -> last value seen
+        self._ids = itertools.count(1)
+        self.recent = []
+        self._lock = threading.Lock()
+        self._outbox = queue.Queue()
+        self._sender = None
+
+    # Rules
+
+    def add_rule(self, rule):
+        with self._lock:
+            if rule.id is None or rule.id in self.rules:
+                rule.id = str(next(self._ids))
+                while rule.id in self.rules:
+                    rule.id = str(next(self._ids))
+            self.rules[rule.id] = rule
+            if rule.op == 'becomes':
+                self._labels.setdefault((rule.field, rule.ticker), {}).setdefault(rule.value, []).append(rule)
+            else:
+                self._numeric.setdefault((rule.field, rule.ticker, rule.op), ThresholdIndex()).add(rule)
+        return rule
+
+    def remove_rule(self, rule_id):
+        with self._lock:
+            rule = self.rules.pop(rule_id, None)
+            if rule is None:
+                return False
+            if rule.op == 'becomes':
+                self._labels[(rule.field, rule.ticker)][rule.value].remove(rule)
+            else:
+                self._numeric[(rule.field, rule.ticker, rule.op)].remove(rule)
+            return True
+
+    def load_rules(self, path):
+        """Add rules from a JSON list; a missing file is no rules"""
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path) as f:
+            for data in json.load(f):
+                self.add_rule(Rule.from_dict(data))
+        return len(self.rules)
+
+    # Evaluation
+
+    def _matches(self, ticker, field, old, new):
+        """Rules fired by (ticker, field) changing from old to new"""
+        fired = []
+        for scope in (ticker, None):
+            if field in LABEL_FIELDS:
+                if new is not None:
+                    fired += self._labels.get((field, scope), {}).get(new, ())
+                continue
+
+            index = self._numeric.get((field, scope, 'above'))
+            if index:
+                fired += index.below(new)
+            index = self._numeric.get((field, scope, 'below'))
+            if index:
+                fired += index.above(new)
+            if old is None:
+                continue
+            index = self._numeric.get((field, scope, 'crosses_above'))
+            if index and new > old:
+                fired += index.between(old, new)
+            index = self._numeric.get((field, scope, 'crosses_below'))
+            if index and new < old:
+                # old >= threshold > new
+                fired += index.between(new, old)
+        return fired
+
+    def observe(self, ticker, values, timestamp=None):
+        """Evaluate one ticker's new field values; returns the alerts (also queued for the sinks)"""
+        return self.evaluate({ticker: values}, timestamp)
+
+    def evaluate(self, snapshot, timestamp=None):
+        """
+        Evaluate {ticker: {field: value}} against the rules. Only fields whose value changed
+        since the last snapshot are looked up. The batch of alerts goes to the sinks.
+        """
+        timestamp = timestamp or datetime.now().isoformat()
+        alerts = []
+        with self._lock:
+            for ticker, values in snapshot.items():
+                ticker = str(ticker).upper()
+                for field, new in values.items():
+                    new = new if field in LABEL_FIELDS else _number(new)
+                    if new is None:
+                        continue
+                    old = self._last.get((ticker, field))
+                    if old == new:
+                        continue
+                    self._last[(ticker, field)] = new
+                    for rule in self._matches(ticker, field, old, new):
+                        alerts.append({
+                            'rule_id': rule.id, 'rule': rule.name, 'ticker': ticker, 'field': field,
+                            'op': rule.op, 'threshold': rule.value, 'previous': old, 'value': new,
+                            'timestamp': timestamp,
+                        })
+            if alerts:
+                self.recent = (self.recent + alerts)[-MAX_RECENT:]
+        if alerts and self.sinks:
+            self._send(alerts)
+        return alerts
+
+    # Delivery
+
+    def _send(self, batch):
+        if self._sender is None:
+            self._sender = threading.Thread(target=self._deliver, name="alert-sinks", daemon=True)
+            self._sender.start()
+        self._outbox.put(batch)
+
+    def _deliver(self):
+        while True:
+            batch = self._outbox.get()
+            for sink in self.sinks:
+                try:
+                    sink.send(batch)
+                except Exception as e:
+                    print(f"Alert sink error ({type(sink).__name__}): {e}")
+            self._outbox.task_done()
+
+    def flush(self):
+        """Wait until every queued batch has been delivered"""
+        self._outbox.join()
+
+
+class FileSink:
+    """Appends each alert as a JSON line"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, batch):
+        lines = ''.join(json.dumps(alert) + '\n' for alert in batch)
+        with self._lock, open(self.path, 'a') as f:
+            f.write(lines)
+
+
+class WebhookSink:
+    """POSTs each batch as {"alerts": [...]} (a local HTTP listener stands in for a real webhook)"""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, batch):
+        request = urllib.request.Request(
+            self.url, data=json.dumps({'alerts': batch}).encode(),
+            headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def sinks_from_env():
+    sinks = []
+    if os.environ.get('ALERT_LOG_PATH'):
+        sinks.append(FileSink(os.environ['ALERT_LOG_PATH']))
+    if os.environ.get('ALERT_WEBHOOK_URL'):
+        sinks.append(WebhookSink(os.environ['ALERT_WEBHOOK_URL']))
+    return sinks
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_alert_engine():
+    """Process-wide engine with the configured rules and sinks"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AlertEngine(sinks_from_env())
+            try:
+                _engine.load_rules(os.environ.get('ALERT_RULES_PATH', DEFAULT_RULES_PATH))
+            except (OSError, ValueError) as e:
+                print(f"Alert rules not loaded: {e}")
+        return _engine
@@ -1,21 +1,114 @@
 from http.server import BaseHTTPRequestHandler
+import hmac
 import json
+import os
+import threading
+import time
+import urllib.error
 import urllib.parse
 import urllib.request
 from datetime import datetime
 
+from alert_rules import Rule, get_alert_engine, squeeze_values
+from provider_router import ProviderRouter, ProviderError
+from replay import OFF, layer_from_env
+from shared_cache import cache_key, get_shared_cache
+from symbol_master import get_symbol_master
+from squeeze_scoring import squeeze_score, squeeze_type
+from api.squeeze_query import SnapshotStore, SqueezeSnapshot, parse_query
+
+# Provider health survives across requests served by the same warm instance
+PROVIDER_ROUTER = ProviderRouter()
+
+# Latest scored row per ticker, indexed for /api/squeeze/query screens
+SQUEEZE_SNAPSHOTS = SnapshotStore()
+
+# Upstream record/replay (SCAN_REPLAY_MODE etc., see replay.py)
+REPLAY = layer_from_env()
+
+YAHOO_HOSTS = ['query1.finance.yahoo.com', 'query2.finance.yahoo.com']
+
+# How long upstream data is shared between workers on the node (seconds)
+ORTEX_TTL = 900
+PRICE_TTL = 30
+
+_scan_service = None
+_scan_service_lock = threading.Lock()
+
+
+def get_scan_service():
+    """Options scan service (pandas + scanner pools), created on the first /api/scan request"""
+    global _scan_service
+    with _scan_service_lock:
+        if _scan_service is None:
+            from api.scan_service import ScanService
+            _scan_service = ScanService()
+        return _scan_service
+
+
+def shared_fetch(key, fetch, ttl):
+    """fetch() shared with the node's other workers via the shared cache; replays bypass it"""
+    if REPLAY.mode != OFF:
+        return fetch()
+    return get_shared_cache().get_or_fetch(key, fetch, ttl=ttl)
+
+
+def fetch_json(provider, url, headers, timeout=10):
+    """GET a JSON document (recorded/replayed by REPLAY), reporting rate-limit headers to the router"""
+    return REPLAY.call(('http', provider, url), lambda: _fetch_json(provider, url, headers, timeout))
+
+
+def _fetch_json(provider, url, headers, timeout):
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            remaining = response.headers.get('X-RateLimit-Remaining')
+            if remaining is not None:
+                PROVIDER_ROUTER.update_quota(
+                    provider, remaining=remaining, reset_at=response.headers.get('X-RateLimit-Reset')
+                )
+            if response.status != 200:
+                raise IOError(f"HTTP {response.status}")
+            return json.loads(response.read().decode())
+    except urllib.error.HTTPError as e:
+        if e.code == 429:
+            PROVIDER_ROUTER.update_quota(provider, retry_after=e.headers.get('Retry-After') or 60)
+        raise
+
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/':
             self.send_html()
+        elif self.path.startswith('/api/symbols'):
+            self.send_symbol_search()
+        elif self.path == '/api/providers':
+            self.send_provider_stats()
         elif self.path == '/api/health':
             self.send_health()
+        elif self.path.startswith('/api/alerts'):
+            self.send_alerts()
+        else:
+            self.send_404()
+    
+    def do_DELETE(self):
+        if self.path.startswith('/api/alerts/rules/'):
+            if not self.alert_admin_authorized():
+                return
+            rule_id = self.path.rsplit('/', 1)[1]
+            removed = get_alert_engine().remove_rule(rule_id)
+            self.send_json(200 if removed else 404, {'success': removed, 'id': rule_id})
         else:
             self.send_404()
     
     def do_POST(self):
         if self.path == '/api/squeeze/scan':
             self.handle_squeeze_scan()
+        elif self.path == '/api/squeeze/query':
+            self.handle_squeeze_query()
+        elif self.path == '/api/scan':
+            self.handle_options_scan()
+        elif self.path == '/api/alerts/rules':
+            self.handle_add_alert_rules()
         else:
             self.send_404()
     
@@ -398,7 +491,8 @@ class handler(BaseHTTPRequestHandler):
             'status': 'healthy',
             'message': 'Ultimate Squeeze Scanner API with Live Ortex + Yahoo Finance Integration!',
             'timestamp': datetime.now().isoformat(),
-            'version': '2.0.0-live-api'
+            'version': '2.0.0-live-api',
+            'replay_mode': REPLAY.mode
         }
         
         self.send_response(200)
@@ -406,12 +500,77 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(json.dumps(response).encode())
     
+    def send_symbol_search(self):
+        """Ticker autocomplete: GET /api/symbols?q=AA&limit=10"""
+        params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        query = params.get('q', [''])[0]
+        try:
+            limit = max(1, min(int(params.get('limit', [10])[0]), 50))
+        except ValueError:
+            limit = 10
+        
+        master = get_symbol_master()
+        self.send_json(200, {
+            'query': query,
+            'results': [{'symbol': symbol, 'name': name} for symbol, name in master.search(query, limit)],
+            'symbol_count': len(master)
+        })
+    
+    def send_alerts(self):
+        """Alert rules and the most recent alerts: GET /api/alerts?limit=50"""
+        params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        try:
+            limit = max(1, min(int(params.get('limit', [50])[0]), 500))
+        except ValueError:
+            limit = 50
+        
+        engine = get_alert_engine()
+        self.send_json(200, {
+            'rules': [rule.to_dict() for rule in engine.rules.values()],
+            'alerts': engine.recent[-limit:][::-1]
+        })
+    
+    def alert_admin_authorized(self):
+        """Rule changes need the X-Alert-Token header to match ALERT_ADMIN_TOKEN (unset: rules are read-only)"""
+        token = os.environ.get('ALERT_ADMIN_TOKEN')
+        supplied = self.headers.get('X-Alert-Token') or ''
+        if token and hmac.compare_digest(supplied.encode(), token.encode()):
+            return True
+        self.send_json(403, {'success': False, 'error': 'Alert rule changes need a valid X-Alert-Token'})
+        return False
+    
+    def handle_add_alert_rules(self):
+        """Add rules: {"field": "squeeze_score", "op": "crosses_above", "value": 80, "ticker": "GME"} or {"rules": [...]}"""
+        if not self.alert_admin_authorized():
+            return
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(content_length).decode() or '{}')
+            rules = [Rule.from_dict(item) for item in (data['rules'] if 'rules' in data else [data])]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.send_json(400, {'success': False, 'error': str(e)})
+            return
+        
+        engine = get_alert_engine()
+        added = [engine.add_rule(rule).to_dict() for rule in rules]
+        self.send_json(200, {'success': True, 'rules': added, 'rule_count': len(engine.rules)})
+    
+    def send_provider_stats(self):
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(PROVIDER_ROUTER.snapshot()).encode())
+    
     def get_ortex_data(self, ticker, ortex_key):
         """Get real Ortex data using API key"""
-        if not ortex_key or len(ortex_key) < 10:
+        if not REPLAY.offline and (not ortex_key or len(ortex_key) < 10):
+            return None
+        
+        # Skip straight to fallback data while Ortex is erroring or out of quota
+        if not PROVIDER_ROUTER.available('ortex'):
             return None
             
-        try:
+        def fetch():
             # Ortex API endpoint (you'll need to replace with actual Ortex API URL)
             url = f"https://api.ortex.com/v1/short-interest/{ticker}"
             
@@ -421,135 +580,75 @@ class handler(BaseHTTPRequestHandler):
                 'User-Agent': 'Ultimate-Squeeze-Scanner/1.0'
             }
             
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req, timeout=10) as response:
-                if response.status == 200:
-                    data = json.loads(response.read().decode())
-                    
-                    # Parse Ortex response format (adjust based on actual API)
-                    return {
-                        'short_interest': data.get('short_interest_percent', 0),
-                        'days_to_cover': data.get('days_to_cover', 0),
-                        'utilization': data.get('utilization', 0),
-                        'cost_to_borrow': data.get('cost_to_borrow', 0),
-                        'shares_on_loan': data.get('shares_on_loan', 0),
-                        'exchange_reported_si': data.get('exchange_si', 0)
-                    }
-                    
-        except Exception as e:
+            data = fetch_json('ortex', url, headers)
+            
+            # Parse Ortex response format (adjust based on actual API)
+            return {
+                'short_interest': data.get('short_interest_percent', 0),
+                'days_to_cover': data.get('days_to_cover', 0),
+                'utilization': data.get('utilization', 0),
+                'cost_to_borrow': data.get('cost_to_borrow', 0),
+                'shares_on_loan': data.get('shares_on_loan', 0),
+                'exchange_reported_si': data.get('exchange_si', 0)
+            }
+        
+        def routed():
+            return PROVIDER_ROUTER.call({'ortex': fetch})[1]
+        
+        try:
+            # Keyed per credential so one account's entitlement isn't served to another
+            return shared_fetch(cache_key('ortex', ticker, ortex_key), routed, ORTEX_TTL)
+        except ProviderError as e:
             print(f"Ortex API error for {ticker}: {e}")
             return None
-            
-        return None
     
     def get_stock_price_data(self, ticker):
-        """Get current stock price from free APIs"""
-        try:
-            # Try Yahoo Finance API (free)
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+        """Get current stock price from free APIs (Yahoo hosts raced via the provider router)"""
+        def fetch(host):
+            url = f"https://{host}/v8/finance/chart/{ticker}"
             
             headers = {
                 'User-Agent': 'Ultimate-Squeeze-Scanner/1.0'
             }
             
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req, timeout=10) as response:
-                if response.status == 200:
-                    data = json.loads(response.read().decode())
-                    
-                    result = data.get('chart', {}).get('result', [])
-                    if result:
-                        meta = result[0].get('meta', {})
-                        current_price = meta.get('regularMarketPrice', 0)
-                        previous_close = meta.get('previousClose', current_price)
-                        volume = meta.get('regularMarketVolume', 0)
-                        
-                        price_change_percent = 0
-                        if previous_close > 0:
-                            price_change_percent = ((current_price - previous_close) / previous_close) * 100
-                        
-                        return {
-                            'current_price': round(current_price, 2),
-                            'price_change': round(price_change_percent, 2),
-                            'volume': volume,
-                            'previous_close': previous_close
-                        }
-                        
-        except Exception as e:
-            print(f"Price API error for {ticker}: {e}")
+            data = fetch_json(host, url, headers)
             
-        # Fallback to Alpha Vantage (free tier)
-        try:
-            # Note: You would need to register for a free API key
-            # For now, we'll return None to fall back to mock data
-            pass
+            result = data.get('chart', {}).get('result', [])
+            if not result:
+                return None
+            meta = result[0].get('meta', {})
+            current_price = meta.get('regularMarketPrice', 0)
+            previous_close = meta.get('previousClose', current_price)
+            volume = meta.get('regularMarketVolume', 0)
             
-        except Exception:
-            pass
+            price_change_percent = 0
+            if previous_close > 0:
+                price_change_percent = ((current_price - previous_close) / previous_close) * 100
+            
+            return {
+                'current_price': round(current_price, 2),
+                'price_change': round(price_change_percent, 2),
+                'volume': volume,
+                'previous_close': previous_close
+            }
+        
+        def routed():
+            return PROVIDER_ROUTER.call({host: (lambda host=host: fetch(host)) for host in YAHOO_HOSTS})[1]
+        
+        try:
+            return shared_fetch(cache_key('price', ticker), routed, PRICE_TTL)
+        except ProviderError as e:
+            print(f"Price API error for {ticker}: {e}")
             
         return None
     
     def calculate_squeeze_score(self, ortex_data, price_data):
-        """Calculate squeeze score based on Ortex metrics"""
-        if not ortex_data:
-            return 50  # Default score
-            
-        score = 0
-        
-        # Short Interest (0-35 points)
-        si = ortex_data.get('short_interest', 0)
-        if si >= 30:
-            score += 35
-        elif si >= 20:
-            score += 25
-        elif si >= 15:
-            score += 15
-        elif si >= 10:
-            score += 8
-            
-        # Utilization (0-25 points)
-        util = ortex_data.get('utilization', 0)
-        if util >= 95:
-            score += 25
-        elif util >= 85:
-            score += 20
-        elif util >= 75:
-            score += 12
-        elif util >= 60:
-            score += 6
-            
-        # Cost to Borrow (0-25 points)
-        ctb = ortex_data.get('cost_to_borrow', 0)
-        if ctb >= 20:
-            score += 25
-        elif ctb >= 10:
-            score += 18
-        elif ctb >= 5:
-            score += 10
-        elif ctb >= 2:
-            score += 5
-            
-        # Days to Cover (0-15 points)
-        dtc = ortex_data.get('days_to_cover', 0)
-        if dtc >= 5:
-            score += 15
-        elif dtc >= 3:
-            score += 10
-        elif dtc >= 2:
-            score += 5
-            
-        return min(100, score)
+        """Calculate squeeze score based on Ortex metrics (thresholds in squeeze_scoring.py)"""
+        return squeeze_score(ortex_data)
     
     def get_squeeze_type(self, score):
         """Determine squeeze risk level based on score"""
-        if score >= 80:
-            return "EXTREME SQUEEZE RISK"
-        elif score >= 60:
-            return "High Squeeze Risk"
-        elif score >= 40:
-            return "Moderate Squeeze Risk"
-        else:
-            return "Low Squeeze Risk"
+        return squeeze_type(score)
     
     def handle_squeeze_scan(self):
         try:
@@ -557,11 +656,19 @@ class handler(BaseHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             data = json.loads(post_data.decode()) if post_data else {}
             
+            try:
+                ranges, categories, sort_by, descending, limit = parse_query(data)
+            except ValueError as e:
+                self.send_json(400, {'success': False, 'error': str(e)})
+                return
+            
             ortex_key = data.get('ortex_key', '')
-            tickers = data.get('tickers', ['GME', 'AMC'])
+            
+            # Normalize, de-duplicate and drop unknown symbols before any upstream call
+            tickers, rejected = get_symbol_master().validate(data.get('tickers', ['GME', 'AMC']))
             
             # Check if we should use live data
-            use_live_data = ortex_key and len(ortex_key.strip()) >= 10
+            use_live_data = REPLAY.offline or (ortex_key and len(ortex_key.strip()) >= 10)
             
             # Comprehensive squeeze data with enhanced metrics
             mock_data = {
@@ -619,8 +726,6 @@ class handler(BaseHTTPRequestHandler):
             live_data_count = 0
             
             for ticker in tickers:
-                ticker = ticker.upper()
-                
                 # Try to get live data first
                 ortex_data = None
                 price_data = None
@@ -690,8 +795,14 @@ class handler(BaseHTTPRequestHandler):
                         'data_source': 'mock_data'
                     })
             
-            # Sort by squeeze score descending
-            results.sort(key=lambda x: x['squeeze_score'], reverse=True)
+            # Index the scored rows, then apply min_score / filters (sorted by squeeze score by default)
+            scanned = len(results)
+            # The instance-wide snapshot and the alert rules only take fully live rows - mock and
+            # mixed rows would serve screens and trip alerts on made-up short-interest numbers
+            live_rows = [row for row in results if row.get('data_source') == 'live_api']
+            SQUEEZE_SNAPSHOTS.update(live_rows)
+            alerts = get_alert_engine().evaluate({row['ticker']: squeeze_values(row) for row in live_rows})
+            results = SqueezeSnapshot(results).screen(ranges, categories, sort_by, descending, limit=limit)
             
             # Generate appropriate message
             if use_live_data and live_data_count > 0:
@@ -705,7 +816,10 @@ class handler(BaseHTTPRequestHandler):
                 'success': True,
                 'results': results,
                 'count': len(results),
+                'scanned': scanned,
                 'live_data_count': live_data_count,
+                'rejected_tickers': rejected,
+                'alerts': alerts,
                 'message': f'Found {len(results)} squeeze candidates - {data_message}'
             }
             
@@ -726,6 +840,91 @@ class handler(BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(json.dumps(error_response).encode())
     
+    def handle_squeeze_query(self):
+        """Screen the indexed snapshot of everything scanned on this instance - no upstream calls"""
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            post_data = self.rfile.read(content_length)
+            data = json.loads(post_data.decode()) if post_data else {}
+            ranges, categories, sort_by, descending, limit = parse_query(data)
+        except ValueError as e:
+            self.send_json(400, {'success': False, 'error': str(e)})
+            return
+        
+        started = time.perf_counter()
+        snapshot = SQUEEZE_SNAPSHOTS.snapshot
+        results = snapshot.screen(ranges, categories, sort_by, descending=descending, limit=limit)
+        self.send_json(200, {
+            'success': True,
+            'results': results,
+            'count': len(results),
+            'universe': len(snapshot),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        })
+    
+    def send_json(self, status, payload):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(payload).encode())
+    
+    def handle_options_scan(self):
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            post_data = self.rfile.read(content_length)
+            data = json.loads(post_data.decode()) if post_data else {}
+            
+            polygon_key = (data.get('polygon_key') or '').strip() or None
+            uw_key = (data.get('uw_key') or '').strip() or None
+            tickers, rejected = get_symbol_master().validate(data.get('tickers', []))
+            days = int(data.get('days_to_exp', 30))
+            min_return = float(data.get('min_return', 20))
+            strategies = data.get('strategies') or None
+            
+            if not (polygon_key or uw_key or REPLAY.offline):
+                self.send_json(400, {'success': False, 'error': 'Enter a Polygon or Unusual Whales API key'})
+                return
+            if not tickers:
+                error = f"Unknown tickers: {', '.join(rejected)}" if rejected else 'No tickers given'
+                self.send_json(400, {'success': False, 'error': error, 'rejected_tickers': rejected})
+                return
+            
+            from api.scan_service import MAX_TICKERS, results_json
+            if len(tickers) > MAX_TICKERS:
+                self.send_json(400, {'success': False, 'error': f'At most {MAX_TICKERS} tickers per scan'})
+                return
+            
+            started = time.time()
+            results, cached, errors = get_scan_service().scan(
+                polygon_key, uw_key, tickers, days, min_return, strategies
+            )
+            
+            if results.empty and errors and len(errors) == len(tickers):
+                self.send_json(502, {
+                    'success': False,
+                    'error': '; '.join(f'{t}: {e}' for t, e in list(errors.items())[:3]),
+                    'errors': errors
+                })
+                return
+            
+            self.send_json(200, {
+                'success': True,
+                'results': results_json(results),
+                'count': len(results),
+                'cached_tickers': cached,
+                'rejected_tickers': rejected,
+                'errors': errors,
+                'elapsed': round(time.time() - started, 3),
+                'message': f'Found {len(results)} opportunities across {len(tickers)} tickers'
+            })
+            
+        except Exception as e:
+            self.send_json(500, {
+                'success': False,
+                'error': str(e),
+                'message': 'Error during options scan'
+            })
+    
     def send_404(self):
         self.send_response(404)
         self.send_header('Content-type', 'application/json')
@@ -0,0 +1,143 @@
+"""
+Options scan service behind POST /api/scan
+Keeps a small pool of long-lived scanners per API key pair (so connections and scanner
+state are reused across requests), evaluates each ticker's chain in parallel on those
+scanners, and caches per-ticker results so overlapping scans only fetch what's new - in
+process, and through the node's shared cache across worker instances.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+import pandas as pd
+
+from provider_router import ProviderRouter, routed_scanner
+from replay import OFF, ReplayScanner, layer_from_env, wrap_scanner
+from scan_config import strategy_matches
+from scan_pipeline import shared_scan
+from shared_cache import get_shared_cache
+from results_schema import compact_results
+
+SCANNERS_PER_KEY = int(os.environ.get('SCAN_SERVICE_WORKERS', 4))
+MAX_KEY_POOLS = 32
+RESULT_TTL = 120  # seconds a per-ticker result is reused
+MAX_CACHED_TICKERS = 2048
+MAX_TICKERS = 100  # per request
+
+
+class ScannerPool:
+    """Fixed set of scanners for one key pair, checked out one per in-flight ticker"""
+
+    def __init__(self, build, size):
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(build())
+
+    def run(self, fn):
+        scanner = self._idle.get()
+        try:
+            return fn(scanner)
+        finally:
+            self._idle.put(scanner)
+
+
+class ScanService:
+    def __init__(self, scanners_per_key=SCANNERS_PER_KEY, result_ttl=RESULT_TTL):
+        self.scanners_per_key = scanners_per_key
+        self.result_ttl = result_ttl
+        self.router = ProviderRouter()
+        self.replay = layer_from_env()
+        self.shared = get_shared_cache() if self.replay.mode == OFF else None
+        self._pools = OrderedDict()  # key hash -> ScannerPool
+        self._results = OrderedDict()  # (key hash, ticker, days, min_return) -> (results, fetched_at)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=scanners_per_key * 4, thread_name_prefix="api-scan")
+
+    @staticmethod
+    def key_hash(polygon_key, uw_key):
+        return hashlib.blake2b(f"{polygon_key}|{uw_key}".encode(), digest_size=12).hexdigest()
+
+    def _pool(self, key, polygon_key, uw_key):
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None:
+                self._pools.move_to_end(key)
+                return pool
+
+        if self.replay.offline and not (polygon_key or uw_key):
+            build = lambda: ReplayScanner(None, self.replay)
+        else:
+            build = lambda: wrap_scanner(routed_scanner(polygon_key, uw_key, self.router), self.replay)
+        pool = ScannerPool(build, self.scanners_per_key)
+
+        with self._lock:
+            pool = self._pools.setdefault(key, pool)
+            while len(self._pools) > MAX_KEY_POOLS:
+                self._pools.popitem(last=False)
+        return pool
+
+    def _cached(self, cache_key):
+        with self._lock:
+            entry = self._results.get(cache_key)
+            if entry is None or time.time() - entry[1] > self.result_ttl:
+                return None
+            self._results.move_to_end(cache_key)
+            return entry[0]
+
+    def _store(self, cache_key, results):
+        with self._lock:
+            self._results[cache_key] = (results, time.time())
+            while len(self._results) > MAX_CACHED_TICKERS:
+                self._results.popitem(last=False)
+
+    def scan(self, polygon_key, uw_key, tickers, days, min_return, strategies=None):
+        """Scan tickers in parallel; returns (results DataFrame, cached ticker count, {ticker: error})"""
+        key = self.key_hash(polygon_key, uw_key)
+        pool = self._pool(key, polygon_key, uw_key)
+
+        frames = []
+        cached = 0
+        futures = {}
+        for ticker in tickers:
+            cache_key = (key, ticker, days, min_return)
+            results = self._cached(cache_key)
+            if results is not None:
+                cached += 1
+                frames.append(results)
+            else:
+                futures[ticker] = self._executor.submit(pool.run, lambda scanner, ticker=ticker: shared_scan(
+                    self.shared, key, scanner, [ticker], days, min_return, ttl=self.result_ttl
+                ))
+
+        errors = {}
+        for ticker, future in futures.items():
+            try:
+                results = future.result()
+            except Exception as e:
+                errors[ticker] = str(e)[:200]
+                continue
+            self._store((key, ticker, days, min_return), results)
+            frames.append(results)
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(), cached, errors
+
+        results = pd.concat(frames, ignore_index=True)
+        if strategies:
+            results = results[strategy_matches(results['strategy'], strategies)]
+        results = results.sort_values('return', ascending=False, ignore_index=True)
+        return compact_results(results), cached, errors
+
+
+def results_json(results):
+    """JSON-ready records: ISO dates, NaN as null"""
+    if results.empty:
+        return []
+    return json.loads(results.to_json(orient='records', date_format='iso'))
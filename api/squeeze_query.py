@@ -0,0 +1,262 @@
+"""
+Indexed screens over scored squeeze results
+Each numeric metric gets a sorted (value, row) index and squeeze_type an inverted index. The
+store merges each scan's rows into the previous snapshot's indexes by bisection instead of
+re-sorting the whole universe. A screen bisects every range predicate to a candidate slice,
+walks only the most selective one and checks the remaining predicates on those rows, so multi-predicate
+screens over a large universe touch a small fraction of it.
+"""
+
+from bisect import bisect_left, bisect_right
+import threading
+
+NUMERIC_FIELDS = {
+    'squeeze_score': lambda row: row.get('squeeze_score'),
+    'short_interest': lambda row: (row.get('ortex_data') or {}).get('short_interest'),
+    'utilization': lambda row: (row.get('ortex_data') or {}).get('utilization'),
+    'cost_to_borrow': lambda row: (row.get('ortex_data') or {}).get('cost_to_borrow'),
+    'days_to_cover': lambda row: (row.get('ortex_data') or {}).get('days_to_cover'),
+    'price_change': lambda row: row.get('price_change'),
+    'volume': lambda row: row.get('volume'),
+    'current_price': lambda row: row.get('current_price'),
+}
+CATEGORY_FIELDS = {
+    'squeeze_type': lambda row: row.get('squeeze_type'),
+    'data_source': lambda row: row.get('data_source'),
+}
+MAX_SNAPSHOT_ROWS = 20000
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value == value else None  # NaN -> None
+
+
+def _bound(value, name):
+    """A numeric bound from a request; None means not given, anything unparseable is a ValueError"""
+    if value is None:
+        return None
+    number = None if isinstance(value, bool) or not isinstance(value, (int, float, str)) else _number(value)
+    if number is None:
+        raise ValueError(f"'{name}' must be a number, got {value!r}")
+    return number
+
+
+def parse_query(data):
+    """
+    Screen from a request body: {"min_score": 20, "filters": {"short_interest": {"min": 20},
+    "squeeze_type": ["High Squeeze Risk"]}, "sort_by": "squeeze_score", "descending": true,
+    "limit": 50}. Returns (ranges {field: (lo, hi)}, categories {field: set}, sort_by, descending,
+    limit); ValueError for anything malformed.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    ranges = {}
+    categories = {}
+    min_score = _bound(data.get('min_score'), 'min_score')
+    if min_score is not None:
+        ranges['squeeze_score'] = (min_score, None)
+
+    filters = data.get('filters') or {}
+    if not isinstance(filters, dict):
+        raise ValueError("'filters' must be an object of field -> filter")
+    for field, spec in filters.items():
+        if field in CATEGORY_FIELDS:
+            values = [spec] if isinstance(spec, str) else spec
+            if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                raise ValueError(f"Filter '{field}' must be a string or a list of strings")
+            categories[field] = set(values)
+        elif field in NUMERIC_FIELDS:
+            if not isinstance(spec, dict) or not set(spec) <= {'min', 'max'}:
+                raise ValueError(f"Filter '{field}' must look like {{\"min\": x, \"max\": y}}")
+            lo, hi = _bound(spec.get('min'), f'{field}.min'), _bound(spec.get('max'), f'{field}.max')
+            if lo is not None and hi is not None and lo > hi:
+                raise ValueError(f"Filter '{field}' has min > max")
+            ranges[field] = (lo, hi)
+        else:
+            raise ValueError(f"Unknown filter '{field}'. Available: {', '.join([*NUMERIC_FIELDS, *CATEGORY_FIELDS])}")
+
+    sort_by = data.get('sort_by', 'squeeze_score')
+    if not isinstance(sort_by, str) or sort_by not in NUMERIC_FIELDS:
+        raise ValueError(f"Can't sort by {sort_by!r}")
+    descending = data.get('descending', True)
+    if not isinstance(descending, bool):
+        raise ValueError("'descending' must be true or false")
+    limit = data.get('limit')
+    if limit is not None:
+        if isinstance(limit, bool) or not isinstance(limit, (int, float, str)):
+            raise ValueError(f"'limit' must be an integer, got {limit!r}")
+        try:
+            limit = int(limit)
+        except (ValueError, OverflowError):
+            raise ValueError(f"'limit' must be an integer, got {limit!r}") from None
+        if limit < 1:
+            raise ValueError("'limit' must be at least 1")
+    return ranges, categories, sort_by, descending, limit
+
+
+class SqueezeSnapshot:
+    """Immutable scored rows plus their column indexes; merged() derives an updated copy"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.slots = {row.get('ticker'): i for i, row in enumerate(self.rows)}  # ticker -> row id
+        self.free = []  # row ids of removed tickers, reused by merged()
+        self.columns = {
+            field: [_number(get(row)) for row in self.rows] for field, get in NUMERIC_FIELDS.items()
+        }
+        self.indexes = {}  # field -> (sorted values, row ids in the same order); rows without a value are left out
+        for field, column in self.columns.items():
+            order = sorted((i for i, value in enumerate(column) if value is not None), key=column.__getitem__)
+            self.indexes[field] = ([column[i] for i in order], order)
+        self.postings = {}  # field -> value -> row ids
+        for field, get in CATEGORY_FIELDS.items():
+            postings = {}
+            for i, row in enumerate(self.rows):
+                postings.setdefault(get(row), []).append(i)
+            self.postings[field] = postings
+
+    def __len__(self):
+        return len(self.rows) - len(self.free)
+
+    def merged(self, rows, removed=()):
+        """
+        New snapshot with `rows` replacing/adding rows by ticker and the `removed` tickers dropped.
+        Only the changed rows are taken out of / bisected into the sorted indexes; this snapshot is
+        left untouched for readers still holding it.
+        """
+        snapshot = object.__new__(SqueezeSnapshot)
+        snapshot.rows = list(self.rows)
+        snapshot.slots = dict(self.slots)
+        snapshot.free = list(self.free)
+        snapshot.columns = {field: list(column) for field, column in self.columns.items()}
+        snapshot.indexes = {field: (list(values), list(ids)) for field, (values, ids) in self.indexes.items()}
+        snapshot.postings = {
+            field: {value: list(ids) for value, ids in postings.items()} for field, postings in self.postings.items()
+        }
+
+        for ticker in removed:
+            i = snapshot.slots.pop(ticker, None)
+            if i is not None:
+                snapshot._unindex(i)
+                snapshot.rows[i] = None
+                snapshot.free.append(i)
+        for row in rows:
+            i = snapshot.slots.get(row['ticker'])
+            if i is not None:
+                snapshot._unindex(i)
+            elif snapshot.free:
+                i = snapshot.free.pop()
+            else:
+                i = len(snapshot.rows)
+                snapshot.rows.append(None)
+                for column in snapshot.columns.values():
+                    column.append(None)
+            snapshot.slots[row['ticker']] = i
+            snapshot.rows[i] = row
+            snapshot._index(i)
+        return snapshot
+
+    def _index(self, i):
+        row = self.rows[i]
+        for field, get in NUMERIC_FIELDS.items():
+            value = self.columns[field][i] = _number(get(row))
+            if value is not None:
+                values, ids = self.indexes[field]
+                at = bisect_right(values, value)
+                values.insert(at, value)
+                ids.insert(at, i)
+        for field, get in CATEGORY_FIELDS.items():
+            self.postings[field].setdefault(get(row), []).append(i)
+
+    def _unindex(self, i):
+        row = self.rows[i]
+        for field, column in self.columns.items():
+            value = column[i]
+            if value is not None:
+                values, ids = self.indexes[field]
+                start = bisect_left(values, value)
+                at = start + ids[start:bisect_right(values, value)].index(i)
+                del values[at]
+                del ids[at]
+                column[i] = None
+        for field, get in CATEGORY_FIELDS.items():
+            ids = self.postings[field][get(row)]
+            ids.remove(i)
+            if not ids:
+                del self.postings[field][get(row)]
+
+    def _range(self, field, lo, hi):
+        values, ids = self.indexes[field]
+        start = 0 if lo is None else bisect_left(values, lo)
+        stop = len(values) if hi is None else bisect_right(values, hi)
+        return ids[start:stop] if start < stop else []
+
+    def _matches(self, i, ranges, categories):
+        for field, (lo, hi) in ranges.items():
+            value = self.columns[field][i]
+            if value is None or (lo is not None and value < lo) or (hi is not None and value > hi):
+                return False
+        for field, wanted in categories.items():
+            if CATEGORY_FIELDS[field](self.rows[i]) not in wanted:
+                return False
+        return True
+
+    def screen(self, ranges=None, categories=None, sort_by='squeeze_score', descending=True, limit=None):
+        """Rows matching every predicate, ordered by `sort_by`"""
+        ranges = ranges or {}
+        categories = categories or {}
+
+        # Candidate lists per predicate; only the smallest is walked
+        candidates = [self._range(field, lo, hi) for field, (lo, hi) in ranges.items()]
+        for field, wanted in categories.items():
+            postings = self.postings[field]
+            candidates.append([i for value in wanted for i in postings.get(value, ())])
+
+        if candidates:
+            smallest = min(candidates, key=len)
+            ids = [i for i in smallest if self._matches(i, ranges, categories)]
+            column = self.columns[sort_by]
+            ids.sort(key=lambda i: (column[i] is None, -(column[i] or 0) if descending else (column[i] or 0)))
+        else:
+            # No predicates: the sort index already has the order
+            ordered = self.indexes[sort_by][1]
+            ids = ordered[::-1] if descending else list(ordered)
+            indexed = set(ordered)
+            ids += [i for i in range(len(self.rows)) if i not in indexed and self.rows[i] is not None]
+
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.rows[i] for i in ids]
+
+
+class SnapshotStore:
+    """Latest scored row per ticker across scans on this instance; each update is merged into the snapshot"""
+
+    def __init__(self, max_rows=MAX_SNAPSHOT_ROWS):
+        self.max_rows = max_rows
+        self._rows = {}
+        self._snapshot = SqueezeSnapshot([])
+        self._lock = threading.Lock()
+
+    def update(self, rows):
+        with self._lock:
+            changed = {}
+            for row in rows:
+                self._rows.pop(row['ticker'], None)
+                self._rows[row['ticker']] = changed[row['ticker']] = row
+            removed = []
+            while len(self._rows) > self.max_rows:
+                ticker = next(iter(self._rows))
+                self._rows.pop(ticker)
+                removed.append(ticker)
+                changed.pop(ticker, None)
+            self._snapshot = self._snapshot.merged(changed.values(), removed)
+            return self._snapshot
+
+    @property
+    def snapshot(self):
+        return self._snapshot
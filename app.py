@@ -3,14 +3,25 @@ Options Scanner Web Dashboard - Professional Trading Platform Style
 Run with: streamlit run options_scanner_web.py
 """
 
+import os
+import re
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
-from options_scanner import OptionsScanner  # Import your existing scanner
+import uuid
+from results_schema import memory_report
+from results_aggregates import store_results, get_aggregates
+from session_store import get_session_store
+from refresh_scheduler import RefreshScheduler, config_key
+from scan_pipeline import shared_scan
+from greek_data_cache import GREEK_TICKERS
+from scan_config import TICKER_LISTS, ALL_STRATEGIES, STRATEGY_PRESETS
+# Plotly, the scanner and single-view helpers (charts, pager, export, exposure/flow)
+# are imported where they are used to keep cold starts fast - see tools/check_import_time.py
+
+THEME_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'css', 'streamlit_theme.css')
 
 # Page config - MUST be first
 st.set_page_config(
@@ -20,293 +31,103 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Professional Dark Theme CSS
-st.markdown("""
-    <style>
-    /* Import Google Fonts */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    
-    /* Main app background */
-    .stApp {
-        background: linear-gradient(180deg, #0a0a0a 0%, #1a1a2e 100%);
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Sidebar styling */
-    section[data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #0f0f1e 0%, #1a1a2e 100%);
-        border-right: 1px solid #2d2d3d;
-    }
-    
-    section[data-testid="stSidebar"] .stMarkdown {
-        color: #e0e0e0;
-    }
-    
-    /* Headers */
-    h1 {
-        color: #ffffff;
-        font-weight: 700;
-        letter-spacing: -0.5px;
-        text-shadow: 0 0 20px rgba(100, 200, 255, 0.3);
-    }
-    
-    h2, h3 {
-        color: #ffffff;
-        font-weight: 600;
-    }
-    
-    /* Metric containers - Modern card style */
-    [data-testid="metric-container"] {
-        background: linear-gradient(135deg, #1e1e2e 0%, #2a2a3e 100%);
-        border: 1px solid rgba(100, 200, 255, 0.2);
-        border-radius: 12px;
-        padding: 20px;
-        box-shadow: 
-            0 4px 20px rgba(0, 0, 0, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.1);
-        transition: all 0.3s ease;
-    }
-    
-    [data-testid="metric-container"]:hover {
-        transform: translateY(-2px);
-        box-shadow: 
-            0 8px 30px rgba(100, 200, 255, 0.2),
-            inset 0 1px 0 rgba(255, 255, 255, 0.1);
-        border-color: rgba(100, 200, 255, 0.4);
-    }
-    
-    /* Metric values - Gradient text effect */
-    [data-testid="metric-container"] [data-testid="stMetricValue"] {
-        background: linear-gradient(135deg, #00ff88 0%, #00d4ff 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        font-size: 2.5rem;
-        font-weight: 700;
-        text-shadow: 0 0 30px rgba(0, 255, 136, 0.5);
-    }
-    
-    /* Metric labels */
-    [data-testid="metric-container"] [data-testid="stMetricLabel"] {
-        color: #a0a0b0;
-        font-size: 0.85rem;
-        font-weight: 500;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        margin-bottom: 8px;
-    }
-    
-    /* Metric delta */
-    [data-testid="metric-container"] [data-testid="stMetricDelta"] {
-        color: #00ff88;
-        font-size: 0.9rem;
-        font-weight: 500;
-    }
-    
-    /* Buttons - Modern gradient style */
-    .stButton > button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 12px 24px;
-        font-weight: 600;
-        font-size: 16px;
-        letter-spacing: 0.5px;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 25px rgba(102, 126, 234, 0.6);
-    }
-    
-    .stButton > button[type="primary"] {
-        background: linear-gradient(135deg, #00ff88 0%, #00d4ff 100%);
-        box-shadow: 0 4px 15px rgba(0, 255, 136, 0.4);
-    }
-    
-    /* Input fields */
-    .stTextInput > div > div > input,
-    .stSelectbox > div > div > select,
-    .stMultiSelect > div > div {
-        background-color: #1a1a2e !important;
-        border: 1px solid #3a3a4e !important;
-        border-radius: 8px;
-        color: #ffffff !important;
-        transition: all 0.3s ease;
-    }
-    
-    .stTextInput > div > div > input:focus,
-    .stSelectbox > div > div > select:focus {
-        border-color: #667eea !important;
-        box-shadow: 0 0 0 2px rgba(102, 126, 234, 0.2) !important;
-    }
-    
-    /* Tabs - Modern style */
-    .stTabs [data-baseweb="tab-list"] {
-        background: rgba(26, 26, 46, 0.5);
-        backdrop-filter: blur(10px);
-        border-radius: 12px;
-        padding: 8px;
-        gap: 8px;
-        border: 1px solid rgba(100, 200, 255, 0.1);
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: transparent;
-        color: #a0a0b0;
-        border-radius: 8px;
-        padding: 10px 20px;
-        font-weight: 500;
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [data-baseweb="tab"]:hover {
-        background: rgba(102, 126, 234, 0.1);
-        color: #ffffff;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-        color: white !important;
-        box-shadow: 0 4px 10px rgba(102, 126, 234, 0.3);
-    }
-    
-    /* DataFrames - Dark theme */
-    .dataframe {
-        background-color: #1a1a2e !important;
-        color: #ffffff !important;
-        border: 1px solid #3a3a4e !important;
-        border-radius: 8px;
-    }
-    
-    .dataframe th {
-        background: linear-gradient(180deg, #2a2a3e 0%, #1e1e2e 100%) !important;
-        color: #00ff88 !important;
-        font-weight: 600;
-        text-transform: uppercase;
-        font-size: 0.85rem;
-        letter-spacing: 1px;
-        border-bottom: 2px solid #3a3a4e !important;
-    }
-    
-    .dataframe td {
-        background-color: #1a1a2e !important;
-        color: #e0e0e0 !important;
-        border-bottom: 1px solid #2a2a3e !important;
-    }
-    
-    .dataframe tr:hover td {
-        background-color: #2a2a3e !important;
-    }
-    
-    /* Success/Info/Warning boxes */
-    .stAlert {
-        background: linear-gradient(135deg, #1e1e2e 0%, #2a2a3e 100%);
-        border: 1px solid #3a3a4e;
-        border-radius: 12px;
-        color: #ffffff;
-    }
-    
-    div[data-baseweb="notification"] {
-        background: linear-gradient(135deg, #1e1e2e 0%, #2a2a3e 100%);
-        border-left: 4px solid #00ff88;
-    }
-    
-    /* Expander */
-    .streamlit-expanderHeader {
-        background: linear-gradient(135deg, #1e1e2e 0%, #2a2a3e 100%);
-        border: 1px solid rgba(100, 200, 255, 0.2);
-        border-radius: 8px;
-        color: #ffffff;
-    }
-    
-    /* Slider */
-    .stSlider > div > div {
-        background: linear-gradient(90deg, #667eea 0%, #00ff88 100%);
-    }
-    
-    /* Progress bar */
-    .stProgress > div > div > div {
-        background: linear-gradient(90deg, #667eea 0%, #00ff88 100%);
-    }
-    
-    /* Checkbox */
-    .stCheckbox > label > span {
-        color: #e0e0e0 !important;
-    }
-    
-    /* Divider line */
-    hr {
-        border-color: #3a3a4e;
-        opacity: 0.5;
-    }
-    
-    /* Custom gradient text class */
-    .gradient-text {
-        background: linear-gradient(135deg, #00ff88 0%, #00d4ff 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        font-weight: 700;
-        font-size: 2.5rem;
-    }
-    
-    /* Glow effect for important elements */
-    .glow {
-        box-shadow: 0 0 20px rgba(0, 255, 136, 0.5);
-    }
-    
-    /* Custom scrollbar */
-    ::-webkit-scrollbar {
-        width: 10px;
-        height: 10px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: #1a1a2e;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(180deg, #667eea 0%, #764ba2 100%);
-        border-radius: 5px;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: linear-gradient(180deg, #764ba2 0%, #667eea 100%);
-    }
-    
-    /* Animation for new data */
-    @keyframes pulse {
-        0% { transform: scale(1); }
-        50% { transform: scale(1.05); }
-        100% { transform: scale(1); }
-    }
-    
-    .pulse {
-        animation: pulse 2s infinite;
-    }
-    
-    /* Responsive adjustments */
-    @media (max-width: 768px) {
-        [data-testid="metric-container"] [data-testid="stMetricValue"] {
-            font-size: 1.8rem;
-        }
-    }
-    </style>
-""", unsafe_allow_html=True)
+
+@st.cache_resource
+def load_theme_css():
+    """Theme stylesheet, comment-stripped and whitespace-collapsed once per process"""
+    with open(THEME_CSS_PATH) as f:
+        css = f.read()
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};:,>])\s*', r'\1', css)
+    return f"<style>{css.strip()}</style>"
+
+
+# Professional Dark Theme CSS (minified once per process, see static/css/streamlit_theme.css)
+st.markdown(load_theme_css(), unsafe_allow_html=True)
 
 # Initialize session state
 if 'scanner' not in st.session_state:
     st.session_state.scanner = None
 if 'results' not in st.session_state:
     st.session_state.results = pd.DataFrame()
-if 'scan_history' not in st.session_state:
-    st.session_state.scan_history = []
+    st.session_state.results_fingerprint = None
+    st.session_state.results_aggregates = None
 if 'current_api_key' not in st.session_state:
     st.session_state.current_api_key = None
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+# Bounded scan history: past results beyond the session's memory budget are spilled to disk
+session_store = get_session_store(st.session_state)
+st.session_state.scan_history = session_store.history
+session_store.enforce_budget(st.session_state)
+
+# Fragments moved out of experimental in newer Streamlit releases
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+if fragment is None:
+    st.error("This dashboard needs Streamlit 1.33 or newer (st.fragment)")
+    st.stop()
+
+
+@st.cache_resource
+def get_refresh_scheduler():
+    """One scheduler per server process, shared by all sessions"""
+    return RefreshScheduler()
+
+
+@st.cache_resource
+def get_provider_router():
+    """Provider latency/error/quota tracking shared by all sessions"""
+    from provider_router import ProviderRouter
+    return ProviderRouter()
+
+
+@st.cache_resource
+def get_replay_layer():
+    """Upstream record/replay layer configured from SCAN_REPLAY_* (off by default)"""
+    from replay import layer_from_env
+    return layer_from_env()
+
+
+def get_node_cache():
+    """Cache shared with the other worker processes on this node (None while record/replay is on)"""
+    if get_replay_layer().mode != 'off':
+        return None
+    from shared_cache import get_shared_cache
+    return get_shared_cache()
+
+
+@st.cache_resource
+def get_scan_queue():
+    """Bounded scan worker pool shared by all sessions"""
+    from scan_queue import ScanQueue
+    return ScanQueue()
+
+
+@st.cache_resource
+def get_greek_data_cache():
+    """Greek exposure/flow cache shared by all sessions"""
+    from greek_data_cache import GreekDataCache
+    return GreekDataCache(shared=get_node_cache())
+
+
+@st.cache_resource
+def get_greek_flow_store():
+    """Rolling Greek flow history per ticker, shared by all sessions"""
+    from greek_flow_store import GreekFlowStore
+    return GreekFlowStore()
+
+
+def ingest_greek_flow(ticker, flow):
+    """Store new flow buckets, then run the alert rules (alert_rules.py) on the latest delta flow"""
+    from alert_rules import get_alert_engine
+    
+    store = get_greek_flow_store()
+    if store.ingest(ticker, flow):
+        latest = store.get(ticker).latest()
+        for alert in get_alert_engine().observe(ticker, {'delta_flow': latest['total_delta_flow']}):
+            st.toast(f"🔔 {alert['rule']} ({alert['value']:,.0f})")
 
 # Header with gradient text
 st.markdown('<h1 class="gradient-text">🎯 Options Scanner Pro</h1>', unsafe_allow_html=True)
@@ -335,30 +156,42 @@ with st.sidebar:
     )
     
     # Check which APIs are configured
+    replay_layer = get_replay_layer()
     if polygon_key or uw_key:
+        from provider_router import routed_scanner  # Your OptionsScanner, with single-provider fallbacks
+        from replay import wrap_scanner
+        
         if not st.session_state.scanner:
-            st.session_state.scanner = OptionsScanner(
+            st.session_state.scanner = wrap_scanner(routed_scanner(
                 polygon_key if polygon_key else None,
-                uw_key if uw_key else None
-            )
+                uw_key if uw_key else None,
+                get_provider_router()
+            ), replay_layer)
             st.session_state.current_polygon_key = polygon_key
             st.session_state.current_uw_key = uw_key
             
             if uw_key and polygon_key:
-                st.success("✅ Both APIs loaded! Using UW as primary, Polygon as backup")
+                st.success("✅ Both APIs loaded! Scans fall back to a single provider if the combined scan fails")
             elif uw_key:
                 st.success("✅ Unusual Whales API loaded!")
             elif polygon_key:
                 st.success("✅ Polygon API loaded!")
         elif (st.session_state.get('current_polygon_key') != polygon_key or 
               st.session_state.get('current_uw_key') != uw_key):
-            st.session_state.scanner = OptionsScanner(
+            st.session_state.scanner = wrap_scanner(routed_scanner(
                 polygon_key if polygon_key else None,
-                uw_key if uw_key else None
-            )
+                uw_key if uw_key else None,
+                get_provider_router()
+            ), replay_layer)
             st.session_state.current_polygon_key = polygon_key
             st.session_state.current_uw_key = uw_key
             st.success("✅ API keys updated!")
+    elif replay_layer.offline:
+        from replay import ReplayScanner
+        
+        if not st.session_state.scanner:
+            st.session_state.scanner = ReplayScanner(None, replay_layer)
+        st.info(f"📼 Offline replay from {replay_layer.archive.path} - no API keys needed")
     else:
         st.warning("⚠️ Please enter at least one API key")
     
@@ -367,16 +200,8 @@ with st.sidebar:
     # Ticker Selection
     st.subheader("📊 Tickers")
     
-    # Predefined lists
-    ticker_lists = {
-        "Mega Tech": ["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "META", "TSLA"],
-        "ETFs": ["SPY", "QQQ", "IWM", "DIA", "XLF", "XLE", "GLD"],
-        "Meme Stocks": ["GME", "AMC", "BBBY", "BB", "NOK"],
-        "Finance": ["JPM", "BAC", "GS", "MS", "WFC", "C"],
-        "All Popular": ["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "META", "TSLA", 
-                       "SPY", "QQQ", "IWM", "JPM", "BAC", "GS", "AMD", "NFLX"],
-        "Custom": []
-    }
+    # Predefined lists (shared with the batch CLI)
+    ticker_lists = TICKER_LISTS
     
     # Quick ticker selector
     selected_list = st.selectbox("Quick select ticker list:", list(ticker_lists.keys()))
@@ -407,8 +232,18 @@ with st.sidebar:
         help="Type a ticker symbol and press Enter to add it to the scan"
     )
     
-    if custom_ticker and custom_ticker.upper() not in tickers:
-        tickers.append(custom_ticker.upper())
+    if custom_ticker:
+        # Validate against the symbol master so typos never cost an upstream timeout
+        from symbol_master import get_symbol_master
+        
+        symbol_master = get_symbol_master()
+        valid, rejected = symbol_master.validate([t.strip() for t in custom_ticker.split(',') if t.strip()])
+        tickers.extend(t for t in valid if t not in tickers)
+        for raw in rejected:
+            suggestions = [symbol for symbol, _ in symbol_master.search(raw[:2], limit=5)]
+            st.warning(
+                f"Unknown ticker '{raw}'" + (f" - did you mean {', '.join(suggestions)}?" if suggestions else "")
+            )
     
     st.markdown("---")
     
@@ -436,32 +271,10 @@ with st.sidebar:
     # Strategy Selection
     st.subheader("📋 Strategies")
     
-    all_strategies = [
-        "Long Calls",
-        "Long Puts",
-        "Short Calls (Naked)",
-        "Short Puts (Naked)",
-        "Bull Call Spreads",
-        "Bear Put Spreads", 
-        "Cash-Secured Puts",
-        "Covered Calls",
-        "Long Straddles",
-        "Long Strangles",
-        "Iron Condors",
-        "Credit Spreads"
-    ]
+    all_strategies = ALL_STRATEGIES
     
-    # Strategy presets
-    strategy_presets = {
-        "All Strategies": all_strategies,
-        "Basic Options": ["Long Calls", "Long Puts", "Covered Calls", "Cash-Secured Puts"],
-        "Spreads Only": ["Bull Call Spreads", "Bear Put Spreads", "Credit Spreads"],
-        "Income Strategies": ["Covered Calls", "Cash-Secured Puts", "Short Puts (Naked)", "Credit Spreads"],
-        "Volatility Plays": ["Long Straddles", "Long Strangles", "Iron Condors"],
-        "Bullish": ["Long Calls", "Bull Call Spreads", "Short Puts (Naked)", "Cash-Secured Puts"],
-        "Bearish": ["Long Puts", "Bear Put Spreads", "Short Calls (Naked)"],
-        "Custom": []
-    }
+    # Strategy presets (shared with the batch CLI)
+    strategy_presets = STRATEGY_PRESETS
     
     preset = st.selectbox("Strategy preset:", list(strategy_presets.keys()))
     
@@ -484,12 +297,12 @@ with st.sidebar:
     scan_button = st.button(
         "🚀 Run Scan",
         use_container_width=True,
-        disabled=not (polygon_key or uw_key) or not tickers,
+        disabled=not (polygon_key or uw_key or replay_layer.offline) or not tickers,
         type="primary"
     )
 
 # Main Content Area
-if not (polygon_key or uw_key):
+if not (polygon_key or uw_key or replay_layer.offline):
     st.warning("👈 Please enter at least one API key in the sidebar to begin")
     st.markdown("""
     ### Getting Started:
@@ -502,53 +315,75 @@ if not (polygon_key or uw_key):
     """)
     
 elif scan_button and st.session_state.scanner:
-    # Run scan with progress indicator
-    with st.spinner(f"🔍 Scanning {len(tickers)} tickers..."):
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+    # Queue the scan on the shared worker pool; the fragment below polls it by job id
+    scan_scanner = st.session_state.scanner
+    scan_cache = get_node_cache()
+    scan_config = {
+        'tickers': list(tickers),
+        'days': days_to_exp,
+        'min_return': min_return
+    }
+    scan_key = config_key(tickers, days_to_exp, min_return, polygon_key, uw_key)
+    job_id = get_scan_queue().submit(
+        st.session_state.session_id,
+        scan_key,
+        lambda: shared_scan(scan_cache, scan_key, scan_scanner, **scan_config),
+        meta=scan_config
+    )
+    st.session_state.scan_job = {'id': job_id, 'config': scan_config}
+
+if st.session_state.get('scan_job'):
+    @fragment(run_every=2)
+    def poll_scan_job():
+        from scan_queue import QUEUED, RUNNING, DONE
         
-        # Run the scan with better error handling
-        try:
-            # Add a container for errors
-            error_container = st.container()
-            
-            results = st.session_state.scanner.scan_all_strategies(
-                tickers=tickers,
-                days=days_to_exp,
-                min_return=min_return
+        scan_queue = get_scan_queue()
+        scan_job = st.session_state.get('scan_job')
+        if not scan_job:
+            return
+        job = scan_queue.get(scan_job['id'])
+        scan_config = scan_job['config']
+        
+        if job is None:
+            # Expired from the queue before this session picked it up
+            st.session_state.scan_job = None
+            st.session_state.scan_flash = ('warning', "Scan results expired before they were loaded - please run the scan again")
+            st.rerun()
+        
+        if job.status in (QUEUED, RUNNING):
+            if job.status == QUEUED:
+                ahead = scan_queue.position(job.id)
+                st.info(f"⏳ Scan queued - {ahead} scan{'s' if ahead != 1 else ''} ahead of yours")
+            else:
+                st.info(
+                    f"🔍 Scanning {len(scan_config['tickers'])} tickers... "
+                    f"({time.time() - job.started_at:.0f}s)"
+                )
+            return
+        
+        st.session_state.scan_job = None
+        if job.status == DONE and job.result is not None and not job.result.empty:
+            store_results(st.session_state, job.result)
+            st.session_state.last_scan_config = scan_config
+            get_session_store(st.session_state).record(
+                job.result,
+                timestamp=datetime.fromtimestamp(job.finished_at),
+                tickers=scan_config['tickers']
             )
+            st.session_state.scan_flash = ('success', f"Found {len(job.result)} opportunities!")
+        elif job.status == DONE:
+            st.session_state.scan_flash = ('warning', """
+            No opportunities found. This could be because:
+            - The market is closed (options data may not be available)
+            - Rate limits on the API (try fewer tickers)
+            - The criteria is too restrictive (try lowering minimum return)
+            - Some tickers don't have options available
             
-            if not results.empty:
-                st.session_state.results = results
-                st.session_state.scan_history.append({
-                    'timestamp': datetime.now(),
-                    'tickers': tickers,
-                    'count': len(results)
-                })
-                progress_bar.progress(100)
-                status_text.text("✅ Scan complete!")
-                time.sleep(1)
-                progress_bar.empty()
-                status_text.empty()
-                st.success(f"Found {len(results)} opportunities!")
-            else:
-                progress_bar.empty()
-                status_text.empty()
-                st.warning("""
-                No opportunities found. This could be because:
-                - The market is closed (options data may not be available)
-                - Rate limits on the API (try fewer tickers)
-                - The criteria is too restrictive (try lowering minimum return)
-                - Some tickers don't have options available
-                
-                Try scanning SPY or AAPL individually first to test.
-                """)
-                
-        except Exception as e:
-            progress_bar.empty()
-            status_text.empty()
-            st.error(f"""
-            Error during scan: {str(e)[:200]}
+            Try scanning SPY or AAPL individually first to test.
+            """)
+        else:
+            st.session_state.scan_flash = ('error', f"""
+            Error during scan: {str(job.error)[:200]}
             
             Troubleshooting tips:
             - Try scanning just 1-2 tickers first (SPY or AAPL)
@@ -556,10 +391,21 @@ elif scan_button and st.session_state.scanner:
             - Your API key may have hit rate limits
             - Try again in a few seconds
             """)
+        # Full rerun so the results section (and this poller) reflect the finished job
+        st.rerun()
+    
+    poll_scan_job()
+
+# Outcome of a finished scan job, shown once
+if st.session_state.get('scan_flash'):
+    kind, message = st.session_state.pop('scan_flash')
+    getattr(st, kind)(message)
 
 # Display Results with Professional Styling
 if not st.session_state.results.empty:
     results = st.session_state.results
+    aggregates = get_aggregates(st.session_state)
+    overview = aggregates['overview']
     
     # Summary Metrics with gradient cards
     st.markdown('<h2 style="color: #ffffff; margin-bottom: 20px;">📊 Market Overview</h2>', unsafe_allow_html=True)
@@ -567,67 +413,69 @@ if not st.session_state.results.empty:
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        total_ops = len(results)
         st.metric(
             "Total Opportunities",
-            f"{total_ops:,}",
-            f"↑ {results['ticker'].nunique()} tickers",
+            f"{overview['total']:,}",
+            f"↑ {overview['ticker_count']} tickers",
             delta_color="normal"
         )
     
     with col2:
-        best_return = results['return'].max()
-        best_ticker = results.iloc[0]['ticker']
         st.metric(
             "Best Return",
-            f"{best_return:.1f}%",
-            f"{best_ticker}",
+            f"{overview['best_return']:.1f}%",
+            f"{overview['best_ticker']}",
             delta_color="normal"
         )
     
     with col3:
-        avg_return = results['return'].mean()
-        median_return = results['return'].median()
         st.metric(
             "Avg Return",
-            f"{avg_return:.1f}%",
-            f"Median: {median_return:.1f}%",
+            f"{overview['avg_return']:.1f}%",
+            f"Median: {overview['median_return']:.1f}%",
             delta_color="normal"
         )
     
     with col4:
-        strategy_count = results['strategy'].nunique()
-        top_strategy = results['strategy'].value_counts().index[0]
         st.metric(
             "Strategies",
-            strategy_count,
-            f"{top_strategy[:12]}...",
+            overview['strategy_count'],
+            f"{overview['top_strategy'][:12]}...",
             delta_color="normal"
         )
     
     with col5:
-        avg_dte = results['dte'].mean()
-        dte_range = f"{results['dte'].min()}-{results['dte'].max()}"
+        dte_range = f"{overview['min_dte']}-{overview['max_dte']}"
         st.metric(
             "Avg DTE",
-            f"{avg_dte:.0f}d",
+            f"{overview['avg_dte']:.0f}d",
             dte_range,
             delta_color="normal"
         )
     
+    report = memory_report(results)
+    st.caption(
+        f"💾 Results in memory: {report['total_mb']:.2f} MB "
+        f"({report['rows']:,} rows, {report['bytes_per_row']:.0f} bytes/row)"
+    )
+    
     st.markdown("---")
     
-    # Professional Tabs
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    # Professional views - only the selected one is rendered (st.tabs would run every tab's code)
+    views = [
         "🏆 Top Opportunities", 
         "📈 Market Analysis", 
         "🎯 Strategy Breakdown", 
         "🧮 Greeks & Volatility", 
+        "🔥 Market Greeks & Flow", 
         "📉 P&L Calculator", 
         "📋 Full Scanner"
-    ])
+    ]
+    active_view = st.radio("View", views, horizontal=True, label_visibility="collapsed", key="active_view")
     
-    with tab1:
+    if active_view == "🏆 Top Opportunities":
+        from results_export import EXPORT_FORMATS, export_results
+        
         st.subheader("🏆 Top 10 Opportunities")
         
         # Format top opportunities
@@ -643,7 +491,7 @@ if not st.session_state.results.empty:
         if any(greek in top_10.columns for greek in ['iv', 'delta', 'gamma', 'theta', 'vega']):
             col1, col2 = st.columns([3, 1])
             with col1:
-                st.success("🎯 Greeks and IV data available from Unusual Whales!")
+                st.success("🎯 Greeks and IV data available (provider data, Black-Scholes where missing)!")
             with col2:
                 show_greeks = st.checkbox("Show Greeks", value=True)
                 
@@ -652,6 +500,7 @@ if not st.session_state.results.empty:
         
         # Format dictionary
         format_dict = {
+            'expiration': '{:%Y-%m-%d}',
             'return': '{:.1f}%',
             'current_price': '${:.2f}',
             'strike': '${:.2f}',
@@ -668,7 +517,7 @@ if not st.session_state.results.empty:
         format_dict = {k: v for k, v in format_dict.items() if k in display_cols}
         
         # Style the dataframe
-        styled_df = top_10[display_cols].style.format(format_dict).background_gradient(
+        styled_df = top_10[display_cols].style.format(format_dict, na_rep='-').background_gradient(
             subset=['return'], cmap='RdYlGn'
         )
         
@@ -681,179 +530,57 @@ if not st.session_state.results.empty:
         # Quick actions
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("📥 Export to CSV"):
-                csv = results.to_csv(index=False)
+            export_format = st.selectbox("Export format:", list(EXPORT_FORMATS.keys()), key="export_format")
+            if st.button("📥 Export Results"):
+                # Encoded in chunks and cached per result, so repeat downloads are free
+                export_spec = EXPORT_FORMATS[export_format]
                 st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name=f"options_scan_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    mime="text/csv"
+                    label=f"Download {export_format}",
+                    data=export_results(results, st.session_state.results_fingerprint, export_format),
+                    file_name=f"options_scan_{datetime.now().strftime('%Y%m%d_%H%M')}.{export_spec['extension']}",
+                    mime=export_spec['mime']
                 )
         
-    with tab2:
-        st.markdown('<h3 style="color: #ffffff;">📈 Market Analysis</h3>', unsafe_allow_html=True)
+    elif active_view == "📈 Market Analysis":
+        import charts
+        from charts import cached_figure
         
-        # Configure Plotly dark theme
-        plotly_layout = dict(
-            plot_bgcolor='#1a1a2e',
-            paper_bgcolor='#1a1a2e',
-            font=dict(color='#e0e0e0'),
-            xaxis=dict(gridcolor='#2a2a3e', zerolinecolor='#2a2a3e'),
-            yaxis=dict(gridcolor='#2a2a3e', zerolinecolor='#2a2a3e'),
-        )
+        st.markdown('<h3 style="color: #ffffff;">📈 Market Analysis</h3>', unsafe_allow_html=True)
         
+        fingerprint = aggregates['fingerprint']
         col1, col2 = st.columns(2)
         
         with col1:
             # Return distribution with gradient
-            fig_hist = go.Figure()
-            fig_hist.add_trace(go.Histogram(
-                x=results['return'],
-                nbinsx=20,
-                marker=dict(
-                    color=results['return'],
-                    colorscale=[[0, '#667eea'], [0.5, '#00ff88'], [1, '#00d4ff']],
-                    line=dict(color='#3a3a4e', width=1)
-                ),
-                hovertemplate='Return: %{x:.1f}%<br>Count: %{y}<extra></extra>'
-            ))
-            fig_hist.update_layout(
-                title=dict(text="Return Distribution", font=dict(color='#00ff88')),
-                xaxis_title="Return (%)",
-                yaxis_title="Count",
-                height=350,
-                **plotly_layout
+            st.plotly_chart(
+                cached_figure(('return_hist', fingerprint), charts.return_histogram, results['return'].to_numpy()),
+                use_container_width=True
             )
-            st.plotly_chart(fig_hist, use_container_width=True)
             
             # Strategy breakdown - Modern donut chart
-            strategy_counts = results['strategy'].value_counts()
-            fig_pie = go.Figure(data=[go.Pie(
-                labels=strategy_counts.index,
-                values=strategy_counts.values,
-                hole=0.7,
-                marker=dict(
-                    colors=['#667eea', '#00ff88', '#00d4ff', '#ff6b6b', '#ffd93d', '#a8e6cf', '#ff8cc8', '#6bcf7f'],
-                    line=dict(color='#1a1a2e', width=2)
-                ),
-                textposition='outside',
-                textinfo='label+percent',
-                hovertemplate='%{label}<br>Count: %{value}<br>%{percent}<extra></extra>'
-            )])
-            
-            # Add center text
-            fig_pie.add_annotation(
-                text=f'{len(strategy_counts)}<br>Strategies',
-                x=0.5, y=0.5,
-                font=dict(size=20, color='#00ff88'),
-                showarrow=False
-            )
-            
-            fig_pie.update_layout(
-                title=dict(text="Strategy Distribution", font=dict(color='#00ff88')),
-                height=350,
-                showlegend=False,
-                **plotly_layout
+            st.plotly_chart(
+                cached_figure(('strategy_donut', fingerprint), charts.strategy_donut, aggregates['strategy_counts']),
+                use_container_width=True
             )
-            st.plotly_chart(fig_pie, use_container_width=True)
         
         with col2:
             # Returns by ticker - Modern bar chart
-            ticker_returns = results.groupby('ticker')['return'].agg(['mean', 'max', 'count'])
-            
-            fig_bar = go.Figure()
-            
-            # Add gradient bars
-            fig_bar.add_trace(go.Bar(
-                x=ticker_returns.index,
-                y=ticker_returns['max'],
-                name='Max Return',
-                marker=dict(
-                    color=ticker_returns['max'],
-                    colorscale=[[0, '#667eea'], [1, '#00ff88']],
-                    line=dict(color='#3a3a4e', width=1)
-                ),
-                hovertemplate='%{x}<br>Max: %{y:.1f}%<extra></extra>'
-            ))
-            
-            fig_bar.add_trace(go.Bar(
-                x=ticker_returns.index,
-                y=ticker_returns['mean'],
-                name='Avg Return',
-                marker=dict(
-                    color='#00d4ff',
-                    opacity=0.6,
-                    line=dict(color='#3a3a4e', width=1)
-                ),
-                hovertemplate='%{x}<br>Avg: %{y:.1f}%<extra></extra>'
-            ))
-            
-            fig_bar.update_layout(
-                title=dict(text="Returns by Ticker", font=dict(color='#00ff88')),
-                xaxis_title="Ticker",
-                yaxis_title="Return (%)",
-                barmode='group',
-                height=350,
-                showlegend=True,
-                legend=dict(
-                    bgcolor='rgba(26, 26, 46, 0.8)',
-                    bordercolor='#3a3a4e',
-                    borderwidth=1
-                ),
-                **plotly_layout
+            st.plotly_chart(
+                cached_figure(('ticker_returns', fingerprint), charts.ticker_return_bars, aggregates['ticker_returns']),
+                use_container_width=True
             )
-            st.plotly_chart(fig_bar, use_container_width=True)
             
             # DTE vs Return scatter - Modern style
-            fig_scatter = go.Figure()
-            
-            # Create color map for strategies
-            unique_strategies = results['strategy'].unique()
-            colors = ['#667eea', '#00ff88', '#00d4ff', '#ff6b6b', '#ffd93d', '#a8e6cf', '#ff8cc8', '#6bcf7f']
-            
-            for i, strategy in enumerate(unique_strategies):
-                strategy_data = results[results['strategy'] == strategy]
-                fig_scatter.add_trace(go.Scatter(
-                    x=strategy_data['dte'],
-                    y=strategy_data['return'],
-                    mode='markers',
-                    name=strategy[:15],
-                    marker=dict(
-                        size=10,
-                        color=colors[i % len(colors)],
-                        line=dict(color='#1a1a2e', width=1),
-                        symbol='circle'
-                    ),
-                    hovertemplate='%{text}<br>DTE: %{x}<br>Return: %{y:.1f}%<extra></extra>',
-                    text=strategy_data['ticker']
-                ))
-            
-            fig_scatter.update_layout(
-                title=dict(text="DTE vs Return Analysis", font=dict(color='#00ff88')),
-                xaxis_title="Days to Expiration",
-                yaxis_title="Return (%)",
-                height=350,
-                showlegend=True,
-                legend=dict(
-                    bgcolor='rgba(26, 26, 46, 0.8)',
-                    bordercolor='#3a3a4e',
-                    borderwidth=1,
-                    font=dict(size=10)
-                ),
-                **plotly_layout
+            st.plotly_chart(
+                cached_figure(('dte_scatter', fingerprint), charts.dte_return_scatter, aggregates['strategy_points']),
+                use_container_width=True
             )
-            st.plotly_chart(fig_scatter, use_container_width=True)
     
-    with tab3:
+    elif active_view == "🎯 Strategy Breakdown":
         st.subheader("🎯 Strategy Performance")
         
         # Strategy comparison
-        strategy_stats = results.groupby('strategy').agg({
-            'return': ['mean', 'max', 'min', 'std'],
-            'ticker': 'count'
-        }).round(1)
-        
-        strategy_stats.columns = ['Avg Return', 'Max Return', 'Min Return', 'Std Dev', 'Count']
+        strategy_stats = aggregates['strategy_stats']
         
         st.dataframe(
             strategy_stats.style.background_gradient(subset=['Avg Return'], cmap='RdYlGn'),
@@ -862,15 +589,18 @@ if not st.session_state.results.empty:
         
         # Best strategy for each ticker
         st.subheader("🏆 Best Strategy per Ticker")
-        best_per_ticker = results.loc[results.groupby('ticker')['return'].idxmax()]
+        best_per_ticker = aggregates['best_per_ticker']
         
         display_cols = ['ticker', 'strategy', 'return', 'expiration']
         st.dataframe(
-            best_per_ticker[display_cols].style.format({'return': '{:.1f}%'}),
+            best_per_ticker[display_cols].style.format({'return': '{:.1f}%', 'expiration': '{:%Y-%m-%d}'}, na_rep='-'),
             use_container_width=True
         )
     
-    with tab4:
+    elif active_view == "🧮 Greeks & Volatility":
+        import charts
+        from charts import cached_figure
+        
         st.subheader("🧮 Greeks & IV Analysis")
         
         # Check if Greeks data is available
@@ -904,20 +634,11 @@ if not st.session_state.results.empty:
                 
                 with col1:
                     # IV Distribution
-                    fig_iv = go.Figure()
-                    fig_iv.add_trace(go.Histogram(
-                        x=greeks_data['iv'],
-                        nbinsx=20,
-                        marker_color='orange',
-                        name='IV Distribution'
-                    ))
-                    fig_iv.update_layout(
-                        title="Implied Volatility Distribution",
-                        xaxis_title="IV (%)",
-                        yaxis_title="Count",
-                        height=350
+                    st.plotly_chart(
+                        cached_figure(('iv_hist', aggregates['fingerprint']), charts.iv_histogram,
+                                      greeks_data['iv'].to_numpy()),
+                        use_container_width=True
                     )
-                    st.plotly_chart(fig_iv, use_container_width=True)
                     
                     # High IV Opportunities
                     if len(greeks_data[greeks_data['iv'] > greeks_data['iv'].median()]) > 0:
@@ -936,23 +657,10 @@ if not st.session_state.results.empty:
                     # Greeks heatmap if available
                     if 'delta' in greeks_data.columns:
                         # Delta distribution by strategy
-                        fig_delta = go.Figure()
-                        for strategy in greeks_data['strategy'].unique():
-                            strategy_data = greeks_data[greeks_data['strategy'] == strategy]
-                            if 'delta' in strategy_data.columns:
-                                fig_delta.add_trace(go.Box(
-                                    y=strategy_data['delta'],
-                                    name=strategy[:15],  # Truncate long names
-                                    boxmean=True
-                                ))
-                        
-                        fig_delta.update_layout(
-                            title="Delta Distribution by Strategy",
-                            yaxis_title="Delta",
-                            height=350,
-                            showlegend=False
+                        st.plotly_chart(
+                            cached_figure(('delta_boxes', aggregates['fingerprint']), charts.delta_boxes, greeks_data),
+                            use_container_width=True
                         )
-                        st.plotly_chart(fig_delta, use_container_width=True)
                     
                     # Low IV Opportunities
                     if len(greeks_data[greeks_data['iv'] < greeks_data['iv'].median()]) > 0:
@@ -992,12 +700,13 @@ if not st.session_state.results.empty:
                             st.metric("Highest Decay", best_theta, 
                                      f"{greeks_data.nsmallest(1, 'theta')['theta'].values[0]:.3f}")
             else:
-                st.info("No Greeks data available. This data is provided by Unusual Whales API.")
+                st.info("No Greeks data available. IV could not be solved from the scanned premiums.")
         else:
             st.warning("""
             📊 Greeks and IV data not available with current data source.
             
-            To see Greeks and IV analysis:
+            Greeks are computed locally for single-leg trades with a strike and premium.
+            For provider Greeks on every trade:
             1. Add your Unusual Whales API key in the sidebar
             2. Re-run the scan
             
@@ -1008,7 +717,11 @@ if not st.session_state.results.empty:
             - Better entry/exit points
             """)
     
-    with tab6:
+    elif active_view == "📉 P&L Calculator":
+        import plotly.graph_objects as go
+        from portfolio import get_portfolio
+        from trade_simulation import leg_payoff, simulate_trades, trade_legs
+        
         st.subheader("📉 P&L Calculator")
         
         # Select a specific trade
@@ -1031,31 +744,13 @@ if not st.session_state.results.empty:
                 current_price = trade['current_price']
                 price_range = np.linspace(current_price * 0.8, current_price * 1.2, 100)
                 
-                # Calculate P&L based on strategy
-                pnl = []
-                strategy = trade['strategy']
-                
-                if strategy == 'Bull Call Spread':
-                    for price in price_range:
-                        if price <= trade['long_strike']:
-                            profit = -trade['debit']
-                        elif price >= trade['short_strike']:
-                            profit = trade['max_profit']
-                        else:
-                            profit = (price - trade['long_strike']) - trade['debit']
-                        pnl.append(profit * 100)
-                        
-                elif strategy == 'Cash-Secured Put':
-                    for price in price_range:
-                        if price >= trade['strike']:
-                            profit = trade['premium']
-                        else:
-                            profit = trade['premium'] - (trade['strike'] - price)
-                        pnl.append(profit * 100)
-                
+                # Calculate P&L from the trade's legs (flat line when they can't be reconstructed)
+                legs = trade_legs(trade)
+                if legs is not None:
+                    kinds, strikes, quantities = (np.array(column) for column in zip(*legs[0]))
+                    pnl = (leg_payoff(kinds, strikes, quantities, price_range) + legs[1]) * 100
                 else:
-                    # Default flat line for unsupported strategies
-                    pnl = [0] * len(price_range)
+                    pnl = np.zeros(len(price_range))
                 
                 # Create Plotly figure
                 fig = go.Figure()
@@ -1096,7 +791,8 @@ if not st.session_state.results.empty:
                 st.markdown(f"**Ticker:** {trade['ticker']}")
                 st.markdown(f"**Strategy:** {trade['strategy']}")
                 st.markdown(f"**Current Price:** ${trade['current_price']:.2f}")
-                st.markdown(f"**Expiration:** {trade['expiration']}")
+                expiration = trade['expiration']
+                st.markdown(f"**Expiration:** {expiration:%Y-%m-%d}" if pd.notna(expiration) else "**Expiration:** -")
                 st.markdown(f"**DTE:** {trade['dte']} days")
                 st.markdown(f"**Expected Return:** {trade['return']:.1f}%")
                 
@@ -1106,31 +802,126 @@ if not st.session_state.results.empty:
                     st.markdown(f"**Max Loss:** ${trade['max_loss']:.2f}")
                 if 'breakeven' in trade and pd.notna(trade['breakeven']):
                     st.markdown(f"**Breakeven:** ${trade['breakeven']:.2f}")
+                
+                risk = simulate_trades(results.iloc[[selected_trade_idx]]).iloc[0]
+                if pd.notna(risk['pop']):
+                    st.markdown("### Monte Carlo (at expiration)")
+                    st.markdown(f"**Probability of Profit:** {risk['pop']:.1f}%")
+                    st.markdown(f"**Expected Value:** ${risk['expected_value']:.2f}")
+                    st.markdown(f"**Tail Loss (worst 5%):** ${risk['tail_loss']:.2f}")
+            
+            # Portfolio of selected trades: combined Greeks and P&L surface
+            st.markdown("---")
+            st.subheader("🧺 Portfolio")
+            portfolio = get_portfolio(st.session_state)
+            
+            col1, col2, col3 = st.columns([1, 1, 2])
+            with col1:
+                contracts = st.number_input("Contracts", min_value=1, value=1, step=1, key="portfolio_contracts")
+            with col2:
+                if st.button("➕ Add to Portfolio", key="portfolio_add"):
+                    if portfolio.add(trade, int(contracts)) is None:
+                        st.warning(f"Can't build the legs of a {trade['strategy']} trade")
+            with col3:
+                remove_keys = st.multiselect("Remove positions:", list(portfolio.positions), key="portfolio_remove")
+                if remove_keys and st.button("➖ Remove Selected", key="portfolio_remove_button"):
+                    for key in remove_keys:
+                        portfolio.remove(key)
+                    st.rerun()
+            
+            if len(portfolio):
+                positions = pd.DataFrame([
+                    {'position': key, 'contracts': p['contracts'], 'net_cash': p['cash']}
+                    for key, p in portfolio.positions.items()
+                ])
+                st.dataframe(positions.style.format({'net_cash': '${:,.2f}'}), use_container_width=True, hide_index=True)
+                
+                greek_table = portfolio.greek_table()
+                total = greek_table.loc['Total']
+                col1, col2, col3, col4, col5 = st.columns(5)
+                col1.metric("Delta", f"{total['delta']:,.1f}")
+                col2.metric("Dollar Delta", f"${total['dollar_delta']:,.0f}")
+                col3.metric("Gamma", f"{total['gamma']:,.2f}")
+                col4.metric("Theta / day", f"${total['theta']:,.2f}")
+                col5.metric("Vega / 1% IV", f"${total['vega']:,.2f}")
+                if len(greek_table) > 2:
+                    st.dataframe(greek_table.style.format('{:,.2f}'), use_container_width=True)
+                
+                surface = portfolio.surface()
+                iv_shift = st.select_slider(
+                    "IV shift:", options=list(surface['iv_shifts']), value=0.0,
+                    format_func=lambda shift: f"{shift * 100:+.0f} pts", key="portfolio_iv_shift"
+                )
+                shift_idx = list(surface['iv_shifts']).index(iv_shift)
+                fig = go.Figure(go.Heatmap(
+                    x=surface['moves'] * 100,
+                    y=[f"+{day}d" for day in surface['days']],
+                    z=surface['pnl'][:, :, shift_idx].T,
+                    colorscale='RdYlGn',
+                    zmid=0,
+                    colorbar=dict(title="P&L ($)")
+                ))
+                fig.update_layout(
+                    title="Portfolio P&L by Underlying Move and Days Ahead",
+                    xaxis_title="Underlying Move (%)",
+                    yaxis_title="Days Ahead",
+                    height=400
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                
+                if st.button("🗑️ Clear Portfolio", key="portfolio_clear"):
+                    portfolio.clear()
+                    st.rerun()
+            else:
+                st.info("Add trades to see their combined Greeks and P&L surface")
     
-    with tab5:
+    elif active_view == "🔥 Market Greeks & Flow":
+        import charts
+        from charts import cached_figure, array_fingerprint
+        from exposure_aggregator import aggregate_exposure
+        
         st.markdown('<h3 style="color: #ffffff;">🔥 Market Greeks & Flow Analysis</h3>', unsafe_allow_html=True)
         
+        greek_cache = get_greek_data_cache()
+        has_uw = st.session_state.scanner and st.session_state.scanner.uw_key
+        
+        # Warm the shared cache for every selectable ticker so switching is instant
+        if has_uw:
+            greek_cache.prefetch(st.session_state.scanner, GREEK_TICKERS)
+        
         # Ticker selector for Greek analysis
         col1, col2 = st.columns([1, 3])
         with col1:
             greek_ticker = st.selectbox(
                 "Select Ticker for Greek Analysis:",
-                ["SPY", "QQQ", "AAPL", "MSFT", "NVDA", "TSLA", "AMD", "META"],
+                GREEK_TICKERS,
                 key="greek_ticker"
             )
             
             if st.button("🔄 Load Greek Data", key="load_greeks"):
                 with st.spinner(f"Loading Greek data for {greek_ticker}..."):
-                    if st.session_state.scanner and st.session_state.scanner.uw_key:
-                        # Get Greek exposure data
-                        exposure_data = st.session_state.scanner.get_greek_exposure(greek_ticker)
-                        flow_data = st.session_state.scanner.get_greek_flow(greek_ticker)
+                    if has_uw:
+                        # Exposure and flow are fetched in parallel and cached across sessions
+                        exposure_data, flow_data = greek_cache.get(
+                            st.session_state.scanner, greek_ticker, force=True
+                        )
                         
                         st.session_state['greek_exposure'] = exposure_data
                         st.session_state['greek_flow'] = flow_data
+                        st.session_state['greek_data_ticker'] = greek_ticker
+                        if flow_data:
+                            ingest_greek_flow(greek_ticker, flow_data)
                         st.success("Greek data loaded!")
                     else:
                         st.warning("Please configure Unusual Whales API key")
+            elif has_uw and st.session_state.get('greek_data_ticker') != greek_ticker:
+                # Ticker switched - use prefetched data if it's already there
+                cached = greek_cache.peek(st.session_state.scanner, greek_ticker)
+                if cached is not None:
+                    st.session_state['greek_exposure'], st.session_state['greek_flow'] = cached
+                    st.session_state['greek_data_ticker'] = greek_ticker
+                    if cached[1]:
+                        ingest_greek_flow(greek_ticker, cached[1])
         
         # Display Greek Heat Map
         if 'greek_exposure' in st.session_state and st.session_state['greek_exposure']:
@@ -1138,76 +929,36 @@ if not st.session_state.results.empty:
             
             exposure = st.session_state['greek_exposure']
             
-            # Create heat map data
-            strikes = []
-            call_deltas = []
-            put_deltas = []
-            call_gammas = []
-            put_gammas = []
+            # Spot from the scan results when this ticker was scanned
+            exposure_ticker = st.session_state.get('greek_data_ticker', greek_ticker)
+            spot_rows = results.loc[results['ticker'] == exposure_ticker, 'current_price']
+            spot = float(spot_rows.iloc[0]) if len(spot_rows) else None
             
-            for item in exposure[:20]:  # Limit to 20 strikes for visibility
-                strike = float(item.get('strike', 0))
-                if strike:
-                    strikes.append(strike)
-                    call_deltas.append(float(item.get('call_delta', 0)))
-                    put_deltas.append(float(item.get('put_delta', 0)))
-                    call_gammas.append(float(item.get('call_gamma', 0)))
-                    put_gammas.append(float(item.get('put_gamma', 0)))
+            # Aggregate the full chain, then chart the 20 strikes around spot
+            summary = aggregate_exposure(exposure, spot=spot)
             
-            if strikes:
-                # Create subplots for heat maps
-                fig = make_subplots(
-                    rows=2, cols=2,
-                    subplot_titles=('Call Delta Exposure', 'Put Delta Exposure', 
-                                   'Call Gamma Exposure', 'Put Gamma Exposure'),
-                    vertical_spacing=0.12,
-                    horizontal_spacing=0.1
-                )
-                
-                # Call Delta
-                fig.add_trace(
-                    go.Bar(x=strikes, y=call_deltas, 
-                          marker=dict(color=call_deltas, colorscale='RdYlGn'),
-                          name='Call Delta'),
-                    row=1, col=1
-                )
-                
-                # Put Delta
-                fig.add_trace(
-                    go.Bar(x=strikes, y=put_deltas,
-                          marker=dict(color=put_deltas, colorscale='RdYlGn_r'),
-                          name='Put Delta'),
-                    row=1, col=2
-                )
-                
-                # Call Gamma
-                fig.add_trace(
-                    go.Bar(x=strikes, y=call_gammas,
-                          marker=dict(color=call_gammas, colorscale='Viridis'),
-                          name='Call Gamma'),
-                    row=2, col=1
-                )
+            if summary:
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Net GEX", f"{summary['total_net_gamma']:,.0f}",
+                             "Long gamma" if summary['total_net_gamma'] > 0 else "Short gamma")
+                with col2:
+                    flip = summary['zero_gamma']
+                    st.metric("Zero Gamma", f"${flip:.2f}" if flip is not None else "n/a",
+                             f"{summary['strike_count']} strikes")
+                with col3:
+                    st.metric("Call Wall", f"${summary['call_wall']:.2f}")
+                with col4:
+                    st.metric("Put Wall", f"${summary['put_wall']:.2f}")
                 
-                # Put Gamma
-                fig.add_trace(
-                    go.Bar(x=strikes, y=put_gammas,
-                          marker=dict(color=put_gammas, colorscale='Viridis'),
-                          name='Put Gamma'),
-                    row=2, col=2
-                )
+                window = summary['window']
                 
-                fig.update_layout(
-                    height=600,
-                    showlegend=False,
-                    plot_bgcolor='#1a1a2e',
-                    paper_bgcolor='#1a1a2e',
-                    font=dict(color='#e0e0e0')
+                # Heat maps, memoized on the windowed exposure arrays
+                heatmap_key = ('exposure', exposure_ticker, array_fingerprint(*window.values()))
+                st.plotly_chart(
+                    cached_figure(heatmap_key, charts.exposure_heatmap, window),
+                    use_container_width=True
                 )
-                
-                fig.update_xaxes(title_text="Strike", gridcolor='#2a2a3e')
-                fig.update_yaxes(title_text="Exposure", gridcolor='#2a2a3e')
-                
-                st.plotly_chart(fig, use_container_width=True)
         
         # Display Greek Flow
         if 'greek_flow' in st.session_state and st.session_state['greek_flow']:
@@ -1253,46 +1004,44 @@ if not st.session_state.results.empty:
                         delta=f"{latest_flow.get('transactions', 0)} trades"
                     )
                 
+                # Rolling / cumulative flow from the stored history
+                flow_series = get_greek_flow_store().get(st.session_state.get('greek_data_ticker', greek_ticker))
+                
+                if flow_series is not None and len(flow_series):
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Cumulative Delta Flow", f"{flow_series.totals['total_delta_flow']:,.0f}",
+                                 f"{len(flow_series)} buckets")
+                    with col2:
+                        st.metric(f"Delta Flow ({flow_series.window} buckets)",
+                                 f"{flow_series.rolling('total_delta_flow'):,.0f}")
+                    with col3:
+                        st.metric(f"Vega Flow ({flow_series.window} buckets)",
+                                 f"{flow_series.rolling('total_vega_flow'):,.0f}")
+                    
+                    # Intraday flow chart - rebuilt only when new buckets arrive
+                    flow_key = ('flow', st.session_state.get('greek_data_ticker', greek_ticker), flow_series.count)
+                    st.plotly_chart(
+                        cached_figure(flow_key, lambda: charts.flow_chart(flow_series.frame())),
+                        use_container_width=True
+                    )
+                
                 # Flow Direction Gauge
                 st.markdown("### 🎯 Market Direction Indicator")
                 
-                # Calculate directional score (-100 to 100)
-                max_delta = 1000000  # Normalize factor
-                direction_score = min(100, max(-100, (total_delta / max_delta) * 100))
+                # Directional score (-100 to 100), scaled by this ticker's own flow history
+                if flow_series is not None and len(flow_series):
+                    direction_score = flow_series.sentiment_score()
+                else:
+                    max_delta = 1000000  # Normalize factor
+                    direction_score = min(100, max(-100, (total_delta / max_delta) * 100))
                 
                 # Create gauge chart
-                fig = go.Figure(go.Indicator(
-                    mode="gauge+number+delta",
-                    value=direction_score,
-                    title={'text': "Market Sentiment"},
-                    delta={'reference': 0},
-                    gauge={
-                        'axis': {'range': [-100, 100]},
-                        'bar': {'color': "#00ff88" if direction_score > 0 else "#ff6b6b"},
-                        'steps': [
-                            {'range': [-100, -50], 'color': '#ff0000'},
-                            {'range': [-50, -20], 'color': '#ff6b6b'},
-                            {'range': [-20, 20], 'color': '#ffff00'},
-                            {'range': [20, 50], 'color': '#90ee90'},
-                            {'range': [50, 100], 'color': '#00ff00'}
-                        ],
-                        'threshold': {
-                            'line': {'color': "white", 'width': 4},
-                            'thickness': 0.75,
-                            'value': direction_score
-                        }
-                    }
-                ))
-                
-                fig.update_layout(
-                    height=300,
-                    plot_bgcolor='#1a1a2e',
-                    paper_bgcolor='#1a1a2e',
-                    font=dict(color='#e0e0e0', size=16)
+                st.plotly_chart(
+                    cached_figure(('gauge', round(direction_score, 1)), charts.direction_gauge, round(direction_score, 1)),
+                    use_container_width=True
                 )
                 
-                st.plotly_chart(fig, use_container_width=True)
-                
                 # Interpretation
                 if direction_score > 50:
                     st.success("🚀 **STRONG BULLISH FLOW** - Smart money is aggressively buying calls")
@@ -1308,24 +1057,32 @@ if not st.session_state.results.empty:
         else:
             st.info("👆 Select a ticker and click 'Load Greek Data' to see heat maps and flow analysis")
     
-    with tab6:
+    elif active_view == "📋 Full Scanner":
+        from results_pager import PAGE_SIZES, get_pager, style_page
+        from trade_simulation import add_trade_risk
+        
         st.subheader("📋 All Results")
         
+        # Monte Carlo risk columns are simulated once per scan result, on request
+        if st.checkbox("🎲 Add probability of profit, expected value and tail loss", key="show_trade_risk"):
+            with st.spinner("Simulating expiration prices..."):
+                results = add_trade_risk(st.session_state)
+        
         # Filters
         col1, col2, col3 = st.columns(3)
         
         with col1:
             filter_ticker = st.multiselect(
                 "Filter by ticker:",
-                results['ticker'].unique(),
-                default=results['ticker'].unique()
+                list(results['ticker'].unique()),
+                default=list(results['ticker'].unique())
             )
         
         with col2:
             filter_strategy = st.multiselect(
                 "Filter by strategy:",
-                results['strategy'].unique(),
-                default=results['strategy'].unique()
+                list(results['strategy'].unique()),
+                default=list(results['strategy'].unique())
             )
         
         with col3:
@@ -1336,26 +1093,52 @@ if not st.session_state.results.empty:
                 value=int(results['return'].min())
             )
         
-        # Apply filters
-        filtered = results[
+        # Apply filters as a mask - rows are only materialized for the visible page
+        filter_mask = (
             (results['ticker'].isin(filter_ticker)) &
             (results['strategy'].isin(filter_strategy)) &
             (results['return'] >= min_return_filter)
-        ]
-        
-        st.markdown(f"Showing {len(filtered)} of {len(results)} results")
+        ).to_numpy()
         
         # Determine which columns to show
         base_cols = ['ticker', 'strategy', 'expiration', 'dte', 'return', 'current_price']
         
         # Add optional columns if they exist
         optional_cols = ['strike', 'premium', 'breakeven', 'iv', 'delta', 'gamma', 'theta', 
-                        'volume', 'open_interest', 'max_profit', 'max_loss']
+                        'volume', 'open_interest', 'max_profit', 'max_loss',
+                        'pop', 'expected_value', 'tail_loss', 'risk_adjusted']
+        
+        display_cols = base_cols + [col for col in optional_cols if col in results.columns]
+        
+        # Sorting and paging controls
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            sort_by = st.selectbox("Sort by:", display_cols, index=display_cols.index('return'))
+        with col2:
+            sort_ascending = st.checkbox("Ascending", value=False)
+        with col3:
+            page_size = st.selectbox("Rows per page:", PAGE_SIZES, index=1)
         
-        display_cols = base_cols + [col for col in optional_cols if col in filtered.columns]
+        pager = get_pager(st.session_state)
+        matching = int(filter_mask.sum())
+        page_count = max(1, -(-matching // page_size))
+        # Keyed on the page count so a narrower filter resets to page 1 instead of overflowing
+        page_number = st.number_input(
+            "Page", min_value=1, max_value=page_count, value=1, step=1,
+            key=f"scanner_page_{page_count}"
+        )
+        
+        page_df, matching, page_count = pager.page(filter_mask, sort_by, sort_ascending, page_number, page_size)
+        
+        first_row = (page_number - 1) * page_size + 1 if matching else 0
+        st.markdown(
+            f"Showing {first_row}-{first_row + len(page_df) - 1 if matching else 0} of {matching} matching "
+            f"({len(results)} total) · page {page_number} of {page_count}"
+        )
         
         # Format the dataframe
         format_dict = {
+            'expiration': '{:%Y-%m-%d}',
             'return': '{:.1f}%',
             'current_price': '${:.2f}',
             'strike': '${:.2f}',
@@ -1369,7 +1152,11 @@ if not st.session_state.results.empty:
             'theta': '{:.3f}',
             'vega': '{:.3f}',
             'upside': '{:.1f}%',
-            'if_called': '{:.1f}%'
+            'if_called': '{:.1f}%',
+            'pop': '{:.1f}%',
+            'expected_value': '${:.2f}',
+            'tail_loss': '${:.2f}',
+            'risk_adjusted': '{:.2f}'
         }
         
         # Only apply formats for columns that exist
@@ -1379,14 +1166,9 @@ if not st.session_state.results.empty:
         if 'iv' in display_cols or 'delta' in display_cols:
             st.info("📊 Greeks and IV data available! Scroll right to see all columns.")
         
-        # Display filtered results
+        # Display the current page only (gradient ranges come from the full result)
         st.dataframe(
-            filtered[display_cols].style.format(format_dict).background_gradient(
-                subset=['return'], cmap='RdYlGn'
-            ).background_gradient(
-                subset=['iv'] if 'iv' in display_cols else [], 
-                cmap='YlOrRd'
-            ),
+            style_page(page_df[display_cols], format_dict, pager.gradient_ranges),
             use_container_width=True,
             height=600
         )
@@ -1403,7 +1185,80 @@ st.markdown("""
     if st.session_state.scan_history else "No scans yet"
 ), unsafe_allow_html=True)
 
-# Auto-refresh option
-if st.sidebar.checkbox("Auto-refresh (5 min)", value=False):
-    time.sleep(300)
-    st.rerun()
+# Auto-refresh option - the scan runs in a shared background job, this session only polls for new results
+refresh_scheduler = get_refresh_scheduler()
+auto_refresh = st.sidebar.checkbox("Auto-refresh (5 min)", value=False)
+last_config = st.session_state.get('last_scan_config')
+
+if auto_refresh and last_config and st.session_state.scanner:
+    session_id = st.session_state.session_id
+    refresh_key = config_key(
+        last_config['tickers'], last_config['days'], last_config['min_return'], polygon_key, uw_key
+    )
+    refresh_scanner = st.session_state.scanner
+    refresh_cache = get_node_cache()
+    refresh_scheduler.watch(
+        session_id, refresh_key,
+        lambda: shared_scan(refresh_cache, refresh_key, refresh_scanner, **last_config)
+    )
+    
+    @fragment(run_every=15)
+    def poll_auto_refresh():
+        version, refreshed, refreshed_at = refresh_scheduler.poll(session_id, refresh_key)
+        if refreshed is not None and (refresh_key, version) != st.session_state.get('refresh_version'):
+            st.session_state.refresh_version = (refresh_key, version)
+            store_results(st.session_state, refreshed)
+            get_session_store(st.session_state).record(
+                refreshed,
+                timestamp=refreshed_at,
+                tickers=last_config['tickers'],
+                auto_refresh=True
+            )
+            st.rerun()
+        refresh_error = refresh_scheduler.last_error(refresh_key)
+        if refresh_error is not None:
+            st.warning(f"Auto-refresh failed: {refresh_error}")
+        st.caption(
+            f"🔄 Last auto-refresh: {refreshed_at:%H:%M:%S}" if refreshed_at
+            else "🔄 Auto-refresh scheduled"
+        )
+    
+    with st.sidebar:
+        poll_auto_refresh()
+else:
+    refresh_scheduler.unwatch(st.session_state.session_id)
+    if auto_refresh:
+        st.sidebar.caption("Run a scan first to enable auto-refresh")
+
+# Past scans (reloaded from disk if they were spilled) and this session's memory use
+with st.sidebar:
+    with st.expander("📜 Scan History"):
+        def history_label(entry_id):
+            entry = session_store.entry(entry_id)
+            label = f"{entry['timestamp']:%H:%M:%S} · {len(entry['tickers'])} tickers · {entry['count']} results"
+            if entry.get('auto_refresh'):
+                label += " · 🔄"
+            if not session_store.in_memory(entry_id):
+                label += " · 💾 on disk"
+            return label
+        
+        past_scans = [entry['id'] for entry in reversed(session_store.history)]
+        if past_scans:
+            history_id = st.selectbox("Past scans:", past_scans, format_func=history_label, key="history_scan")
+            if st.button("📂 Load Scan", key="history_load"):
+                past_results = session_store.load(history_id)
+                if past_results is None:
+                    st.warning("That scan is no longer available")
+                else:
+                    store_results(st.session_state, past_results)
+                    st.rerun()
+        else:
+            st.caption("No scans yet")
+        
+        memory = session_store.report(st.session_state)
+        st.caption(
+            f"🧠 Session memory: {memory['total_mb']:.1f} / {memory['budget_mb']:.0f} MB "
+            f"(results {memory['results_mb']:.1f} MB, Greek data {memory['greek_mb']:.1f} MB) · "
+            f"{memory['scans_in_memory']} scans in memory, {memory['scans_on_disk']} on disk "
+            f"({memory['spilled_mb']:.1f} MB)"
+        )
@@ -0,0 +1,361 @@
+"""
+Plotly figure builders for the dashboard
+Figures are built only when their view is shown and memoized as plain figure specs, keyed by
+the result fingerprint (or the payload they plot), so widget changes don't rebuild them.
+Large point sets are pre-binned, pre-summarized or downsampled onto WebGL traces.
+"""
+
+from collections import OrderedDict
+import hashlib
+import threading
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+PLOTLY_LAYOUT = dict(
+    plot_bgcolor='#1a1a2e',
+    paper_bgcolor='#1a1a2e',
+    font=dict(color='#e0e0e0'),
+    xaxis=dict(gridcolor='#2a2a3e', zerolinecolor='#2a2a3e'),
+    yaxis=dict(gridcolor='#2a2a3e', zerolinecolor='#2a2a3e'),
+)
+
+STRATEGY_COLORS = ['#667eea', '#00ff88', '#00d4ff', '#ff6b6b', '#ffd93d', '#a8e6cf', '#ff8cc8', '#6bcf7f']
+
+WEBGL_THRESHOLD = 1000  # points per trace before switching to Scattergl
+MAX_SCATTER_POINTS = 5000  # points per trace sent to the browser
+HISTOGRAM_BINS = 20
+
+
+class FigureCache:
+    """LRU of figure specs (dicts) shared by all sessions; keys carry the data fingerprint"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, builder, *args, **kwargs):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+
+        spec = builder(*args, **kwargs).to_dict()
+
+        with self._lock:
+            self._data[key] = spec
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return spec
+
+
+_figure_cache = FigureCache()
+
+
+def cached_figure(key, builder, *args, **kwargs):
+    """Memoized figure spec for `key`, built with builder(*args, **kwargs) on a miss"""
+    return _figure_cache.get(key, builder, *args, **kwargs)
+
+
+def array_fingerprint(*arrays):
+    digest = hashlib.blake2b(digest_size=12)
+    for values in arrays:
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+def downsample_indices(values, max_points=MAX_SCATTER_POINTS):
+    """Evenly strided sample that always keeps the extremes"""
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    keep = np.linspace(0, n - 1, max_points - 2).astype(np.int64)
+    return np.unique(np.concatenate([keep, [np.nanargmin(values), np.nanargmax(values)]]))
+
+
+def _binned_bars(values, **marker):
+    """Histogram binned server-side so only bin counts are sent to the browser"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    centers = (edges[:-1] + edges[1:]) / 2
+    return go.Bar(
+        x=centers,
+        y=counts,
+        width=np.diff(edges),
+        marker=marker or None,
+        hovertemplate='%{x:.1f}<br>Count: %{y}<extra></extra>'
+    ), centers
+
+
+def return_histogram(returns):
+    bars, centers = _binned_bars(
+        returns,
+        colorscale=[[0, '#667eea'], [0.5, '#00ff88'], [1, '#00d4ff']],
+        line=dict(color='#3a3a4e', width=1)
+    )
+    bars.marker.color = centers
+    bars.hovertemplate = 'Return: %{x:.1f}%<br>Count: %{y}<extra></extra>'
+    fig = go.Figure(bars)
+    fig.update_layout(
+        title=dict(text="Return Distribution", font=dict(color='#00ff88')),
+        xaxis_title="Return (%)",
+        yaxis_title="Count",
+        bargap=0,
+        height=350,
+        **PLOTLY_LAYOUT
+    )
+    return fig
+
+
+def strategy_donut(strategy_counts):
+    fig = go.Figure(data=[go.Pie(
+        labels=list(strategy_counts.index),
+        values=strategy_counts.values,
+        hole=0.7,
+        marker=dict(
+            colors=STRATEGY_COLORS,
+            line=dict(color='#1a1a2e', width=2)
+        ),
+        textposition='outside',
+        textinfo='label+percent',
+        hovertemplate='%{label}<br>Count: %{value}<br>%{percent}<extra></extra>'
+    )])
+
+    # Add center text
+    fig.add_annotation(
+        text=f'{len(strategy_counts)}<br>Strategies',
+        x=0.5, y=0.5,
+        font=dict(size=20, color='#00ff88'),
+        showarrow=False
+    )
+
+    fig.update_layout(
+        title=dict(text="Strategy Distribution", font=dict(color='#00ff88')),
+        height=350,
+        showlegend=False,
+        **PLOTLY_LAYOUT
+    )
+    return fig
+
+
+def ticker_return_bars(ticker_returns):
+    tickers = [str(t) for t in ticker_returns.index]
+    fig = go.Figure()
+
+    # Add gradient bars
+    fig.add_trace(go.Bar(
+        x=tickers,
+        y=ticker_returns['max'],
+        name='Max Return',
+        marker=dict(
+            color=ticker_returns['max'],
+            colorscale=[[0, '#667eea'], [1, '#00ff88']],
+            line=dict(color='#3a3a4e', width=1)
+        ),
+        hovertemplate='%{x}<br>Max: %{y:.1f}%<extra></extra>'
+    ))
+
+    fig.add_trace(go.Bar(
+        x=tickers,
+        y=ticker_returns['mean'],
+        name='Avg Return',
+        marker=dict(
+            color='#00d4ff',
+            opacity=0.6,
+            line=dict(color='#3a3a4e', width=1)
+        ),
+        hovertemplate='%{x}<br>Avg: %{y:.1f}%<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=dict(text="Returns by Ticker", font=dict(color='#00ff88')),
+        xaxis_title="Ticker",
+        yaxis_title="Return (%)",
+        barmode='group',
+        height=350,
+        showlegend=True,
+        legend=dict(
+            bgcolor='rgba(26, 26, 46, 0.8)',
+            bordercolor='#3a3a4e',
+            borderwidth=1
+        ),
+        **PLOTLY_LAYOUT
+    )
+    return fig
+
+
+def dte_return_scatter(strategy_points):
+    fig = go.Figure()
+
+    for i, (strategy, points) in enumerate(strategy_points.items()):
+        # WebGL + downsampling once a strategy has too many points for SVG
+        large = len(points['return']) > WEBGL_THRESHOLD
+        trace = go.Scattergl if large else go.Scatter
+        keep = downsample_indices(points['return'])
+        fig.add_trace(trace(
+            x=points['dte'][keep],
+            y=points['return'][keep],
+            mode='markers',
+            name=str(strategy)[:15],
+            marker=dict(
+                size=6 if large else 10,
+                color=STRATEGY_COLORS[i % len(STRATEGY_COLORS)],
+                line=dict(color='#1a1a2e', width=1),
+                symbol='circle'
+            ),
+            hovertemplate='%{text}<br>DTE: %{x}<br>Return: %{y:.1f}%<extra></extra>',
+            text=points['ticker'][keep]
+        ))
+
+    fig.update_layout(
+        title=dict(text="DTE vs Return Analysis", font=dict(color='#00ff88')),
+        xaxis_title="Days to Expiration",
+        yaxis_title="Return (%)",
+        height=350,
+        showlegend=True,
+        legend=dict(
+            bgcolor='rgba(26, 26, 46, 0.8)',
+            bordercolor='#3a3a4e',
+            borderwidth=1,
+            font=dict(size=10)
+        ),
+        **PLOTLY_LAYOUT
+    )
+    return fig
+
+
+def iv_histogram(iv):
+    bars, _ = _binned_bars(iv, color='orange')
+    bars.name = 'IV Distribution'
+    bars.hovertemplate = 'IV: %{x:.1f}%<br>Count: %{y}<extra></extra>'
+    fig = go.Figure(bars)
+    fig.update_layout(
+        title="Implied Volatility Distribution",
+        xaxis_title="IV (%)",
+        yaxis_title="Count",
+        bargap=0,
+        height=350
+    )
+    return fig
+
+
+def delta_boxes(greeks_data):
+    """Box plots from precomputed quartiles, so raw deltas never go to the browser"""
+    fig = go.Figure()
+    for strategy, deltas in greeks_data.groupby('strategy', observed=True)['delta']:
+        values = deltas.dropna().to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            continue
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        fig.add_trace(go.Box(
+            name=str(strategy)[:15],  # Truncate long names
+            q1=[q1], median=[median], q3=[q3],
+            lowerfence=[max(values.min(), q1 - 1.5 * iqr)],
+            upperfence=[min(values.max(), q3 + 1.5 * iqr)],
+            mean=[values.mean()],
+            boxmean=True
+        ))
+
+    fig.update_layout(
+        title="Delta Distribution by Strategy",
+        yaxis_title="Delta",
+        height=350,
+        showlegend=False
+    )
+    return fig
+
+
+def exposure_heatmap(window):
+    strikes = window['strike']
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Call Delta Exposure', 'Put Delta Exposure',
+                       'Call Gamma Exposure', 'Put Gamma Exposure'),
+        vertical_spacing=0.12,
+        horizontal_spacing=0.1
+    )
+
+    panels = [
+        ('call_delta', 'Call Delta', 'RdYlGn', 1, 1),
+        ('put_delta', 'Put Delta', 'RdYlGn_r', 1, 2),
+        ('call_gamma', 'Call Gamma', 'Viridis', 2, 1),
+        ('put_gamma', 'Put Gamma', 'Viridis', 2, 2)
+    ]
+    for field, name, colorscale, row, col in panels:
+        fig.add_trace(
+            go.Bar(x=strikes, y=window[field],
+                  marker=dict(color=window[field], colorscale=colorscale),
+                  name=name),
+            row=row, col=col
+        )
+
+    fig.update_layout(
+        height=600,
+        showlegend=False,
+        plot_bgcolor='#1a1a2e',
+        paper_bgcolor='#1a1a2e',
+        font=dict(color='#e0e0e0')
+    )
+
+    fig.update_xaxes(title_text="Strike", gridcolor='#2a2a3e')
+    fig.update_yaxes(title_text="Exposure", gridcolor='#2a2a3e')
+    return fig
+
+
+def flow_chart(flow_frame):
+    large = len(flow_frame) > WEBGL_THRESHOLD
+    trace = go.Scattergl if large else go.Scatter
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(trace(
+        x=flow_frame['time'], y=flow_frame['cum_total_delta_flow'],
+        name='Cumulative Delta', line=dict(color='#00ff88', width=2)
+    ), secondary_y=False)
+    fig.add_trace(trace(
+        x=flow_frame['time'], y=flow_frame['rolling_total_vega_flow'],
+        name='Rolling Vega', line=dict(color='#00d4ff', width=1)
+    ), secondary_y=True)
+    fig.update_layout(
+        title="Intraday Greek Flow",
+        height=320,
+        plot_bgcolor='#1a1a2e',
+        paper_bgcolor='#1a1a2e',
+        font=dict(color='#e0e0e0')
+    )
+    return fig
+
+
+def direction_gauge(direction_score):
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=direction_score,
+        title={'text': "Market Sentiment"},
+        delta={'reference': 0},
+        gauge={
+            'axis': {'range': [-100, 100]},
+            'bar': {'color': "#00ff88" if direction_score > 0 else "#ff6b6b"},
+            'steps': [
+                {'range': [-100, -50], 'color': '#ff0000'},
+                {'range': [-50, -20], 'color': '#ff6b6b'},
+                {'range': [-20, 20], 'color': '#ffff00'},
+                {'range': [20, 50], 'color': '#90ee90'},
+                {'range': [50, 100], 'color': '#00ff00'}
+            ],
+            'threshold': {
+                'line': {'color': "white", 'width': 4},
+                'thickness': 0.75,
+                'value': direction_score
+            }
+        }
+    ))
+
+    fig.update_layout(
+        height=300,
+        plot_bgcolor='#1a1a2e',
+        paper_bgcolor='#1a1a2e',
+        font=dict(color='#e0e0e0', size=16)
+    )
+    return fig
@@ -0,0 +1,89 @@
+"""
+Vectorized Greek exposure aggregation
+Turns the full get_greek_exposure payload into per-strike arrays once, then derives net
+GEX/DEX, the zero-gamma flip level, call/put walls and a strike window around spot
+"""
+
+import numpy as np
+import pandas as pd
+
+EXPOSURE_FIELDS = ['call_delta', 'put_delta', 'call_gamma', 'put_gamma']
+DEFAULT_WINDOW = 20  # strikes shown around spot
+
+
+def exposure_arrays(payload):
+    """Per-strike exposure arrays (duplicate strikes across expirations are summed)"""
+    frame = pd.DataFrame(payload or [])
+    if frame.empty or 'strike' not in frame.columns:
+        return None
+
+    strikes = pd.to_numeric(frame['strike'], errors='coerce').to_numpy(dtype=np.float64)
+    keep = np.isfinite(strikes) & (strikes > 0)
+    if not keep.any():
+        return None
+
+    unique_strikes, inverse = np.unique(strikes[keep], return_inverse=True)
+    arrays = {'strike': unique_strikes}
+    for field in EXPOSURE_FIELDS:
+        if field in frame.columns:
+            values = pd.to_numeric(frame[field], errors='coerce').to_numpy(dtype=np.float64)[keep]
+            values = np.nan_to_num(values)
+        else:
+            values = np.zeros(keep.sum())
+        arrays[field] = np.bincount(inverse, weights=values, minlength=len(unique_strikes))
+
+    # Put exposures come back signed from the provider, so net = call + put
+    arrays['net_gamma'] = arrays['call_gamma'] + arrays['put_gamma']
+    arrays['net_delta'] = arrays['call_delta'] + arrays['put_delta']
+    return arrays
+
+
+def zero_gamma_level(strikes, net_gamma, spot=None):
+    """
+    Strike where cumulative net gamma changes sign, interpolated between strikes.
+    With several crossings the one closest to spot wins.
+    """
+    cumulative = np.cumsum(net_gamma)
+    sign = np.sign(cumulative)
+    crossings = np.nonzero(sign[:-1] * sign[1:] < 0)[0]
+    if len(crossings) == 0:
+        return None
+
+    left, right = cumulative[crossings], cumulative[crossings + 1]
+    levels = strikes[crossings] + (strikes[crossings + 1] - strikes[crossings]) * (-left / (right - left))
+    if spot is None:
+        return float(levels[np.argmin(np.abs(levels - np.median(strikes)))])
+    return float(levels[np.argmin(np.abs(levels - spot))])
+
+
+def strike_window(strikes, center, size=DEFAULT_WINDOW):
+    """Slice covering `size` strikes centered on `center`"""
+    if len(strikes) <= size:
+        return slice(0, len(strikes))
+    mid = int(np.searchsorted(strikes, center))
+    start = min(max(mid - size // 2, 0), len(strikes) - size)
+    return slice(start, start + size)
+
+
+def aggregate_exposure(payload, spot=None, window=DEFAULT_WINDOW):
+    """Full-chain exposure summary plus the windowed arrays used for the heat map"""
+    arrays = exposure_arrays(payload)
+    if arrays is None:
+        return None
+
+    strikes = arrays['strike']
+    flip = zero_gamma_level(strikes, arrays['net_gamma'], spot)
+    center = spot if spot else (flip if flip is not None else float(np.median(strikes)))
+    view = strike_window(strikes, center, window)
+
+    return {
+        'strike_count': len(strikes),
+        'spot': spot,
+        'total_net_gamma': float(arrays['net_gamma'].sum()),
+        'total_net_delta': float(arrays['net_delta'].sum()),
+        'zero_gamma': flip,
+        'call_wall': float(strikes[np.argmax(np.abs(arrays['call_gamma']))]),
+        'put_wall': float(strikes[np.argmax(np.abs(arrays['put_gamma']))]),
+        'full': arrays,
+        'window': {key: values[view] for key, values in arrays.items()}
+    }
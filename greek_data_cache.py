@@ -0,0 +1,97 @@
+"""
+Cross-session cache for Greek exposure / flow payloads
+Both endpoints are fetched in parallel, cached by (ticker, API key) with a short TTL,
+de-duplicated while in flight, and the Market Greeks tickers can be prefetched in the background.
+With a shared cache, payloads are also shared with the other worker processes on the node.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from shared_cache import cache_key
+
+GREEK_TICKERS = ["SPY", "QQQ", "AAPL", "MSFT", "NVDA", "TSLA", "AMD", "META"]
+DEFAULT_TTL = 60  # seconds
+
+
+class GreekDataCache:
+    """TTL cache of (exposure, flow) per ticker and API key shared by all sessions in the process"""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_workers=4, shared=None):
+        self.ttl = ttl
+        self.shared = shared  # shared_cache.SharedCache or None
+        # Keyed per credential like the shared entries, so sessions never see another key's data
+        self._entries = {}  # (ticker, key hash) -> (fetched_at, exposure, flow)
+        self._inflight = {}  # (ticker, key hash) -> Future
+        self._lock = threading.Lock()
+        # Separate pools so prefetch jobs never wait on their own pool for the endpoint calls
+        self._loader_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='greek-load')
+        self._request_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='greek-req')
+
+    @staticmethod
+    def _key(scanner, ticker):
+        return ticker, cache_key(getattr(scanner, 'uw_key', None))
+
+    def peek(self, scanner, ticker):
+        """Fresh (exposure, flow) cached for the scanner's API key, or None, without fetching"""
+        with self._lock:
+            entry = self._entries.get(self._key(scanner, ticker))
+        if entry and time.time() - entry[0] < self.ttl:
+            return entry[1], entry[2]
+        return None
+
+    def get(self, scanner, ticker, force=False):
+        """Cached (exposure, flow), fetching both endpoints in parallel when stale"""
+        if not force:
+            cached = self.peek(scanner, ticker)
+            if cached is not None:
+                return cached
+        return self._submit(scanner, ticker, force).result()
+
+    def prefetch(self, scanner, tickers=GREEK_TICKERS):
+        """Warm the cache in the background for any ticker that is missing or stale"""
+        for ticker in tickers:
+            if self.peek(scanner, ticker) is None:
+                self._submit(scanner, ticker)
+
+    def _submit(self, scanner, ticker, force=False):
+        key = self._key(scanner, ticker)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None and not (force and future.done()):
+                return future
+            future = self._loader_pool.submit(self._load, scanner, ticker, force)
+            self._inflight[key] = future
+        # Outside the lock: a future that is already done runs the callback (and _finish) right here
+        future.add_done_callback(lambda f, k=key: self._finish(k, f))
+        return future
+
+    def _finish(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _load(self, scanner, ticker, force=False):
+        key = self._key(scanner, ticker)
+        shared_key = cache_key('greeks', ticker, getattr(scanner, 'uw_key', None))
+        if self.shared is not None and not force:
+            entry = self.shared.get(shared_key)
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry  # Keeps the original fetch time, so the TTL isn't extended
+                return entry[1], entry[2]
+
+        exposure_future = self._request_pool.submit(scanner.get_greek_exposure, ticker)
+        flow_future = self._request_pool.submit(scanner.get_greek_flow, ticker)
+        exposure = exposure_future.result()
+        flow = flow_future.result()
+
+        # Don't cache empty payloads (rate limits, closed market) so the next request retries
+        if exposure or flow:
+            entry = (time.time(), exposure, flow)
+            with self._lock:
+                self._entries[key] = entry
+            if self.shared is not None:
+                self.shared.set(shared_key, entry, ttl=self.ttl)
+        return exposure, flow
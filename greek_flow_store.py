@@ -0,0 +1,137 @@
+"""
+Rolling time-series store for Greek flow buckets
+Keeps every get_greek_flow bucket per ticker in a fixed-size ring buffer, maintains
+cumulative and rolling-window flow incrementally and normalizes the sentiment gauge
+against each ticker's own history
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+FLOW_FIELDS = ['total_delta_flow', 'total_vega_flow', 'dir_delta_flow', 'volume']
+DEFAULT_CAPACITY = 4096  # ~5 trading days of 1-minute buckets
+DEFAULT_WINDOW = 30  # buckets in the rolling window
+MIN_HISTORY = 10  # buckets needed before the gauge uses the ticker's own scale
+FALLBACK_SCALE = 1000000  # Previous fixed normalization, used until history builds up
+
+
+def _bucket_time(bucket):
+    for key in ('timestamp', 'tape_time', 'date'):
+        if bucket.get(key):
+            stamp = pd.Timestamp(bucket[key])
+            if stamp.tzinfo is None:
+                stamp = stamp.tz_localize('UTC')
+            return stamp.value
+    return None
+
+
+class FlowSeries:
+    """Ring buffer of flow buckets for one ticker with incremental running sums"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, window=DEFAULT_WINDOW):
+        self.capacity = capacity
+        self.window = window
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.values = {field: np.zeros(capacity) for field in FLOW_FIELDS}
+        # Cumulative sums since the first bucket ever seen; rolling sums are differences of these
+        self.cumulative = {field: np.zeros(capacity) for field in FLOW_FIELDS}
+        self.totals = {field: 0.0 for field in FLOW_FIELDS}
+        self.count = 0  # buckets ever appended
+        self.last_time = None
+
+    def append(self, timestamp, bucket):
+        slot = self.count % self.capacity
+        self.times[slot] = timestamp
+        for field in FLOW_FIELDS:
+            value = float(bucket.get(field) or 0)
+            self.totals[field] += value
+            self.values[field][slot] = value
+            self.cumulative[field][slot] = self.totals[field]
+        self.count += 1
+        self.last_time = timestamp
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _order(self):
+        """Slot indices in chronological order"""
+        size = len(self)
+        start = self.count - size
+        return (np.arange(start, self.count) % self.capacity)
+
+    def rolling(self, field, window=None):
+        """Rolling-window sum for the latest bucket, from the cumulative totals"""
+        window = window or self.window
+        size = len(self)
+        if size == 0:
+            return 0.0
+        latest = self.cumulative[field][(self.count - 1) % self.capacity]
+        if size <= window:
+            first = self.cumulative[field][(self.count - size) % self.capacity] - self.values[field][(self.count - size) % self.capacity]
+            return float(latest - first)
+        return float(latest - self.cumulative[field][(self.count - 1 - window) % self.capacity])
+
+    def latest(self):
+        if not self.count:
+            return None
+        slot = (self.count - 1) % self.capacity
+        return {field: float(self.values[field][slot]) for field in FLOW_FIELDS}
+
+    def sentiment_score(self, field='total_delta_flow'):
+        """Latest flow scaled to -100..100 by the 95th percentile of this ticker's |flow| history"""
+        latest = self.latest()
+        if latest is None:
+            return 0.0
+        history = np.abs(self.values[field][self._order()])
+        scale = np.percentile(history, 95) if len(history) >= MIN_HISTORY else FALLBACK_SCALE
+        scale = scale if scale > 0 else FALLBACK_SCALE
+        return float(np.clip(latest[field] / scale * 100, -100, 100))
+
+    def frame(self, since=None):
+        """Chronological frame with cumulative and rolling flow, optionally only buckets after `since`"""
+        order = self._order()
+        times = self.times[order]
+        if since is not None:
+            keep = times > since
+            order, times = order[keep], times[keep]
+
+        data = {'time': pd.to_datetime(times, utc=True)}
+        for field in FLOW_FIELDS:
+            data[field] = self.values[field][order]
+            data[f'cum_{field}'] = self.cumulative[field][order]
+        frame = pd.DataFrame(data)
+        for field in ('total_delta_flow', 'total_vega_flow'):
+            frame[f'rolling_{field}'] = frame[field].rolling(self.window, min_periods=1).sum()
+        return frame
+
+
+class GreekFlowStore:
+    """Per-ticker flow series shared across sessions"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, window=DEFAULT_WINDOW):
+        self.capacity = capacity
+        self.window = window
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def ingest(self, ticker, flow):
+        """Append buckets newer than what is stored; returns how many were added"""
+        buckets = flow if isinstance(flow, list) else [flow]
+        stamped = [(_bucket_time(b), b) for b in buckets if b]
+        stamped = sorted((s for s in stamped if s[0] is not None), key=lambda s: s[0])
+
+        with self._lock:
+            series = self._series.get(ticker)
+            if series is None:
+                series = self._series[ticker] = FlowSeries(self.capacity, self.window)
+            added = 0
+            for timestamp, bucket in stamped:
+                if series.last_time is None or timestamp > series.last_time:
+                    series.append(timestamp, bucket)
+                    added += 1
+            return added
+
+    def get(self, ticker):
+        return self._series.get(ticker)
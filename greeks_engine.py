@@ -0,0 +1,273 @@
+"""
+Vectorized Black-Scholes pricing, implied volatility and Greeks
+Fills IV/Greeks locally for chains that come back without provider Greeks (e.g. Polygon-only scans)
+"""
+
+from collections import OrderedDict
+import threading
+
+import numpy as np
+
+try:
+    from scipy.special import ndtr as _norm_cdf
+except ImportError:  # scipy is optional - fall back to an erf-free approximation
+    _norm_cdf = None
+
+RISK_FREE_RATE = 0.045
+MIN_VOL = 1e-4
+MAX_VOL = 5.0
+MIN_TIME = 0.5 / 365  # Half a day floor so expiring contracts stay finite
+
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+
+def norm_pdf(x):
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def norm_cdf(x):
+    """Standard normal CDF (scipy if installed, otherwise West's double-precision algorithm)"""
+    if _norm_cdf is not None:
+        return _norm_cdf(x)
+
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(x)
+    e = np.exp(-0.5 * z * z)
+
+    num = ((((((0.0352624965998911 * z + 0.700383064443688) * z + 6.37396220353165) * z
+              + 33.912866078383) * z + 112.079291497871) * z + 221.213596169931) * z
+           + 220.206867912376)
+    den = (((((((0.0883883476483184 * z + 1.75566716318264) * z + 16.064177579207) * z
+               + 86.7807322029461) * z + 296.564248779674) * z + 637.333633378831) * z
+            + 793.826512519948) * z + 440.413735824752)
+    tail = np.where(z < 7.07106781186547, e * num / den, e / (z + 1.0 / (z + 2.0 / (z + 3.0 / (z + 4.0 / (z + 0.65))))) * _INV_SQRT_2PI)
+
+    return np.where(x > 0, 1.0 - tail, tail)
+
+
+def _prepare(spot, strike, t, vol, rate, is_call):
+    spot = np.asarray(spot, dtype=np.float64)
+    strike = np.asarray(strike, dtype=np.float64)
+    t = np.maximum(np.asarray(t, dtype=np.float64), MIN_TIME)
+    vol = np.maximum(np.asarray(vol, dtype=np.float64), MIN_VOL)
+    rate = np.asarray(rate, dtype=np.float64)
+    is_call = np.asarray(is_call, dtype=bool)
+    return np.broadcast_arrays(spot, strike, t, vol, rate, is_call)
+
+
+def _d1_d2(spot, strike, t, vol, rate):
+    sqrt_t = np.sqrt(t)
+    vol_sqrt_t = vol * sqrt_t
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * t) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t, sqrt_t
+
+
+def bs_price(spot, strike, t, vol, rate=RISK_FREE_RATE, is_call=True):
+    """Black-Scholes price for arrays of European options"""
+    spot, strike, t, vol, rate, is_call = _prepare(spot, strike, t, vol, rate, is_call)
+    d1, d2, _ = _d1_d2(spot, strike, t, vol, rate)
+    discount = strike * np.exp(-rate * t)
+
+    call = spot * norm_cdf(d1) - discount * norm_cdf(d2)
+    put = discount * norm_cdf(-d2) - spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def bs_greeks(spot, strike, t, vol, rate=RISK_FREE_RATE, is_call=True):
+    """
+    Full set of Greeks for arrays of options.
+    Theta is per calendar day, vega and rho are per 1 percentage point.
+    """
+    spot, strike, t, vol, rate, is_call = _prepare(spot, strike, t, vol, rate, is_call)
+    d1, d2, sqrt_t = _d1_d2(spot, strike, t, vol, rate)
+    pdf_d1 = norm_pdf(d1)
+    discount = np.exp(-rate * t)
+    cdf_d1 = norm_cdf(d1)
+    cdf_d2 = norm_cdf(d2)
+
+    delta = np.where(is_call, cdf_d1, cdf_d1 - 1.0)
+    gamma = pdf_d1 / (spot * vol * sqrt_t)
+    vega = spot * pdf_d1 * sqrt_t / 100.0
+
+    decay = -spot * pdf_d1 * vol / (2.0 * sqrt_t)
+    call_theta = decay - rate * strike * discount * cdf_d2
+    put_theta = decay + rate * strike * discount * (1.0 - cdf_d2)
+    theta = np.where(is_call, call_theta, put_theta) / 365.0
+
+    call_rho = strike * t * discount * cdf_d2
+    put_rho = -strike * t * discount * (1.0 - cdf_d2)
+    rho = np.where(is_call, call_rho, put_rho) / 100.0
+
+    return {
+        'delta': delta,
+        'gamma': gamma,
+        'theta': theta,
+        'vega': vega,
+        'rho': rho
+    }
+
+
+def implied_vol(price, spot, strike, t, rate=RISK_FREE_RATE, is_call=True, tol=1e-6, max_iter=60):
+    """
+    Batched implied volatility solver.
+    Runs Newton steps on the whole chain at once, safeguarded by a per-contract
+    bracket (bisection whenever Newton would leave it), so every contract converges.
+    Prices outside the no-arbitrage bounds come back as NaN.
+    """
+    price = np.asarray(price, dtype=np.float64)
+    spot, strike, t, _, rate, is_call = _prepare(spot, strike, t, 0.0, rate, is_call)
+    price = np.broadcast_to(price, spot.shape)
+
+    discount = strike * np.exp(-rate * t)
+    lower = np.where(is_call, np.maximum(spot - discount, 0.0), np.maximum(discount - spot, 0.0))
+    upper = np.where(is_call, spot, discount)
+    valid = np.isfinite(price) & (price > lower) & (price < upper) & (spot > 0) & (strike > 0)
+
+    lo = np.full(spot.shape, MIN_VOL)
+    hi = np.full(spot.shape, MAX_VOL)
+    # Brenner-Subrahmanyam starting point, clipped into the bracket
+    vol = np.clip(np.sqrt(2.0 * np.pi / t) * price / spot, 0.05, 2.0)
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+
+        idx = np.nonzero(active)[0]
+        s, k, tt, r, c = spot[idx], strike[idx], t[idx], rate[idx], is_call[idx]
+        v = vol[idx]
+
+        diff = bs_price(s, k, tt, v, r, c) - price[idx]
+        d1, _, sqrt_t = _d1_d2(s, k, tt, v, r)
+        vega = s * norm_pdf(d1) * sqrt_t
+
+        # Tighten the bracket: price is increasing in vol
+        lo[idx] = np.where(diff < 0, v, lo[idx])
+        hi[idx] = np.where(diff > 0, v, hi[idx])
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = v - diff / vega
+        bisect = 0.5 * (lo[idx] + hi[idx])
+        use_newton = np.isfinite(newton) & (newton > lo[idx]) & (newton < hi[idx])
+        new_vol = np.where(use_newton, newton, bisect)
+
+        vol[idx] = new_vol
+        done = (np.abs(diff) < tol * np.maximum(price[idx], 1e-8)) | (np.abs(new_vol - v) < tol)
+        active[idx[done]] = False
+
+    return np.where(valid, vol, np.nan)
+
+
+class GreeksCache:
+    """Thread-safe LRU cache of computed IV/Greeks keyed by contract and quote"""
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is not None:
+                    self._data.move_to_end(key)
+                    found[key] = value
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        with self._lock:
+            for key, value in items:
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+GREEK_COLUMNS = ['iv', 'delta', 'gamma', 'theta', 'vega', 'rho']
+MULTI_LEG_KEYWORDS = ('Spread', 'Straddle', 'Strangle', 'Condor')
+
+_default_cache = GreeksCache()
+
+
+def infer_is_call(df):
+    """Option side per row: explicit option_type column if present, otherwise from the strategy name"""
+    if 'option_type' in df.columns:
+        side = df['option_type'].astype(str).str.lower()
+        return side.str.startswith('c').to_numpy(), side.str.startswith(('c', 'p')).to_numpy()
+
+    strategy = df['strategy'].astype(str)
+    is_call = strategy.str.contains('Call').to_numpy()
+    is_put = strategy.str.contains('Put').to_numpy()
+    multi_leg = strategy.str.contains('|'.join(MULTI_LEG_KEYWORDS)).to_numpy()
+    single_leg = (is_call ^ is_put) & ~multi_leg
+    return is_call, single_leg
+
+
+def fill_chain_greeks(df, rate=RISK_FREE_RATE, cache=None):
+    """
+    Fill iv (in %) and delta/gamma/theta/vega/rho for single-leg rows that lack them.
+    Provider values always win; only missing cells are computed.
+    """
+    required = {'strike', 'premium', 'current_price', 'dte', 'strategy'}
+    if df.empty or not required.issubset(df.columns):
+        return df
+
+    cache = _default_cache if cache is None else cache
+    df = df.copy()
+    for col in GREEK_COLUMNS:
+        if col not in df.columns:
+            df[col] = np.nan
+
+    is_call, priceable = infer_is_call(df)
+    missing = df[GREEK_COLUMNS].isna().any(axis=1).to_numpy()
+    quoted = df[['strike', 'premium', 'current_price', 'dte']].notna().all(axis=1).to_numpy()
+    rows = np.nonzero(priceable & missing & quoted)[0]
+    if len(rows) == 0:
+        return df
+
+    subset = df.iloc[rows]
+    strike = subset['strike'].to_numpy(dtype=np.float64)
+    premium = subset['premium'].to_numpy(dtype=np.float64)
+    spot = subset['current_price'].to_numpy(dtype=np.float64)
+    dte = subset['dte'].to_numpy(dtype=np.float64)
+    side = is_call[rows]
+    expiration = subset['expiration'].astype(str).to_numpy() if 'expiration' in subset.columns else [''] * len(rows)
+    tickers = subset['ticker'].astype(str).to_numpy() if 'ticker' in subset.columns else [''] * len(rows)
+
+    keys = [
+        (tickers[i], bool(side[i]), round(strike[i], 4), expiration[i], round(premium[i], 4), round(spot[i], 4), dte[i])
+        for i in range(len(rows))
+    ]
+    found = cache.get_many(keys)
+    todo = np.array([i for i, key in enumerate(keys) if key not in found], dtype=np.int64)
+
+    values = np.empty((len(rows), len(GREEK_COLUMNS)))
+    for i, key in enumerate(keys):
+        if key in found:
+            values[i] = found[key]
+
+    if len(todo):
+        t = dte[todo] / 365.0
+        vol = implied_vol(premium[todo], spot[todo], strike[todo], t, rate, side[todo])
+        greeks = bs_greeks(spot[todo], strike[todo], t, vol, rate, side[todo])
+        computed = np.column_stack([vol * 100.0] + [greeks[g] for g in GREEK_COLUMNS[1:]])
+        computed[np.isnan(vol)] = np.nan
+        values[todo] = computed
+        cache.put_many((keys[i], computed[j]) for j, i in enumerate(todo))
+
+    for j, col in enumerate(GREEK_COLUMNS):
+        current = df[col].to_numpy(dtype=np.float64, copy=True)
+        target = current[rows]
+        current[rows] = np.where(np.isnan(target), values[:, j], target)
+        df[col] = current
+
+    return df
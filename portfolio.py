@@ -0,0 +1,167 @@
+"""
+Portfolio of scanned trades as one leg matrix
+Every added trade contributes its legs (trade_simulation.trade_legs) as rows of flat
+arrays - kind, strike, quantity, spot, years to expiration, volatility - so Greeks and the
+payoff surface are single vectorized Black-Scholes evaluations over all legs. Position
+Greeks are kept as running per-ticker totals: adding or removing a trade only prices that
+trade's legs. The price x time x IV surface is cached until the positions change.
+
+All values are per position (quantity x contracts x 100 shares), in dollars.
+"""
+
+import numpy as np
+import pandas as pd
+
+from greeks_engine import RISK_FREE_RATE, bs_greeks, bs_price
+from trade_simulation import CALL, STOCK, annual_volatility, trade_legs
+
+CONTRACT_SIZE = 100
+GREEKS = ['delta', 'gamma', 'theta', 'vega']
+PRICE_MOVES = np.linspace(-0.2, 0.2, 41)  # relative move applied to every underlying
+IV_SHIFTS = np.array([-0.10, -0.05, 0.0, 0.05, 0.10])  # absolute volatility shifts
+MAX_DAYS_AHEAD = 6  # surface time steps (including today)
+
+LEG_FIELDS = ['kind', 'strike', 'quantity', 'spot', 'years', 'vol']
+
+
+def trade_key(trade):
+    """Stable identity of a scanned trade across reruns and rescans"""
+    expiration = trade.get('expiration')
+    expiration = f"{pd.Timestamp(expiration):%Y-%m-%d}" if pd.notna(expiration) else '-'
+    legs = trade_legs(trade)
+    strikes = '/'.join(f"{strike:g}" for _, strike, _ in legs[0]) if legs else f"{trade.get('strike')}"
+    return f"{trade.get('ticker')} {trade.get('strategy')} {expiration} {strikes}"
+
+
+def leg_greeks(kind, strike, spot, years, vol):
+    """(legs x 4) delta/gamma/theta/vega per share; stock legs are delta 1"""
+    greeks = bs_greeks(spot, strike, years, vol, RISK_FREE_RATE, kind == CALL)
+    table = np.column_stack([greeks[name] for name in GREEKS])
+    table[kind == STOCK] = [1.0, 0.0, 0.0, 0.0]
+    return table
+
+
+def leg_values(kind, strike, spot, years, vol):
+    """Per-share value of each leg; broadcasts, so scenario axes can be added in front"""
+    expired = years <= 0
+    intrinsic = np.where(kind == CALL, np.maximum(spot - strike, 0), np.maximum(strike - spot, 0))
+    option = np.where(expired, intrinsic, bs_price(spot, strike, np.maximum(years, 0), vol, RISK_FREE_RATE, kind == CALL))
+    # Stock legs carry their entry price as the strike (see trade_legs)
+    return np.where(kind == STOCK, spot - strike, option)
+
+
+class Portfolio:
+    """Selected trades, their leg matrix and running per-ticker position Greeks"""
+
+    def __init__(self):
+        self.positions = {}  # key -> {'trade', 'contracts', 'cash', 'greeks'}
+        self.legs = {field: np.empty(0) for field in LEG_FIELDS}
+        self.leg_keys = np.empty(0, dtype=object)
+        self.greeks = {}  # ticker -> array of position delta/gamma/theta/vega
+        self.version = 0
+        self._surface = None
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def add(self, trade, contracts=1):
+        """Add (or resize) a trade; returns its key, or None when its legs can't be reconstructed"""
+        decomposed = trade_legs(trade)
+        if decomposed is None:
+            return None
+        key = trade_key(trade)
+        if key in self.positions:
+            self.remove(key)
+
+        legs, cash = decomposed
+        kind, strike, quantity = (np.array(column, dtype=np.float64) for column in zip(*legs))
+        n = len(kind)
+        rows = {
+            'kind': kind,
+            'strike': strike,
+            'quantity': quantity * contracts * CONTRACT_SIZE,
+            'spot': np.full(n, float(trade['current_price'])),
+            'years': np.full(n, max(float(trade['dte']), 0) / 365),
+            'vol': np.full(n, annual_volatility(pd.DataFrame([trade]))[0]),
+        }
+        greeks = (leg_greeks(rows['kind'], rows['strike'], rows['spot'], rows['years'], rows['vol'])
+                  * rows['quantity'][:, None]).sum(axis=0)
+
+        for field in LEG_FIELDS:
+            self.legs[field] = np.concatenate([self.legs[field], rows[field]])
+        self.leg_keys = np.concatenate([self.leg_keys, np.full(n, key, dtype=object)])
+        ticker = str(trade['ticker'])
+        self.greeks[ticker] = self.greeks.get(ticker, np.zeros(len(GREEKS))) + greeks
+        self.positions[key] = {
+            'trade': dict(trade), 'contracts': contracts,
+            'cash': cash * contracts * CONTRACT_SIZE, 'greeks': greeks,
+        }
+        self._changed()
+        return key
+
+    def remove(self, key):
+        position = self.positions.pop(key, None)
+        if position is None:
+            return
+        keep = self.leg_keys != key
+        for field in LEG_FIELDS:
+            self.legs[field] = self.legs[field][keep]
+        self.leg_keys = self.leg_keys[keep]
+
+        ticker = str(position['trade']['ticker'])
+        self.greeks[ticker] = self.greeks[ticker] - position['greeks']
+        if not any(str(p['trade']['ticker']) == ticker for p in self.positions.values()):
+            del self.greeks[ticker]
+        self._changed()
+
+    def clear(self):
+        self.__init__()
+
+    def _changed(self):
+        self.version += 1
+        self._surface = None
+
+    def greek_table(self):
+        """Position Greeks per ticker plus dollar delta, with a portfolio total row"""
+        if not self.greeks:
+            return pd.DataFrame(columns=GREEKS + ['dollar_delta'])
+        table = pd.DataFrame.from_dict(self.greeks, orient='index', columns=GREEKS)
+        spots = {str(p['trade']['ticker']): float(p['trade']['current_price']) for p in self.positions.values()}
+        table['dollar_delta'] = table['delta'] * table.index.map(spots)
+        table.loc['Total'] = table.sum()
+        return table
+
+    def surface(self, moves=PRICE_MOVES, days=None, iv_shifts=IV_SHIFTS):
+        """
+        P&L over (price moves x days ahead x IV shifts) in one evaluation over every leg.
+        Days default to evenly spaced steps out to the last expiration.
+        """
+        legs = self.legs
+        if days is None:
+            horizon = int(np.ceil(legs['years'].max() * 365)) if len(legs['years']) else 0
+            days = np.unique(np.linspace(0, horizon, MAX_DAYS_AHEAD).round().astype(int))
+        days = np.asarray(days)
+        key = (moves.tobytes(), days.tobytes(), iv_shifts.tobytes())
+        if self._surface is not None and self._surface['key'] == key:
+            return self._surface
+
+        # Scenario axes (moves, days, shifts) broadcast against the leg axis
+        spot = legs['spot'] * (1 + moves[:, None, None, None])
+        years = legs['years'] - days[None, :, None, None] / 365
+        vol = np.maximum(legs['vol'] + iv_shifts[None, None, :, None], 0.01)
+        values = leg_values(legs['kind'], legs['strike'], spot, years, vol)
+        cash = sum(position['cash'] for position in self.positions.values())
+        pnl = (values * legs['quantity']).sum(axis=-1) + cash
+
+        self._surface = {'key': key, 'moves': moves, 'days': days, 'iv_shifts': iv_shifts, 'pnl': pnl}
+        return self._surface
+
+
+def get_portfolio(session_state):
+    """The session's portfolio, created on first use"""
+    if session_state.get('portfolio') is None:
+        session_state.portfolio = Portfolio()
+    return session_state.portfolio
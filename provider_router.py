@@ -0,0 +1,260 @@
+"""
+Provider router
+Tracks latency, error rate and remaining quota per data provider and sends each request to
+the fastest healthy one. When the chosen provider is slower than its usual tail latency the
+request is hedged with the next provider and the first good answer wins.
+Used by the Streamlit scanner (Unusual Whales vs Polygon) and the squeeze API (Yahoo hosts, Ortex).
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import math
+import threading
+import time
+
+LATENCY_WINDOW = 100  # samples kept per provider
+ERROR_WINDOW = 50
+MIN_SAMPLES = 5  # before this, providers keep their configured order and DEFAULT_HEDGE_AFTER applies
+HEDGE_PERCENTILE = 90
+DEFAULT_HEDGE_AFTER = 2.0  # seconds (per unit of work)
+MAX_ERROR_RATE = 0.5  # above this a provider is skipped while it cools down
+COOLDOWN = 30  # seconds
+
+
+class ProviderError(Exception):
+    """Raised when every candidate provider failed or returned nothing"""
+
+    def __init__(self, errors):
+        self.errors = errors  # provider name -> error message (None when it returned no data)
+        super().__init__("; ".join(f"{name}: {error or 'no data'}" for name, error in errors.items())
+                         or "no providers")
+
+
+class ProviderStats:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # seconds per unit of work
+        self.outcomes = deque(maxlen=ERROR_WINDOW)  # True = success
+        self.quota_remaining = None
+        self.quota_reset_at = 0.0
+        self.cooldown_until = 0.0
+
+    @property
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def latency_percentile(self, q):
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        # Nearest-rank percentile; stdlib only so the serverless API can import this module
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+    def available(self, now):
+        if now < self.cooldown_until:
+            return False
+        if self.quota_remaining is not None and self.quota_remaining <= 0 and now < self.quota_reset_at:
+            return False
+        return True
+
+    def score(self):
+        """Expected seconds per unit, inflated by the error rate; unknown providers score 0"""
+        median = self.latency_percentile(50)
+        if median is None:
+            return 0.0
+        return median / max(1 - self.error_rate, 0.05)
+
+    def snapshot(self):
+        return {
+            'samples': len(self.latencies),
+            'p50': self.latency_percentile(50),
+            'p90': self.latency_percentile(90),
+            'error_rate': round(self.error_rate, 3),
+            'quota_remaining': self.quota_remaining,
+            'cooling_down': time.time() < self.cooldown_until,
+        }
+
+
+class ProviderRouter:
+    """Per-process health table plus hedged dispatch across interchangeable providers"""
+
+    def __init__(self, hedge_percentile=HEDGE_PERCENTILE, max_workers=8):
+        self.hedge_percentile = hedge_percentile
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="provider")
+
+    def _get(self, name):
+        if name not in self._stats:
+            self._stats[name] = ProviderStats(name)
+        return self._stats[name]
+
+    def record(self, name, latency, ok, units=1):
+        with self._lock:
+            stats = self._get(name)
+            stats.outcomes.append(ok)
+            if ok:
+                stats.latencies.append(latency / max(units, 1))
+            elif len(stats.outcomes) >= MIN_SAMPLES and stats.error_rate > MAX_ERROR_RATE:
+                stats.cooldown_until = time.time() + COOLDOWN
+                stats.outcomes.clear()  # Start fresh after the cooldown
+
+    def update_quota(self, name, remaining=None, reset_at=None, retry_after=None):
+        """Feed rate-limit headers (or a 429's Retry-After) back into routing"""
+        with self._lock:
+            stats = self._get(name)
+            if remaining is not None:
+                stats.quota_remaining = int(remaining)
+            if reset_at is not None:
+                stats.quota_reset_at = float(reset_at)
+            if retry_after is not None:
+                stats.quota_remaining = 0
+                stats.quota_reset_at = time.time() + float(retry_after)
+
+    def rank(self, names):
+        """Healthy providers fastest first; configured order breaks ties. Falls back to all if none are healthy"""
+        now = time.time()
+        with self._lock:
+            healthy = [n for n in names if self._get(n).available(now)]
+            candidates = healthy or list(names)
+            return sorted(candidates, key=lambda n: self._get(n).score())
+
+    def available(self, name):
+        with self._lock:
+            return self._get(name).available(time.time())
+
+    def hedge_delay(self, name, units=1):
+        with self._lock:
+            p = self._get(name).latency_percentile(self.hedge_percentile)
+        return (p if p is not None else DEFAULT_HEDGE_AFTER) * max(units, 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+    def call(self, requests, units=1, hedge=True):
+        """
+        Run one logical request against interchangeable providers.
+        `requests` maps provider name -> zero-arg callable (in preference order). A provider that
+        raises or returns None counts as a miss and the next one is tried; any other result (an
+        empty one included) is an answer. Returns (provider name, result); raises ProviderError
+        when all of them miss. `units` normalizes latency for requests whose cost scales (e.g.
+        tickers per scan).
+        """
+        order = self.rank(list(requests))
+        pending = {}
+        errors = {}
+
+        def launch(name):
+            started = time.time()
+            future = self._pool.submit(requests[name])
+            pending[future] = (name, started)
+
+        launch(order.pop(0))
+        while pending:
+            timeout = None
+            if hedge and order:
+                name, started = list(pending.values())[-1]  # Most recent launch
+                timeout = max(0.0, started + self.hedge_delay(name, units) - time.time())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                launch(order.pop(0))  # Tail latency: hedge with the next provider
+                continue
+
+            for future in done:
+                name, started = pending.pop(future)
+                latency = time.time() - started
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+                    self.record(name, latency, False, units)
+                else:
+                    if result is not None:
+                        self.record(name, latency, True, units)
+                        self._record_losers(pending, units)
+                        return name, result
+                    errors[name] = None
+                    self.record(name, latency, False, units)
+
+                if order and not pending:
+                    launch(order.pop(0))
+
+        raise ProviderError(errors)
+
+    def _record_losers(self, pending, units):
+        """Hedged requests that lost the race still report their latency when they finish"""
+        for future, (name, started) in pending.items():
+            def finished(future, name=name, started=started):
+                ok = future.exception() is None and future.result() is not None
+                self.record(name, time.time() - started, ok, units)
+            future.add_done_callback(finished)
+
+
+COMBINED = 'combined'
+
+
+class RoutedScanner:
+    """
+    OptionsScanner facade over the user's combined (Polygon + Unusual Whales) scanner. Every scan
+    goes to the combined scanner, so results are exactly what it returns; only when it fails or
+    is cooling down is the scan routed to the best of the single-provider scanners. Other methods
+    go to the combined scanner.
+    """
+
+    def __init__(self, primary, alternates, router):
+        self.primary = primary
+        self.alternates = alternates  # provider name -> single-provider scanner, in preference order
+        self.router = router
+        self.polygon_key = getattr(primary, 'polygon_key', None)
+        self.uw_key = getattr(primary, 'uw_key', None)
+        self.last_provider = None
+
+    def _requests(self, scanners, tickers, days, min_return):
+        return {
+            name: (lambda scanner=scanner: scanner.scan_all_strategies(
+                tickers=tickers, days=days, min_return=min_return
+            ))
+            for name, scanner in scanners.items()
+        }
+
+    def scan_all_strategies(self, tickers, days=30, min_return=20):
+        units = len(tickers)
+        if self.router.available(COMBINED):
+            try:
+                self.last_provider, results = self.router.call(
+                    self._requests({COMBINED: self.primary}, tickers, days, min_return), units=units, hedge=False
+                )
+                return results
+            except ProviderError:
+                pass  # Fall back to the single-provider scanners
+        try:
+            self.last_provider, results = self.router.call(
+                self._requests(self.alternates, tickers, days, min_return), units=units
+            )
+        except ProviderError as e:
+            raise RuntimeError(str(e)) from e
+        return results
+
+    def __getattr__(self, name):
+        return getattr(self.primary, name)
+
+
+def routed_scanner(polygon_key, uw_key, router):
+    """
+    The user's OptionsScanner(polygon_key, uw_key). With both keys it is wrapped in a
+    RoutedScanner whose fallbacks are Unusual Whales-only, then Polygon-only scanners.
+    """
+    from options_scanner import OptionsScanner
+
+    scanner = OptionsScanner(polygon_key, uw_key)
+    if not (polygon_key and uw_key):
+        return scanner
+    alternates = {
+        'unusual_whales': OptionsScanner(None, uw_key),
+        'polygon': OptionsScanner(polygon_key, None),
+    }
+    return RoutedScanner(scanner, alternates, router)
@@ -0,0 +1,129 @@
+"""
+Background auto-refresh scheduler
+Re-runs the last scan configuration on a schedule in a worker thread, swaps the result in
+atomically and lets sessions poll for new versions. Sessions watching the same configuration
+share one refresh job.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_INTERVAL = 300  # seconds
+SUBSCRIBER_TIMEOUT_FACTOR = 3  # Drop sessions that haven't polled for 3 intervals
+
+
+def config_key(tickers, days, min_return, *api_keys):
+    """Stable identity of a scan configuration (API keys are hashed, never stored)"""
+    raw = '|'.join([
+        ','.join(sorted(t.upper() for t in tickers)),
+        str(days),
+        str(min_return),
+        hashlib.sha256('|'.join(k or '' for k in api_keys).encode()).hexdigest()[:16]
+    ])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class RefreshJob:
+    """One scheduled scan shared by every session watching the same configuration"""
+
+    def __init__(self, key, run_scan, interval, reap=None):
+        self.key = key
+        self.run_scan = run_scan
+        self.interval = interval
+        self.reap = reap  # called before every run; True when nobody watches the job any more
+        self.subscribers = {}  # session_id -> last poll time
+        self.snapshot = (0, None, None)  # (version, results, refreshed_at) - replaced as one tuple
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name=f"refresh-{key[:8]}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            # Sessions that closed their tab never unwatch - don't keep scanning for them
+            if self.reap is not None and self.reap(self):
+                break
+            try:
+                results = self.run_scan()
+            except Exception as e:
+                self.last_error = e
+                continue
+
+            self.last_error = None
+            if results is not None and not results.empty:
+                version = self.snapshot[0] + 1
+                self.snapshot = (version, results, datetime.now())
+
+
+class RefreshScheduler:
+    """Registry of refresh jobs keyed by scan configuration"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def watch(self, session_id, key, run_scan):
+        """Subscribe a session to a configuration, starting its job if nobody watches it yet"""
+        with self._lock:
+            self._expire_subscribers()
+            for other_key, job in list(self._jobs.items()):
+                if other_key != key:
+                    self._drop(job, session_id)
+
+            job = self._jobs.get(key)
+            if job is None:
+                job = RefreshJob(key, run_scan, self.interval, reap=self._reap)
+                self._jobs[key] = job
+                job.start()
+            job.subscribers[session_id] = time.time()
+            return job
+
+    def unwatch(self, session_id):
+        with self._lock:
+            for job in list(self._jobs.values()):
+                self._drop(job, session_id)
+
+    def poll(self, session_id, key):
+        """Latest (version, results, refreshed_at) for a configuration; also acts as a heartbeat"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return (0, None, None)
+            job.subscribers[session_id] = time.time()
+            return job.snapshot
+
+    def last_error(self, key):
+        """Exception raised by the configuration's last refresh, or None"""
+        with self._lock:
+            job = self._jobs.get(key)
+            return job.last_error if job else None
+
+    def active_jobs(self):
+        with self._lock:
+            return {key: len(job.subscribers) for key, job in self._jobs.items()}
+
+    def _drop(self, job, session_id):
+        job.subscribers.pop(session_id, None)
+        if not job.subscribers:
+            job.stop()
+            self._jobs.pop(job.key, None)
+
+    def _reap(self, job):
+        with self._lock:
+            self._expire_subscribers()
+            return self._jobs.get(job.key) is not job
+
+    def _expire_subscribers(self):
+        cutoff = time.time() - self.interval * SUBSCRIBER_TIMEOUT_FACTOR
+        for job in list(self._jobs.values()):
+            for session_id, seen in list(job.subscribers.items()):
+                if seen < cutoff:
+                    self._drop(job, session_id)
@@ -0,0 +1,187 @@
+"""
+Upstream record / replay
+In record mode every upstream call (scanner methods, squeeze API HTTP fetches) is captured with
+its latency into a compressed local archive; in replay mode the same calls are answered from the
+archive - no network or API keys - at a configurable speed. Lets scans, scoring and rendering be
+benchmarked and profiled offline against real-shaped data, and production issues be reproduced.
+
+Configured from the environment:
+    SCAN_REPLAY_MODE     off (default) | record | replay
+    SCAN_REPLAY_ARCHIVE  archive directory (default replays/default)
+    SCAN_REPLAY_SPEED    replay speed multiplier; 1 = recorded latency, 0 = no delay (default 1)
+
+Scans are archived per ticker (a batched scan is split by its `ticker` column), so an archive
+replays whatever ticker batches the replaying caller uses - e.g. recorded by scan_cli.py in
+chunks and replayed by the dashboard in one scan.
+
+Archives are pickles - only replay archives you recorded yourself.
+"""
+
+from collections import defaultdict
+import glob
+import gzip
+import os
+import pickle
+import threading
+import time
+
+OFF = 'off'
+RECORD = 'record'
+REPLAY = 'replay'
+
+DEFAULT_ARCHIVE = os.path.join('replays', 'default')
+
+
+class ReplayMiss(LookupError):
+    """A call in replay mode that the archive has no recording for"""
+
+
+class ReplayArchive:
+    """Directory of gzip'd pickle streams, one file per recording process"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, key, value, latency, error=None):
+        record = {'key': key, 'value': value, 'latency': latency, 'error': error, 'at': time.time()}
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            # Each append is its own gzip member, so a crash never corrupts earlier records
+            with gzip.open(os.path.join(self.path, f"{os.getpid()}.pkl.gz"), 'ab') as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self):
+        """key -> recordings in capture order"""
+        recordings = defaultdict(list)
+        for filename in sorted(glob.glob(os.path.join(self.path, '*.pkl.gz'))):
+            with gzip.open(filename, 'rb') as f:
+                while True:
+                    try:
+                        record = pickle.load(f)
+                    except EOFError:
+                        break
+                    recordings[record['key']].append(record)
+        for records in recordings.values():
+            records.sort(key=lambda record: record['at'])
+        return recordings
+
+
+class ReplayLayer:
+    def __init__(self, mode=OFF, path=DEFAULT_ARCHIVE, speed=1.0):
+        self.mode = mode
+        self.speed = speed
+        self.archive = ReplayArchive(path)
+        self._recordings = None
+        self._cursors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @property
+    def offline(self):
+        return self.mode == REPLAY
+
+    def call(self, key, fn):
+        """Run fn() (recording it in record mode) or answer it from the archive in replay mode"""
+        if self.mode == REPLAY:
+            return self.replay(key)
+        if self.mode != RECORD:
+            return fn()
+
+        started = time.time()
+        try:
+            value = fn()
+        except Exception as e:
+            self.archive.append(key, None, time.time() - started, error=f"{type(e).__name__}: {e}")
+            raise
+        self.archive.append(key, value, time.time() - started)
+        return value
+
+    def replay(self, key):
+        """The next recorded answer for key (raised again if it was an error); ReplayMiss if none"""
+        with self._lock:
+            if self._recordings is None:
+                self._recordings = self.archive.load()
+            records = self._recordings.get(key)
+            if not records:
+                raise ReplayMiss(f"No recording for {key!r} in {self.archive.path}")
+            # Recordings play back in capture order; the last one repeats once exhausted
+            record = records[min(self._cursors[key], len(records) - 1)]
+            self._cursors[key] += 1
+
+        if self.speed > 0:
+            time.sleep(record['latency'] / self.speed)
+        if record['error']:
+            raise RuntimeError(f"(replayed) {record['error']}")
+        return record['value']
+
+
+class ReplayScanner:
+    """Records / replays the OptionsScanner calls the apps make; `scanner` may be None when replaying"""
+
+    def __init__(self, scanner, layer):
+        self.scanner = scanner
+        self.layer = layer
+        self.polygon_key = getattr(scanner, 'polygon_key', None)
+        # Greek views check for a UW key; replayed Greek data stands in for it
+        self.uw_key = getattr(scanner, 'uw_key', None) or ('replay' if layer.offline else None)
+
+    def scan_all_strategies(self, tickers, days=30, min_return=20):
+        """Recorded / replayed per ticker: replayed frames are concatenated in ticker order"""
+        import pandas as pd
+
+        tickers = list(tickers)
+        keys = {ticker: ('scan_all_strategies', ticker.upper(), days, min_return) for ticker in tickers}
+        if self.layer.offline:
+            frames = [self.layer.replay(key) for key in keys.values()]
+            found = [frame for frame in frames if frame is not None and not frame.empty]
+            if found:
+                return pd.concat(found, ignore_index=True)
+            return next((frame for frame in frames if frame is not None), pd.DataFrame())
+        if self.layer.mode != RECORD:
+            return self.scanner.scan_all_strategies(tickers=tickers, days=days, min_return=min_return)
+
+        started = time.time()
+        try:
+            results = self.scanner.scan_all_strategies(tickers=tickers, days=days, min_return=min_return)
+        except Exception as e:
+            latency = (time.time() - started) / max(len(keys), 1)
+            for key in keys.values():
+                self.layer.archive.append(key, None, latency, error=f"{type(e).__name__}: {e}")
+            raise
+        # Each ticker gets its share of the batch latency, so replaying the batch takes as long
+        latency = (time.time() - started) / max(len(keys), 1)
+        by_ticker = results is not None and 'ticker' in results.columns
+        ticker_column = results['ticker'].astype(str).str.upper() if by_ticker else None
+        for ticker, key in keys.items():
+            value = results
+            if by_ticker:
+                value = results[ticker_column.to_numpy() == ticker.upper()].reset_index(drop=True)
+            self.layer.archive.append(key, value, latency)
+        return results
+
+    def get_greek_exposure(self, ticker):
+        return self.layer.call(('get_greek_exposure', ticker), lambda: self.scanner.get_greek_exposure(ticker))
+
+    def get_greek_flow(self, ticker):
+        return self.layer.call(('get_greek_flow', ticker), lambda: self.scanner.get_greek_flow(ticker))
+
+    def __getattr__(self, name):
+        return getattr(self.scanner, name)
+
+
+def layer_from_env(environ=os.environ):
+    mode = environ.get('SCAN_REPLAY_MODE', OFF).lower()
+    if mode not in (OFF, RECORD, REPLAY):
+        raise ValueError(f"SCAN_REPLAY_MODE must be one of off/record/replay, got {mode!r}")
+    return ReplayLayer(
+        mode=mode,
+        path=environ.get('SCAN_REPLAY_ARCHIVE', DEFAULT_ARCHIVE),
+        speed=float(environ.get('SCAN_REPLAY_SPEED', 1.0))
+    )
+
+
+def wrap_scanner(scanner, layer):
+    """Scanner unchanged when replay is off, otherwise routed through the replay layer"""
+    if layer.mode == OFF:
+        return scanner
+    return ReplayScanner(scanner, layer)
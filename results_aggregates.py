@@ -0,0 +1,89 @@
+"""
+Precomputed aggregates for the results tabs
+Computed once per scan result (keyed by a content fingerprint) and stored next to the
+results in session state, so tab rendering on rerun only reads them
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def result_fingerprint(df):
+    """Stable content hash of a results frame"""
+    if df.empty:
+        return 'empty'
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(','.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def compute_aggregates(df, fingerprint=None):
+    """All summary tables/series used by the Overview, Market Analysis and Strategy tabs"""
+    returns = df['return']
+    by_ticker = df.groupby('ticker', observed=True)
+    by_strategy = df.groupby('strategy', observed=True)
+
+    strategy_stats = by_strategy.agg({
+        'return': ['mean', 'max', 'min', 'std'],
+        'ticker': 'count'
+    }).round(1)
+    strategy_stats.columns = ['Avg Return', 'Max Return', 'Min Return', 'Std Dev', 'Count']
+
+    strategy_counts = df['strategy'].value_counts()
+    strategy_counts = strategy_counts[strategy_counts > 0]
+
+    # One pass over group indices instead of a boolean mask per strategy
+    strategy_points = {}
+    dte = df['dte'].to_numpy()
+    ret = returns.to_numpy()
+    tickers = df['ticker'].astype(str).to_numpy()
+    for strategy, positions in by_strategy.indices.items():
+        strategy_points[strategy] = {
+            'dte': dte[positions],
+            'return': ret[positions],
+            'ticker': tickers[positions]
+        }
+
+    return {
+        'fingerprint': fingerprint or result_fingerprint(df),
+        'overview': {
+            'total': len(df),
+            'ticker_count': df['ticker'].nunique(),
+            'best_return': returns.max(),
+            'best_ticker': df.iloc[0]['ticker'],
+            'avg_return': returns.mean(),
+            'median_return': returns.median(),
+            'strategy_count': df['strategy'].nunique(),
+            'top_strategy': str(strategy_counts.index[0]),
+            'avg_dte': df['dte'].mean(),
+            'min_dte': df['dte'].min(),
+            'max_dte': df['dte'].max()
+        },
+        'ticker_returns': by_ticker['return'].agg(['mean', 'max', 'count']),
+        'strategy_counts': strategy_counts,
+        'strategy_stats': strategy_stats,
+        'best_per_ticker': df.loc[by_ticker['return'].idxmax()],
+        'strategy_points': strategy_points,
+        'return_range': (float(np.nanmin(ret)), float(np.nanmax(ret)))
+    }
+
+
+def store_results(session_state, results):
+    """Store a new scan result together with its fingerprint and aggregates"""
+    fingerprint = result_fingerprint(results)
+    session_state.results = results
+    session_state.results_fingerprint = fingerprint
+    session_state.results_aggregates = compute_aggregates(results, fingerprint) if not results.empty else None
+
+
+def get_aggregates(session_state):
+    """Aggregates for the current results, recomputed only if the results changed underneath"""
+    results = session_state.results
+    aggregates = session_state.get('results_aggregates')
+    if aggregates is not None and aggregates['fingerprint'] == session_state.get('results_fingerprint'):
+        return aggregates
+    store_results(session_state, results)
+    return session_state.results_aggregates
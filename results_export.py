@@ -0,0 +1,102 @@
+"""
+Results export encoding
+Encodes scan results to CSV / gzipped CSV / Parquet in row chunks straight into a byte
+buffer (no intermediate full-size string), and caches the encoded bytes per result
+fingerprint so repeated downloads of the same scan cost nothing. The bytes are taken from the
+buffer with getvalue() while nothing else references it: CPython then shrinks the buffer's own
+storage and hands it over instead of copying it, so encoding peaks near 1x the export size.
+"""
+
+from collections import OrderedDict
+import gzip
+import importlib.util
+import io
+import threading
+
+CSV_CHUNK_ROWS = 50000
+EXPORT_CACHE_BYTES = 256 * 1024 ** 2
+
+EXPORT_FORMATS = {
+    'CSV': {'extension': 'csv', 'mime': 'text/csv'},
+    'CSV (gzip)': {'extension': 'csv.gz', 'mime': 'application/gzip'},
+}
+# Parquet needs pyarrow or fastparquet; only offer it when one is installed
+if importlib.util.find_spec('pyarrow') or importlib.util.find_spec('fastparquet'):
+    EXPORT_FORMATS['Parquet'] = {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'}
+
+
+def encode_csv(df, compress=False, chunk_rows=CSV_CHUNK_ROWS):
+    """CSV bytes written chunk by chunk through a (optionally gzip) byte stream"""
+    buffer = io.BytesIO()
+    raw = gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) if compress else buffer
+    text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+
+    for start in range(0, max(len(df), 1), chunk_rows):
+        df.iloc[start:start + chunk_rows].to_csv(
+            text, index=False, header=start == 0, date_format='%Y-%m-%d'
+        )
+
+    text.flush()
+    text.detach()
+    if compress:
+        raw.close()
+    return take_bytes(buffer)
+
+
+def encode_parquet(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return take_bytes(buffer)
+
+
+def take_bytes(buffer):
+    """The buffer's contents as immutable bytes, without a copy (no getbuffer() view may be alive)"""
+    payload = buffer.getvalue()
+    buffer.close()
+    return payload
+
+
+def encode_results(df, fmt):
+    if fmt == 'CSV':
+        return encode_csv(df)
+    if fmt == 'CSV (gzip)':
+        return encode_csv(df, compress=True)
+    if fmt == 'Parquet':
+        return encode_parquet(df)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+class ExportCache:
+    """Byte-budgeted LRU of encoded exports keyed by (fingerprint, format)"""
+
+    def __init__(self, max_bytes=EXPORT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_encode(self, df, fingerprint, fmt):
+        key = (fingerprint, fmt)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+
+        payload = encode_results(df, fmt)
+
+        with self._lock:
+            if key not in self._data and len(payload) <= self.max_bytes:
+                self._data[key] = payload
+                self.size += len(payload)
+                while self.size > self.max_bytes:
+                    _, evicted = self._data.popitem(last=False)
+                    self.size -= len(evicted)
+        return payload
+
+
+_export_cache = ExportCache()
+
+
+def export_results(df, fingerprint, fmt='CSV'):
+    """Encoded bytes for a result, served from the shared cache when already encoded"""
+    return _export_cache.get_or_encode(df, fingerprint, fmt)
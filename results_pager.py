@@ -0,0 +1,79 @@
+"""
+Server-side pagination for the Full Scanner tab
+Sorted orders are computed once per (result, column, direction), only the visible page is
+styled, and gradient color ranges come from the full column so colors stay stable across pages
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = [25, 50, 100, 250, 500]
+MAX_PAGE_ROWS = 500  # Hard cap on rows sent to the browser per rerun
+
+GRADIENT_COLUMNS = {
+    'return': 'RdYlGn',
+    'iv': 'YlOrRd'
+}
+
+
+class ResultsPager:
+    """Pre-sorted, paginated view over one scan result"""
+
+    def __init__(self, df, fingerprint):
+        self.df = df
+        self.fingerprint = fingerprint
+        self._orders = {}
+        self.gradient_ranges = {
+            col: (float(np.nanmin(df[col])), float(np.nanmax(df[col])))
+            for col in GRADIENT_COLUMNS
+            if col in df.columns and df[col].notna().any()
+        }
+
+    def sorted_order(self, sort_by, ascending):
+        """Row positions in sort order (NaNs last), cached per column and direction"""
+        key = (sort_by, ascending)
+        if key not in self._orders:
+            column = self.df[sort_by]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype(str)
+            order = column.reset_index(drop=True).sort_values(
+                ascending=ascending, kind='stable', na_position='last'
+            ).index.to_numpy()
+            self._orders[key] = order
+        return self._orders[key]
+
+    def page(self, mask, sort_by, ascending, page, page_size):
+        """Return (page frame, matching row count, page count) for a filter mask"""
+        page_size = min(page_size, MAX_PAGE_ROWS)
+        order = self.sorted_order(sort_by, ascending)
+        if mask is not None:
+            order = order[np.asarray(mask)[order]]
+
+        total = len(order)
+        page_count = max(1, math.ceil(total / page_size))
+        page = min(max(page, 1), page_count)
+        start = (page - 1) * page_size
+
+        return self.df.iloc[order[start:start + page_size]], total, page_count
+
+
+def get_pager(session_state):
+    """Pager for the current results, rebuilt only when the results fingerprint changes"""
+    pager = session_state.get('results_pager')
+    fingerprint = session_state.get('results_fingerprint')
+    if pager is None or pager.fingerprint != fingerprint:
+        pager = ResultsPager(session_state.results, fingerprint)
+        session_state.results_pager = pager
+    return pager
+
+
+def style_page(page_df, format_dict, gradient_ranges):
+    """Style only the visible rows, using full-column gradient ranges"""
+    styled = page_df.style.format(format_dict, na_rep='-')
+    for col, cmap in GRADIENT_COLUMNS.items():
+        if col in page_df.columns and col in gradient_ranges:
+            vmin, vmax = gradient_ranges[col]
+            styled = styled.background_gradient(subset=[col], cmap=cmap, vmin=vmin, vmax=vmax)
+    return styled
@@ -0,0 +1,63 @@
+"""
+Compact typed schema for scan results
+Categorical labels, float32 metrics and datetime64 expirations keep large scans small
+and make groupby/value_counts/styling cheap on every Streamlit rerun
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ['ticker', 'strategy', 'option_type']
+DATE_COLUMNS = ['expiration']
+INT_COLUMNS = ['dte', 'volume', 'open_interest']
+
+
+def compact_results(df):
+    """Convert a scan_all_strategies frame to the compact schema (returns a new frame)"""
+    if df.empty:
+        return df
+
+    df = df.copy()
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    for col in INT_COLUMNS:
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]) and df[col].notna().all():
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS or col in DATE_COLUMNS:
+            continue
+        dtype = df[col].dtype
+        if pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+            df[col] = df[col].astype(np.float32)
+        elif dtype == object and col not in INT_COLUMNS:
+            # Numeric values that arrived as strings/objects (common with JSON APIs)
+            converted = pd.to_numeric(df[col], errors='coerce')
+            if converted.notna().sum() == df[col].notna().sum():
+                df[col] = converted.astype(np.float32)
+
+    return df
+
+
+def memory_usage_bytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(df):
+    """Memory footprint summary used for the results readout"""
+    total = memory_usage_bytes(df)
+    rows = len(df)
+    per_column = df.memory_usage(deep=True, index=False).sort_values(ascending=False)
+    return {
+        'rows': rows,
+        'total_mb': total / 1024 ** 2,
+        'bytes_per_row': total / rows if rows else 0,
+        'per_column': per_column
+    }
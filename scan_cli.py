@@ -0,0 +1,152 @@
+"""
+Headless batch scanner - runs OptionsScanner across a ticker universe without Streamlit
+Run with: python scan_cli.py --ticker-list "All Popular" --preset "Spreads Only" --output scan.parquet
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from scan_config import load_config, strategy_matches
+from scan_pipeline import run_scan
+from results_schema import compact_results
+
+_worker_scanner = None
+
+
+def _init_worker(polygon_key, uw_key):
+    """Build one long-lived scanner per worker process"""
+    global _worker_scanner
+    from provider_router import ProviderRouter, routed_scanner
+    from replay import ReplayScanner, layer_from_env, wrap_scanner
+    replay_layer = layer_from_env()
+    if replay_layer.offline and not (polygon_key or uw_key):
+        _worker_scanner = ReplayScanner(None, replay_layer)
+    else:
+        _worker_scanner = wrap_scanner(routed_scanner(polygon_key, uw_key, ProviderRouter()), replay_layer)
+
+
+def _scan_chunk(tickers, days, min_return):
+    try:
+        return tickers, run_scan(_worker_scanner, tickers=tickers, days=days, min_return=min_return), None
+    except Exception as e:
+        return tickers, None, str(e)
+
+
+def resolve_tickers(args, ticker_lists):
+    tickers = []
+    for name in args.ticker_list or []:
+        if name not in ticker_lists:
+            raise SystemExit(f"Unknown ticker list '{name}'. Available: {', '.join(ticker_lists)}")
+        tickers.extend(ticker_lists[name])
+    if args.tickers:
+        tickers.extend(t.strip() for t in args.tickers.split(','))
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            tickers.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+
+    # Normalize and de-duplicate, keeping order
+    return list(dict.fromkeys(t.upper() for t in tickers if t))
+
+
+def run_batch(tickers, days, min_return, polygon_key, uw_key, workers, chunk_size, strategies=None):
+    """Scan the universe in ticker chunks across a process pool; returns (results, failed chunks)"""
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    frames = []
+    failures = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(polygon_key, uw_key)) as pool:
+        futures = [pool.submit(_scan_chunk, chunk, days, min_return) for chunk in chunks]
+        for done, future in enumerate(as_completed(futures), 1):
+            chunk, results, error = future.result()
+            if error:
+                failures.append((chunk, error))
+                print(f"[{done}/{len(chunks)}] {','.join(chunk)}: error - {error[:200]}", file=sys.stderr)
+            else:
+                count = 0 if results is None else len(results)
+                print(f"[{done}/{len(chunks)}] {','.join(chunk)}: {count} opportunities", file=sys.stderr)
+                if count:
+                    frames.append(results)
+
+    if not frames:
+        return pd.DataFrame(), failures
+
+    # Chunks carry their own categories, so re-compact after concatenating
+    results = pd.concat(frames, ignore_index=True)
+    if strategies:
+        results = results[strategy_matches(results['strategy'], strategies)]
+    results = results.sort_values('return', ascending=False, ignore_index=True)
+    return compact_results(results), failures
+
+
+def write_results(results, output):
+    """Write .parquet, or .csv (compression inferred from e.g. .csv.gz)"""
+    output = output.replace('{timestamp}', datetime.now().strftime('%Y%m%d_%H%M'))
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if output.endswith('.parquet'):
+        results.to_parquet(output, index=False)
+    else:
+        results.to_csv(output, index=False)
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless options strategy scanner")
+    parser.add_argument('--config', help="JSON file with extra ticker_lists / strategy_presets")
+    parser.add_argument('--ticker-list', action='append', help="Named ticker list (repeatable)")
+    parser.add_argument('--tickers', help="Comma-separated tickers")
+    parser.add_argument('--tickers-file', help="File with one ticker per line")
+    parser.add_argument('--preset', default="All Strategies", help="Strategy preset to keep")
+    parser.add_argument('--days', type=int, default=30, help="Target days to expiration")
+    parser.add_argument('--min-return', type=float, default=20, help="Minimum return (%%)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Scanner processes")
+    parser.add_argument('--chunk-size', type=int, default=5, help="Tickers per task")
+    parser.add_argument('--output', default="scans/options_scan_{timestamp}.parquet",
+                        help="Output path (.parquet, .csv, .csv.gz); {timestamp} is expanded")
+    parser.add_argument('--every', type=float, help="Daemon mode: rerun every N minutes")
+    args = parser.parse_args(argv)
+
+    polygon_key = os.environ.get('POLYGON_API_KEY')
+    uw_key = os.environ.get('UNUSUAL_WHALES_API_KEY')
+    if not (polygon_key or uw_key or os.environ.get('SCAN_REPLAY_MODE', '').lower() == 'replay'):
+        raise SystemExit("Set POLYGON_API_KEY and/or UNUSUAL_WHALES_API_KEY (or SCAN_REPLAY_MODE=replay)")
+
+    ticker_lists, strategy_presets = load_config(args.config)
+    tickers = resolve_tickers(args, ticker_lists)
+    if not tickers:
+        raise SystemExit("No tickers given (use --ticker-list, --tickers or --tickers-file)")
+    if args.preset not in strategy_presets:
+        raise SystemExit(f"Unknown preset '{args.preset}'. Available: {', '.join(strategy_presets)}")
+    strategies = strategy_presets[args.preset] if args.preset != "All Strategies" else None
+
+    while True:
+        started = time.time()
+        results, failures = run_batch(
+            tickers, args.days, args.min_return, polygon_key, uw_key,
+            max(1, args.workers or 1), max(1, args.chunk_size), strategies
+        )
+        elapsed = time.time() - started
+
+        if results.empty:
+            print(f"No opportunities found across {len(tickers)} tickers ({elapsed:.1f}s)", file=sys.stderr)
+        else:
+            path = write_results(results, args.output)
+            print(f"Wrote {len(results)} opportunities for {results['ticker'].nunique()} tickers "
+                  f"to {path} ({elapsed:.1f}s, {len(failures)} failed chunks)", file=sys.stderr)
+
+        if not args.every:
+            return 1 if failures and results.empty else 0
+        time.sleep(max(0, args.every * 60 - elapsed))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
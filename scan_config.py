@@ -0,0 +1,75 @@
+"""
+Ticker lists and strategy presets shared by the Streamlit app and the batch CLI
+A JSON config file can extend or override any of them (see load_config)
+"""
+
+import json
+import re
+
+TICKER_LISTS = {
+    "Mega Tech": ["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "META", "TSLA"],
+    "ETFs": ["SPY", "QQQ", "IWM", "DIA", "XLF", "XLE", "GLD"],
+    "Meme Stocks": ["GME", "AMC", "BBBY", "BB", "NOK"],
+    "Finance": ["JPM", "BAC", "GS", "MS", "WFC", "C"],
+    "All Popular": ["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "META", "TSLA", 
+                   "SPY", "QQQ", "IWM", "JPM", "BAC", "GS", "AMD", "NFLX"],
+    "Custom": []
+}
+
+ALL_STRATEGIES = [
+    "Long Calls",
+    "Long Puts",
+    "Short Calls (Naked)",
+    "Short Puts (Naked)",
+    "Bull Call Spreads",
+    "Bear Put Spreads", 
+    "Cash-Secured Puts",
+    "Covered Calls",
+    "Long Straddles",
+    "Long Strangles",
+    "Iron Condors",
+    "Credit Spreads"
+]
+
+STRATEGY_PRESETS = {
+    "All Strategies": ALL_STRATEGIES,
+    "Basic Options": ["Long Calls", "Long Puts", "Covered Calls", "Cash-Secured Puts"],
+    "Spreads Only": ["Bull Call Spreads", "Bear Put Spreads", "Credit Spreads"],
+    "Income Strategies": ["Covered Calls", "Cash-Secured Puts", "Short Puts (Naked)", "Credit Spreads"],
+    "Volatility Plays": ["Long Straddles", "Long Strangles", "Iron Condors"],
+    "Bullish": ["Long Calls", "Bull Call Spreads", "Short Puts (Naked)", "Cash-Secured Puts"],
+    "Bearish": ["Long Puts", "Bear Put Spreads", "Short Calls (Naked)"],
+    "Custom": []
+}
+
+
+def load_config(path=None):
+    """
+    Ticker lists and strategy presets, optionally merged with a JSON file of the form
+    {"ticker_lists": {"Name": [...]}, "strategy_presets": {"Name": [...]}}
+    """
+    ticker_lists = {name: list(tickers) for name, tickers in TICKER_LISTS.items()}
+    strategy_presets = {name: list(strategies) for name, strategies in STRATEGY_PRESETS.items()}
+
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        ticker_lists.update({
+            name: [t.strip().upper() for t in tickers]
+            for name, tickers in overrides.get('ticker_lists', {}).items()
+        })
+        strategy_presets.update(overrides.get('strategy_presets', {}))
+
+    return ticker_lists, strategy_presets
+
+
+def normalize_strategy(name):
+    """'Short Calls (Naked)' and 'Short Call' both normalize to 'short call'"""
+    name = re.sub(r'\(.*?\)', '', str(name)).lower()
+    return ' '.join(word[:-1] if word.endswith('s') else word for word in name.split())
+
+
+def strategy_matches(result_strategies, selected):
+    """Boolean mask of result strategy labels that belong to the selected preset names"""
+    wanted = {normalize_strategy(s) for s in selected}
+    return [normalize_strategy(s) in wanted for s in result_strategies]
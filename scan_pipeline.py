@@ -0,0 +1,39 @@
+"""
+Shared scan pipeline: scan, fill local Greeks, compact the schema
+Used by the interactive scan as well as background refreshes. The Greeks engine is imported
+on the first scan, so importing this module stays cheap for the app's cold start.
+"""
+
+from results_schema import compact_results
+
+SHARED_SCAN_TTL = 60  # seconds a scan result is reused by other workers on the node
+
+
+def run_scan(scanner, tickers, days, min_return):
+    """Run scan_all_strategies and return the results in the compact schema"""
+    from greeks_engine import fill_chain_greeks
+
+    results = scanner.scan_all_strategies(
+        tickers=tickers,
+        days=days,
+        min_return=min_return
+    )
+    if results.empty:
+        return results
+    # Compute IV/Greeks locally for any contracts the provider didn't price
+    return compact_results(fill_chain_greeks(results))
+
+
+def shared_scan(shared_cache, key, scanner, tickers, days, min_return, ttl=SHARED_SCAN_TTL):
+    """
+    run_scan through the node's shared cache, so identical scans from other worker processes
+    are reused. `key` must identify the credentials (e.g. refresh_scheduler.config_key).
+    Empty results aren't shared; a None cache scans directly.
+    """
+    scan = lambda: run_scan(scanner, tickers=tickers, days=days, min_return=min_return)
+    if shared_cache is None:
+        return scan()
+    from shared_cache import cache_key
+    return shared_cache.get_or_fetch(
+        cache_key('scan', key, tuple(tickers), days, min_return), scan, ttl=ttl, is_empty=lambda df: df.empty
+    )
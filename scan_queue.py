@@ -0,0 +1,143 @@
+"""
+Local scan job queue
+A fixed pool of scan workers shared by every session: identical scans are de-duplicated,
+users are served round-robin so one heavy user can't starve the others, and the UI polls
+job status by id instead of scanning inline in its script thread
+"""
+
+from collections import OrderedDict, deque
+import itertools
+import os
+import threading
+import time
+
+DEFAULT_WORKERS = int(os.environ.get('SCAN_WORKERS', 2))
+RESULT_TTL = 900  # seconds a finished job stays available for polling / de-duplication
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ScanJob:
+    def __init__(self, job_id, key, user, run_scan, meta=None):
+        self.id = job_id
+        self.key = key
+        self.user = user
+        self.users = {user}
+        self.run_scan = run_scan
+        self.meta = meta or {}
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+
+class ScanQueue:
+    """Bounded worker pool with per-user round-robin scheduling and job de-duplication"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, result_ttl=RESULT_TTL):
+        self.result_ttl = result_ttl
+        self._jobs = {}
+        self._active_by_key = {}  # dedup key -> latest job id for that scan configuration
+        self._user_queues = OrderedDict()  # user -> deque of job ids, rotated for fairness
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"scan-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, user, key, run_scan, meta=None):
+        """Queue a scan (or attach to an identical queued/running one); returns the job id"""
+        with self._cond:
+            self._prune()
+            existing = self._jobs.get(self._active_by_key.get(key))
+            if existing is not None and existing.status in (QUEUED, RUNNING):
+                existing.users.add(user)
+                return existing.id
+
+            job = ScanJob(f"scan-{next(self._ids)}", key, user, run_scan, meta)
+            self._jobs[job.id] = job
+            self._active_by_key[key] = job.id
+            self._user_queues.setdefault(user, deque()).append(job.id)
+            self._cond.notify()
+            return job.id
+
+    def get(self, job_id):
+        with self._cond:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def position(self, job_id):
+        """Approximate number of queued jobs that will start before this one (round-robin order)"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return 0
+            queues = [list(q) for q in self._user_queues.values()]
+            ahead = 0
+            for depth in range(max(len(q) for q in queues)):
+                for q in queues:
+                    if depth < len(q):
+                        if q[depth] == job_id:
+                            return ahead
+                        ahead += 1
+            return ahead
+
+    def stats(self):
+        with self._cond:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            counts['workers'] = len(self._workers)
+            counts['users_waiting'] = len(self._user_queues)
+            return counts
+
+    def _next_job(self):
+        """Pop the next job, taking one from each waiting user in turn"""
+        user, queue = self._user_queues.popitem(last=False)
+        job = self._jobs[queue.popleft()]
+        if queue:
+            self._user_queues[user] = queue  # Back of the line
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._user_queues:
+                    # Idle workers still expire finished results, even if nobody submits or polls
+                    if not self._cond.wait(timeout=self.result_ttl):
+                        self._prune()
+                job = self._next_job()
+                job.status = RUNNING
+                job.started_at = time.time()
+
+            # Each job runs isolated: a failing scan only fails its own job
+            try:
+                result = job.run_scan()
+                status, error = DONE, None
+            except Exception as e:
+                result, status, error = None, FAILED, str(e)
+
+            with self._cond:
+                job.result = result
+                job.error = error
+                job.status = status
+                job.finished_at = time.time()
+                job.run_scan = None  # Drop the scanner reference
+                self._prune()
+
+    def _prune(self):
+        """Drop finished jobs (and their result frames) older than result_ttl; called with the lock held"""
+        cutoff = time.time() - self.result_ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
+                if self._active_by_key.get(job.key) == job_id:
+                    del self._active_by_key[job.key]
@@ -0,0 +1,199 @@
+"""
+Per-session memory budget for scan results
+Every finished scan is recorded in the session's history together with its results. The
+results of past scans stay in memory in LRU order until the session goes over its budget;
+then the least recently used ones are spilled to gzip'd pickles in a per-session directory
+and reloaded only when the user goes back to that scan. If the history alone can't get the
+session under budget, the session's Greek exposure/flow payloads are dropped too (they are
+re-read from the process-wide Greek cache on the next render).
+
+Spill files are pickles, so like the shared cache they only live in a directory private to
+the app's user (created 0700; one owned by another user or writable by others is refused and
+the results stay in memory).
+
+Configured from the environment:
+    SESSION_MEMORY_MB   per-session budget (default: 64)
+    SESSION_SPILL_DIR   spill directory (default: <tmp>/squeeze-scanner-<uid>/sessions)
+"""
+
+from collections import OrderedDict
+import itertools
+import os
+import pickle
+import shutil
+import time
+
+import pandas as pd
+
+from results_schema import memory_usage_bytes
+from shared_cache import PRIVATE_ROOT, private_dir, private_file
+
+MEMORY_BUDGET = int(float(os.environ.get('SESSION_MEMORY_MB', 64)) * 1024 ** 2)
+SPILL_DIR = os.environ.get('SESSION_SPILL_DIR', os.path.join(PRIVATE_ROOT, 'sessions'))
+MAX_HISTORY = 50  # scans remembered per session (older entries and their spill files are dropped)
+SPILL_TTL = 24 * 3600  # spill directories untouched for this long belong to dead sessions
+GREEK_KEYS = ['greek_exposure', 'greek_flow', 'greek_data_ticker']
+
+
+def prune_spill_dirs(root=SPILL_DIR, ttl=SPILL_TTL):
+    """Remove spill directories of sessions that ended long ago"""
+    if not os.path.isdir(root):
+        return
+    try:
+        private_dir(root)
+    except OSError:
+        return
+    cutoff = time.time() - ttl
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+class SessionStore:
+    """Scan history of one session with an LRU of in-memory results and a disk spill"""
+
+    def __init__(self, session_id, budget=MEMORY_BUDGET, spill_dir=SPILL_DIR):
+        self.budget = budget
+        self.spill_root = spill_dir
+        self.spill_dir = os.path.join(spill_dir, session_id)
+        self.history = []  # metadata dicts, oldest first
+        self._memory = OrderedDict()  # entry id -> (results, bytes), least recently used first
+        self._ids = itertools.count(1)
+        self.current_id = None
+        self.spilled_bytes = 0
+        self._payload_sizes = {}  # session key -> (object id, bytes)
+
+    def record(self, results, **meta):
+        """Add a finished scan (now the current one); returns its history entry"""
+        entry = {'id': next(self._ids), 'count': len(results), 'spilled': False, **meta}
+        self.history.append(entry)
+        self._memory[entry['id']] = (results, memory_usage_bytes(results))
+        self.current_id = entry['id']
+        while len(self.history) > MAX_HISTORY:
+            self._forget(self.history.pop(0))
+        return entry
+
+    def in_memory(self, entry_id):
+        return entry_id in self._memory
+
+    def entry(self, entry_id):
+        return next((entry for entry in self.history if entry['id'] == entry_id), None)
+
+    def load(self, entry_id):
+        """Results of a past scan, from memory or its spill file (it becomes the current one)"""
+        entry = self.entry(entry_id)
+        if entry is None:
+            return None
+        if entry_id in self._memory:
+            self._memory.move_to_end(entry_id)
+            results = self._memory[entry_id][0]
+        else:
+            try:
+                self._private_spill_dir()
+                results = pd.read_pickle(private_file(entry['path']), compression='gzip')
+                os.utime(self.spill_dir)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                # Spill file swept, unreadable or not ours - the scan is gone
+                self.history.remove(entry)
+                self._forget(entry)
+                return None
+            self._memory[entry_id] = (results, memory_usage_bytes(results))
+        self.current_id = entry_id
+        return results
+
+    def _private_spill_dir(self):
+        """Create/check every directory we own on the way to the spill files (raises PermissionError)"""
+        if os.path.dirname(self.spill_root) == PRIVATE_ROOT:
+            private_dir(PRIVATE_ROOT)
+        private_dir(self.spill_root)
+        private_dir(self.spill_dir)
+
+    def _spill(self, entry_id):
+        """Move past results to disk; False (results stay in memory) if the spill dir isn't usable"""
+        entry = self.entry(entry_id)
+        if not entry['spilled']:
+            path = os.path.join(self.spill_dir, f"scan-{entry_id}.pkl.gz")
+            try:
+                self._private_spill_dir()
+                self._memory[entry_id][0].to_pickle(path, compression='gzip')
+            except OSError as e:
+                print(f"Session spill error: {e}")
+                return False
+            entry['path'] = path
+            entry['spilled'] = True
+            entry['spilled_bytes'] = os.path.getsize(path)
+            self.spilled_bytes += entry['spilled_bytes']
+        del self._memory[entry_id]
+        return True
+
+    def _forget(self, entry):
+        self._memory.pop(entry['id'], None)
+        if entry['spilled']:
+            self.spilled_bytes -= entry['spilled_bytes']
+            try:
+                os.remove(entry['path'])
+            except OSError:
+                pass
+
+    def payload_bytes(self, session_state):
+        """Pickled size of the session's Greek payloads (re-measured only when they change)"""
+        total = 0
+        for key in GREEK_KEYS[:2]:
+            value = session_state.get(key)
+            if not value:
+                continue
+            cached = self._payload_sizes.get(key)
+            if cached is None or cached[0] != id(value):
+                cached = (id(value), len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+                self._payload_sizes[key] = cached
+            total += cached[1]
+        return total
+
+    def _sync_current(self, session_state):
+        """Track the session's current results object (views may replace it, e.g. with risk columns)"""
+        results = session_state.get('results')
+        current = self._memory.get(self.current_id)
+        if current is not None and results is not None and current[0] is not results:
+            self._memory[self.current_id] = (results, memory_usage_bytes(results))
+
+    def results_bytes(self):
+        return sum(size for _, size in self._memory.values())
+
+    def enforce_budget(self, session_state):
+        """Spill least recently used past results, then drop Greek payloads, until under budget"""
+        self._sync_current(session_state)
+        for entry_id in list(self._memory):
+            if self.results_bytes() + self.payload_bytes(session_state) <= self.budget:
+                return
+            if entry_id != self.current_id and not self._spill(entry_id):
+                break
+        if self.results_bytes() + self.payload_bytes(session_state) > self.budget:
+            for key in GREEK_KEYS:
+                session_state.pop(key, None)
+
+    def report(self, session_state):
+        self._sync_current(session_state)
+        in_memory = self.results_bytes()
+        payloads = self.payload_bytes(session_state)
+        return {
+            'total_mb': (in_memory + payloads) / 1024 ** 2,
+            'budget_mb': self.budget / 1024 ** 2,
+            'results_mb': in_memory / 1024 ** 2,
+            'greek_mb': payloads / 1024 ** 2,
+            'scans_in_memory': len(self._memory),
+            'scans_on_disk': sum(1 for entry in self.history if entry['id'] not in self._memory),
+            'spilled_mb': self.spilled_bytes / 1024 ** 2,
+        }
+
+
+def get_session_store(session_state):
+    """The session's store, created on first use (sweeping dead sessions' spill files)"""
+    store = session_state.get('session_store')
+    if store is None:
+        prune_spill_dirs()
+        store = session_state.session_store = SessionStore(session_state.session_id)
+    return store
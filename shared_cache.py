@@ -0,0 +1,183 @@
+"""
+Cross-process shared cache
+A small key-value store with TTLs in a SQLite database in WAL mode, so every worker process on
+a node (Streamlit workers, warm serverless instances, CLI workers) reads what the others already
+fetched. Writes are single-statement upserts (atomic), values are pickled and zlib-compressed
+when large. The get/set/get_or_fetch interface is all callers use, so a local key-value server
+can stand in for SQLite later.
+
+Pickles are only read from a directory private to the app's user: the database directory is
+created with mode 0700, and a directory or database file owned by another user (or writable by
+others) disables the cache instead of being loaded.
+
+Configured from the environment:
+    SHARED_CACHE_PATH  database file (default: <tmp>/squeeze-scanner-<uid>/cache.sqlite3)
+    SHARED_CACHE       set to "off" to disable (every lookup misses)
+
+The cache never raises: if the database is locked or unavailable a lookup is a miss and a
+write is dropped.
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+import zlib
+
+USER_ID = os.getuid() if hasattr(os, 'getuid') else None
+PRIVATE_ROOT = os.path.join(tempfile.gettempdir(), f"squeeze-scanner-{USER_ID if USER_ID is not None else 'user'}")
+DEFAULT_PATH = os.path.join(PRIVATE_ROOT, 'cache.sqlite3')
+DEFAULT_TTL = 60  # seconds
+COMPRESS_ABOVE = 1024  # bytes
+PRUNE_EVERY = 500  # writes between expired-row sweeps
+
+_RAW = b'\x00'
+_ZLIB = b'\x01'
+
+
+def _check_owner(path, info):
+    if USER_ID is None:
+        return  # No POSIX ownership to check (Windows)
+    if stat.S_ISLNK(info.st_mode) or info.st_uid != USER_ID or info.st_mode & 0o022:
+        raise PermissionError(f"{path} is not private to this user (owner, mode or symlink)")
+
+
+def private_dir(path):
+    """Create `path` with mode 0700, or check that an existing one is owned and only writable by us"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    _check_owner(path, os.lstat(path))
+    return path
+
+
+def private_file(path):
+    """Check that an existing file is ours before it is read; missing files are fine"""
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return path
+    _check_owner(path, info)
+    return path
+
+
+def encode(value):
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(payload) > COMPRESS_ABOVE:
+        return _ZLIB + zlib.compress(payload, 1)
+    return _RAW + payload
+
+
+def decode(blob):
+    blob = bytes(blob)
+    payload = zlib.decompress(blob[1:]) if blob[:1] == _ZLIB else blob[1:]
+    return pickle.loads(payload)
+
+
+def cache_key(*parts):
+    """Stable string key; secrets (API keys) can be passed as parts - they are hashed"""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+class SharedCache:
+    def __init__(self, path=DEFAULT_PATH, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self._local = threading.local()  # one connection per thread
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            try:
+                private_dir(os.path.dirname(self.path) or '.')
+                private_file(self.path)
+            except PermissionError:
+                self.enabled = False  # Someone else's file: never unpickle from it
+                raise
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Cached value, or None when missing / expired / unavailable"""
+        if not self.enabled:
+            return None
+        try:
+            row = self._conn().execute(
+                'SELECT value FROM cache WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+            value = decode(row[0]) if row else None
+        except Exception as e:
+            # Besides I/O errors: corrupt blobs, or pickles from another pandas/numpy version
+            print(f"Shared cache read error: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        if not self.enabled or value is None:
+            return
+        try:
+            self._conn().execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, sqlite3.Binary(encode(value)), time.time() + ttl)
+            )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self.prune()
+        except Exception as e:
+            print(f"Shared cache write error: {e}")
+
+    def delete(self, key):
+        if not self.enabled:
+            return
+        try:
+            self._conn().execute('DELETE FROM cache WHERE key = ?', (key,))
+        except (OSError, sqlite3.Error) as e:
+            print(f"Shared cache write error: {e}")
+
+    def get_or_fetch(self, key, fetch, ttl=DEFAULT_TTL, is_empty=None):
+        """Cached value, or fetch() stored for `ttl` seconds (unless is_empty(result))"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = fetch()
+        if value is not None and not (is_empty and is_empty(value)):
+            self.set(key, value, ttl)
+        return value
+
+    def prune(self):
+        try:
+            self._conn().execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),))
+        except (OSError, sqlite3.Error) as e:
+            print(f"Shared cache prune error: {e}")
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Process-wide handle on the node's shared cache"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SharedCache(
+                os.environ.get('SHARED_CACHE_PATH', DEFAULT_PATH),
+                enabled=os.environ.get('SHARED_CACHE', 'on').lower() != 'off'
+            )
+        return _shared_cache
@@ -0,0 +1,303 @@
+"""
+Multi-leg strategy search over an option chain
+Builds every strike pair (vertical spreads, strangles) and four-leg combination (iron condors)
+for one ticker/expiration as NumPy arrays instead of nested loops. Illiquid or stale legs are
+dropped before pairing, pairs are band-limited by width, invalid and dominated candidates are
+pruned as arrays, and only the top N by return survive, so chains with hundreds of strikes
+stay fast.
+
+Rows follow the scanner result schema (ticker, strategy, expiration, dte, current_price,
+strike, premium, return, ...) plus the leg fields trade_simulation.trade_legs reads
+(long_strike/short_strike for verticals and condors, put_strike/call_strike for strangles,
+debit, max_profit, max_loss, breakeven). Prices are per share.
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from scan_config import normalize_strategy, strategy_matches
+
+TOP_N = 10  # candidates kept per strategy per ticker/expiration
+MIN_OPEN_INTEREST = 10
+MIN_VOLUME = 1
+MAX_SPREAD_PCT = 0.5  # (ask - bid) / mid
+MIN_PREMIUM = 0.05  # smallest debit/credit worth trading, per share
+MAX_WIDTH_PCT = 0.15  # widest strike pair, as a fraction of spot
+CONDOR_SIDE_CANDIDATES = 40  # best credit spreads per side crossed into condors
+STRANGLE_MOVE = 0.10  # strangles are ranked by payoff on a move of this size
+
+STRATEGIES = ["Bull Call Spread", "Bear Put Spread", "Credit Spread", "Long Strangle", "Iron Condor"]
+
+
+def liquid_legs(chain, option_type, spot):
+    """Sorted (strikes, bids, asks, volume, open interest) for tradeable legs of one type"""
+    legs = chain[chain['option_type'].str.lower() == option_type]
+    bid = legs['bid'].to_numpy(dtype=np.float64)
+    ask = legs['ask'].to_numpy(dtype=np.float64)
+    mid = (bid + ask) / 2
+    volume = legs['volume'].fillna(0).to_numpy(dtype=np.float64) if 'volume' in legs else np.zeros(len(legs))
+    oi = legs['open_interest'].fillna(0).to_numpy(dtype=np.float64) if 'open_interest' in legs else np.zeros(len(legs))
+    strikes = legs['strike'].to_numpy(dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        keep = (
+            (bid > 0) & (ask >= bid)
+            & ((ask - bid) / mid <= MAX_SPREAD_PCT)
+            & ((oi >= MIN_OPEN_INTEREST) | (volume >= MIN_VOLUME))
+            & (np.abs(strikes / spot - 1) <= 0.5)
+        )
+    order = np.argsort(strikes[keep], kind='stable')
+    strikes, bid, ask, mid, volume, oi = (a[keep][order] for a in (strikes, bid, ask, mid, volume, oi))
+
+    # Stale quotes: calls must get cheaper as the strike rises, puts dearer. Keep the largest
+    # set of quotes that is in order and drop the rest, so one stale quote only drops itself
+    fair = monotone_mask(-mid if option_type == 'call' else mid)
+    return tuple(a[fair] for a in (strikes, bid, ask, volume, oi))
+
+
+def monotone_mask(values):
+    """True for one longest non-decreasing subsequence of values (patience sorting, O(n log n))"""
+    tails = []  # tails[k]: smallest last value of a run of length k + 1
+    tail_index = []
+    parent = np.full(len(values), -1)
+    for i, value in enumerate(values.tolist()):
+        k = bisect_right(tails, value)
+        if k:
+            parent[i] = tail_index[k - 1]
+        if k == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[k] = value
+            tail_index[k] = i
+
+    mask = np.zeros(len(values), dtype=bool)
+    i = tail_index[-1] if tail_index else -1
+    while i >= 0:
+        mask[i] = True
+        i = parent[i]
+    return mask
+
+
+def strike_pairs(strikes, max_width):
+    """Index arrays (lower, upper) of every pair with 0 < width <= max_width"""
+    n = len(strikes)
+    if n < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    stop = np.searchsorted(strikes, strikes + max_width, side='right')
+    counts = np.maximum(stop - np.arange(n) - 1, 0)
+    lower = np.repeat(np.arange(n), counts)
+    # Offsets 1..count for each lower leg
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    upper = lower + offsets
+    return lower, upper
+
+
+def pareto_mask(group, cost, payoff):
+    """
+    False for candidates dominated within their group: another one costs no more and pays
+    at least as much (ties keep the first). Vectorized with one sort and a running max.
+    """
+    if len(cost) == 0:
+        return np.zeros(0, dtype=bool)
+    order = np.lexsort((-payoff, cost, group))
+    g, p = group[order], payoff[order]
+    # Running max of payoff that restarts at each group: offset groups far apart first
+    span = np.abs(payoff).max() * 2 + 1
+    shifted = p + g * span
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], shifted[:-1])))
+    new_group = np.concatenate(([True], g[1:] != g[:-1]))
+    keep = new_group | (shifted > best_before)
+    mask = np.empty(len(cost), dtype=bool)
+    mask[order] = keep
+    return mask
+
+
+def top_n(values, n):
+    """Indices of the n largest values, largest first"""
+    if len(values) > n:
+        candidates = np.argpartition(values, -n)[-n:]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(values[candidates])[::-1]]
+
+
+def _rows(strategy, picks, **columns):
+    """Result frame of the picked candidates; scalar columns are broadcast"""
+    data = {name: values if np.ndim(values) == 0 else np.asarray(values)[picks] for name, values in columns.items()}
+    return pd.DataFrame({'strategy': strategy, **data}, index=pd.RangeIndex(len(picks)))
+
+
+def vertical_spreads(calls, puts, spot, max_width, n):
+    """Debit and credit verticals; also returns the pruned credit spreads for iron condors"""
+    frames = []
+
+    # Bull call spread: long lower call, short upper call (debit)
+    strikes, bid, ask, volume, oi = calls
+    lo, hi = strike_pairs(strikes, max_width)
+    debit = ask[lo] - bid[hi]
+    width = strikes[hi] - strikes[lo]
+    profit = width - debit
+    valid = (debit >= MIN_PREMIUM) & (profit > 0)
+    valid[valid] = pareto_mask(lo[valid], debit[valid], profit[valid])
+    lo, hi, debit, profit = lo[valid], hi[valid], debit[valid], profit[valid]
+    picks = top_n(profit / debit, n)
+    frames.append(_rows(
+        "Bull Call Spread", picks,
+        long_strike=strikes[lo], short_strike=strikes[hi], strike=strikes[lo],
+        debit=debit, premium=debit, max_profit=profit, max_loss=debit,
+        breakeven=strikes[lo] + debit, **{'return': profit / debit * 100},
+        volume=np.minimum(volume[lo], volume[hi]), open_interest=np.minimum(oi[lo], oi[hi]),
+        option_type='call'
+    ))
+
+    # Bear call credit spread: short lower call, long upper call
+    lo, hi = strike_pairs(strikes, max_width)
+    credit = bid[lo] - ask[hi]
+    risk = strikes[hi] - strikes[lo] - credit
+    valid = (credit >= MIN_PREMIUM) & (risk > 0) & (strikes[lo] > spot)
+    valid[valid] = pareto_mask(lo[valid], risk[valid], credit[valid])
+    lo, hi, credit, risk = lo[valid], hi[valid], credit[valid], risk[valid]
+    call_credit = (strikes[lo], strikes[hi], credit, risk, np.minimum(volume[lo], volume[hi]), np.minimum(oi[lo], oi[hi]))
+    picks = top_n(credit / risk, n)
+    frames.append(_rows(
+        "Credit Spread", picks,
+        short_strike=strikes[lo], long_strike=strikes[hi], strike=strikes[lo],
+        credit=credit, premium=credit, max_profit=credit, max_loss=risk,
+        breakeven=strikes[lo] + credit, **{'return': credit / risk * 100},
+        volume=call_credit[4], open_interest=call_credit[5], option_type='call'
+    ))
+
+    # Bear put spread: long upper put, short lower put (debit)
+    strikes, bid, ask, volume, oi = puts
+    lo, hi = strike_pairs(strikes, max_width)
+    debit = ask[hi] - bid[lo]
+    width = strikes[hi] - strikes[lo]
+    profit = width - debit
+    valid = (debit >= MIN_PREMIUM) & (profit > 0)
+    valid[valid] = pareto_mask(hi[valid], debit[valid], profit[valid])
+    vlo, vhi, debit, profit = lo[valid], hi[valid], debit[valid], profit[valid]
+    picks = top_n(profit / debit, n)
+    frames.append(_rows(
+        "Bear Put Spread", picks,
+        long_strike=strikes[vhi], short_strike=strikes[vlo], strike=strikes[vhi],
+        debit=debit, premium=debit, max_profit=profit, max_loss=debit,
+        breakeven=strikes[vhi] - debit, **{'return': profit / debit * 100},
+        volume=np.minimum(volume[vlo], volume[vhi]), open_interest=np.minimum(oi[vlo], oi[vhi]),
+        option_type='put'
+    ))
+
+    # Bull put credit spread: short upper put, long lower put
+    credit = bid[hi] - ask[lo]
+    risk = strikes[hi] - strikes[lo] - credit
+    valid = (credit >= MIN_PREMIUM) & (risk > 0) & (strikes[hi] < spot)
+    valid[valid] = pareto_mask(hi[valid], risk[valid], credit[valid])
+    lo, hi, credit, risk = lo[valid], hi[valid], credit[valid], risk[valid]
+    put_credit = (strikes[lo], strikes[hi], credit, risk, np.minimum(volume[lo], volume[hi]), np.minimum(oi[lo], oi[hi]))
+    picks = top_n(credit / risk, n)
+    frames.append(_rows(
+        "Credit Spread", picks,
+        short_strike=strikes[hi], long_strike=strikes[lo], strike=strikes[hi],
+        credit=credit, premium=credit, max_profit=credit, max_loss=risk,
+        breakeven=strikes[hi] - credit, **{'return': credit / risk * 100},
+        volume=put_credit[4], open_interest=put_credit[5], option_type='put'
+    ))
+    return frames, put_credit, call_credit
+
+
+def long_strangles(calls, puts, spot, max_width, n, move=STRANGLE_MOVE):
+    """OTM put below spot + OTM call above it, ranked by payoff on a +/- move"""
+    c_strikes, _, c_ask, c_volume, c_oi = calls
+    p_strikes, _, p_ask, p_volume, p_oi = puts
+    c_idx = np.flatnonzero(c_strikes > spot)
+    p_idx = np.flatnonzero(p_strikes < spot)
+    # Band-limit: both legs within max_width of spot
+    c_idx = c_idx[c_strikes[c_idx] - spot <= max_width]
+    p_idx = p_idx[spot - p_strikes[p_idx] <= max_width]
+    if len(c_idx) == 0 or len(p_idx) == 0:
+        return pd.DataFrame()
+
+    p, c = (a.ravel() for a in np.meshgrid(p_idx, c_idx, indexing='ij'))
+    cost = p_ask[p] + c_ask[c]
+    payoff = np.maximum(spot * (1 + move) - c_strikes[c], p_strikes[p] - spot * (1 - move))
+    ret = (np.maximum(payoff, 0) - cost) / cost
+    picks = top_n(ret, n)
+    # Both legs are bought: no long_strike/short_strike, which would read as a vertical
+    return _rows(
+        "Long Strangle", picks,
+        strike=c_strikes[c], put_strike=p_strikes[p], call_strike=c_strikes[c],
+        debit=cost, premium=cost, max_profit=np.full(len(cost), np.nan), max_loss=cost,
+        breakeven=c_strikes[c] + cost, **{'return': ret * 100},
+        volume=np.minimum(p_volume[p], c_volume[c]), open_interest=np.minimum(p_oi[p], c_oi[c])
+    )
+
+
+def iron_condors(put_credit, call_credit, n, side_candidates=CONDOR_SIDE_CANDIDATES):
+    """Best put credit spreads x best call credit spreads; quartic search reduced to M x M"""
+    if len(put_credit[2]) == 0 or len(call_credit[2]) == 0:
+        return pd.DataFrame()
+    p = top_n(put_credit[2] / put_credit[3], side_candidates)
+    c = top_n(call_credit[2] / call_credit[3], side_candidates)
+    p, c = (a.ravel() for a in np.meshgrid(p, c, indexing='ij'))
+
+    put_long, put_short, put_cr, put_risk, put_vol, put_oi = (a[p] for a in put_credit)
+    call_short, call_long, call_cr, call_risk, call_vol, call_oi = (a[c] for a in call_credit)
+    credit = put_cr + call_cr
+    # Only one side can finish in the money: risk is the wider wing less the total credit
+    risk = np.maximum(put_short - put_long, call_long - call_short) - credit
+    valid = risk > 0
+    ret = np.where(valid, credit / np.where(valid, risk, 1), -np.inf)
+    picks = top_n(ret, n)
+    picks = picks[valid[picks]]
+    return _rows(
+        "Iron Condor", picks,
+        put_long_strike=put_long, short_strike=put_short, long_strike=put_long,
+        strike=put_short, call_short_strike=call_short, call_long_strike=call_long,
+        credit=credit, premium=credit, max_profit=credit, max_loss=risk,
+        breakeven=put_short - credit, upper_breakeven=call_short + credit,
+        **{'return': ret * 100},
+        volume=np.minimum(put_vol, call_vol), open_interest=np.minimum(put_oi, call_oi)
+    )
+
+
+def search_chain(chain, ticker, expiration, spot, dte, strategies=None, min_return=0, n=TOP_N):
+    """
+    Top multi-leg candidates for one ticker/expiration.
+    `chain` has strike, option_type ('call'/'put'), bid, ask and optionally volume/open_interest.
+    `strategies` takes scanner labels in any form ("Iron Condors" or "Iron Condor").
+    """
+    strategies = list(strategies or STRATEGIES)
+    wanted = {normalize_strategy(name) for name in strategies}
+    calls = liquid_legs(chain, 'call', spot)
+    puts = liquid_legs(chain, 'put', spot)
+    max_width = spot * MAX_WIDTH_PCT
+
+    verticals, put_credit, call_credit = vertical_spreads(calls, puts, spot, max_width, n)
+    frames = list(verticals)
+    if 'long strangle' in wanted:
+        frames.append(long_strangles(calls, puts, spot, max_width, n))
+    if 'iron condor' in wanted:
+        frames.append(iron_condors(put_credit, call_credit, n))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    results = pd.concat(frames, ignore_index=True)
+    keep = np.array(strategy_matches(results['strategy'], strategies)) & (results['return'] >= min_return).to_numpy()
+    results = results[keep]
+    return results.assign(ticker=ticker, expiration=expiration, dte=dte, current_price=spot)
+
+
+def search_chains(chains, ticker, spot, today=None, strategies=None, min_return=0, n=TOP_N):
+    """search_chain over every expiration in a chain with an `expiration` column"""
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    frames = []
+    for expiration, chain in chains.groupby('expiration', sort=True):
+        dte = (pd.Timestamp(expiration) - today).days
+        frames.append(search_chain(chain, ticker, expiration, spot, dte, strategies, min_return, n))
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True).sort_values('return', ascending=False, ignore_index=True)
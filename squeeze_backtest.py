@@ -0,0 +1,304 @@
+"""
+Squeeze score backtest - do the score thresholds predict forward returns?
+Loads a daily short-interest + price history for a ticker universe into (dates x tickers)
+arrays, scores every ticker-day in one vectorized pass with the live threshold table
+(squeeze_scoring.py), and reports forward returns by score bucket. Parameter sweeps over
+scaled threshold tables run across a process pool.
+
+History file (.parquet / .csv / .csv.gz), one row per ticker-day:
+    date, ticker, close, short_interest, utilization, cost_to_borrow, days_to_cover
+Metric dates are as-of dates; each metric is moved to its publication date (REPORTING_LAG
+trading days later) before it is carried forward, so no day trades on unpublished data.
+
+Run with: python squeeze_backtest.py --history si_history.parquet [--sweep] [--workers 8]
+          python squeeze_backtest.py --synthetic 3000x1260   (benchmark on generated data)
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from squeeze_scoring import MAX_SCORE, SCORE_THRESHOLDS, SQUEEZE_TYPES
+
+METRICS = list(SCORE_THRESHOLDS)
+HORIZONS = [1, 5, 20]  # trading days
+SWEEP_SCALES = [0.75, 1.0, 1.25]  # applied to each metric's thresholds independently
+TOP_BUCKET = 60  # "High Squeeze Risk" and above count as signals in sweep summaries
+# Score of a ticker-day with no published metric yet (before its first report, or inside the
+# first reporting lag). The live API never scores those, so they are left out of every statistic
+MISSING_SCORE = -1
+# Trading days between a metric's as-of date and its publication: exchange short interest is
+# published about 8 trading days after settlement (days to cover is derived from it),
+# securities-lending utilization and borrow rates the next morning
+REPORTING_LAG = {'short_interest': 8, 'days_to_cover': 8, 'utilization': 1, 'cost_to_borrow': 1}
+
+
+class Panel:
+    """Wide float32 arrays (dates x tickers) for prices and every scored metric"""
+
+    def __init__(self, dates, tickers, close, metrics):
+        self.dates = dates
+        self.tickers = tickers
+        self.close = close
+        self.metrics = metrics  # metric -> array
+
+    @classmethod
+    def from_history(cls, history, lags=REPORTING_LAG):
+        history = history.assign(date=pd.to_datetime(history['date']))
+        missing = {'date', 'ticker', 'close', *METRICS} - set(history.columns)
+        if missing:
+            raise ValueError(f"History is missing columns: {', '.join(sorted(missing))}")
+
+        wide = (
+            history.sort_values('date')
+            .drop_duplicates(['date', 'ticker'], keep='last')
+            .set_index(['date', 'ticker'])[['close', *METRICS]]
+            .astype(np.float32)
+            .unstack('ticker')
+        )
+        # Metrics are published with a lag and less often than prices: move each value to its
+        # publication day (rows are trading days), then carry it forward
+        metrics = {
+            metric: wide[metric].shift(lags.get(metric, 0)).ffill().to_numpy(dtype=np.float32)
+            for metric in METRICS
+        }
+        close = wide['close'].to_numpy(dtype=np.float32)
+        return cls(wide.index, wide['close'].columns, close, metrics)
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+
+def scored_mask(panel):
+    """Ticker-days with at least one published metric"""
+    return np.logical_or.reduce([~np.isnan(panel.metrics[metric]) for metric in METRICS])
+
+
+def score_panel(panel, thresholds=SCORE_THRESHOLDS):
+    """
+    Squeeze score for every ticker-day, like the live score (a missing metric scores 0).
+    Ticker-days with no published metric at all get MISSING_SCORE.
+    """
+    score = np.zeros(panel.shape, dtype=np.int16)
+    for metric, table in thresholds.items():
+        values = np.nan_to_num(panel.metrics[metric], nan=-np.inf)
+        # Ascending minimums: the number reached picks the points (0 reached -> 0 points)
+        ascending = sorted(table)
+        minimums = np.array([minimum for minimum, _ in ascending], dtype=np.float32)
+        points = np.array([0] + [p for _, p in ascending], dtype=np.int16)
+        score += points[np.searchsorted(minimums, values, side='right')]
+    score = np.minimum(score, MAX_SCORE)
+    score[~scored_mask(panel)] = MISSING_SCORE
+    return score
+
+
+def forward_returns(close, horizon):
+    """close[t + horizon] / close[t] - 1, NaN where either end is missing"""
+    out = np.full(close.shape, np.nan, dtype=np.float32)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def bucket_edges():
+    return sorted(minimum for minimum, _ in SQUEEZE_TYPES) + [MAX_SCORE + 1]
+
+
+def bucket_stats(score, returns):
+    """Forward-return statistics per squeeze-type score bucket (unscored ticker-days left out)"""
+    labels = {minimum: label for minimum, label in SQUEEZE_TYPES}
+    edges = bucket_edges()
+    valid = np.isfinite(returns) & (score != MISSING_SCORE)
+    score = score[valid]
+    returns = returns[valid].astype(np.float64)
+
+    rows = []
+    bucket = np.searchsorted(edges, score, side='right') - 1
+    for i, lower in enumerate(edges[:-1]):
+        bucket_returns = returns[bucket == i]
+        if len(bucket_returns) == 0:
+            rows.append({'bucket': labels[lower], 'min_score': lower, 'observations': 0})
+            continue
+        rows.append({
+            'bucket': labels[lower],
+            'min_score': lower,
+            'observations': len(bucket_returns),
+            'mean_return': bucket_returns.mean(),
+            'median_return': np.median(bucket_returns),
+            'hit_rate': (bucket_returns > 0).mean(),
+            'p05': np.percentile(bucket_returns, 5),
+            'p95': np.percentile(bucket_returns, 95),
+        })
+    return pd.DataFrame(rows)
+
+
+class ReturnStats:
+    """
+    Score-independent pieces of the forward-return statistics, computed once per horizon.
+    `scored` (scored_mask) leaves out the ticker-days that no threshold table can score.
+    """
+
+    def __init__(self, returns, scored=None):
+        self.valid = np.isfinite(returns)
+        if scored is not None:
+            self.valid &= scored
+        self.count = self.valid.sum(axis=1)
+        filled = np.where(self.valid, returns, 0).astype(np.float32)
+        self.total = float(filled.sum(dtype=np.float64))
+        self.total_count = int(self.count.sum())
+        # Per-day demeaned returns (0 where missing) and their norms, for cross-sectional IC
+        day_mean = filled.sum(axis=1, keepdims=True) / np.maximum(self.count, 1)[:, None]
+        self.demeaned = np.where(self.valid, filled - day_mean, 0).astype(np.float32)
+        self.norm = np.sqrt((self.demeaned ** 2).sum(axis=1, dtype=np.float64))
+        self.filled = filled
+
+
+def mean_information_coefficient(score, stats):
+    """Average per-day cross-sectional correlation of score and forward return (stats built with scored_mask)"""
+    if (stats.valid & (score == MISSING_SCORE)).any():
+        raise ValueError("ReturnStats must leave out unscored ticker-days (pass scored_mask)")
+    score = np.where(stats.valid, score, 0).astype(np.float32)
+    day_mean = score.sum(axis=1, keepdims=True) / np.maximum(stats.count, 1)[:, None]
+    demeaned = np.where(stats.valid, score - day_mean, 0)
+    covariance = (demeaned * stats.demeaned).sum(axis=1, dtype=np.float64)
+    norm = np.sqrt((demeaned ** 2).sum(axis=1, dtype=np.float64)) * stats.norm
+    usable = (stats.count > 2) & (norm > 0)
+    return float((covariance[usable] / norm[usable]).mean()) if usable.any() else float('nan')
+
+
+def summarize(score, stats_by_horizon):
+    """One sweep row: signal count, top-bucket vs rest spread and IC per horizon (stats built with scored_mask)"""
+    signal = score >= TOP_BUCKET
+    row = {'signal_days': int(signal.sum())}
+    for horizon, stats in stats_by_horizon.items():
+        top_valid = signal & stats.valid
+        top_count = int(top_valid.sum())
+        rest_count = stats.total_count - top_count
+        top_total = float(stats.filled[top_valid].sum(dtype=np.float64))
+        top_mean = top_total / top_count if top_count else np.nan
+        rest_mean = (stats.total - top_total) / rest_count if rest_count else np.nan
+        row[f'top_mean_{horizon}d'] = top_mean
+        row[f'spread_{horizon}d'] = top_mean - rest_mean
+        row[f'ic_{horizon}d'] = mean_information_coefficient(score, stats)
+    return row
+
+
+def scaled_thresholds(scales, base=SCORE_THRESHOLDS):
+    """Threshold table with each metric's minimums multiplied by its scale"""
+    return {
+        metric: [(minimum * scales[metric], points) for minimum, points in table]
+        for metric, table in base.items()
+    }
+
+
+def sweep_grid(scales=SWEEP_SCALES):
+    """Every combination of per-metric scales"""
+    return [dict(zip(METRICS, combo)) for combo in itertools.product(scales, repeat=len(METRICS))]
+
+
+_worker_panel = None
+_worker_stats = None
+
+
+def _init_worker(panel, horizons):
+    """Each worker gets the panel once and precomputes the forward-return statistics"""
+    global _worker_panel, _worker_stats
+    _worker_panel = panel
+    scored = scored_mask(panel)
+    _worker_stats = {h: ReturnStats(forward_returns(panel.close, h), scored) for h in horizons}
+
+
+def _evaluate(scales):
+    score = score_panel(_worker_panel, scaled_thresholds(scales))
+    return {**{f'scale_{m}': s for m, s in scales.items()}, **summarize(score, _worker_stats)}
+
+
+def run_sweep(panel, grid, horizons=HORIZONS, workers=None):
+    """Evaluate every threshold table in the grid across a process pool; best 5d spread first"""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(panel, horizons)) as pool:
+        rows = list(pool.map(_evaluate, grid, chunksize=max(1, len(grid) // (4 * (workers or os.cpu_count() or 1)))))
+    results = pd.DataFrame(rows)
+    sort_column = f'spread_{5 if 5 in horizons else horizons[0]}d'
+    return results.sort_values(sort_column, ascending=False, ignore_index=True)
+
+
+def synthetic_history(tickers=500, days=756, seed=0):
+    """Random-walk prices with persistent short-interest metrics, for benchmarking only"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2020-01-01', periods=days)
+    si = np.clip(rng.gamma(2, 6, tickers) + rng.normal(0, 1, (days, tickers)).cumsum(axis=0) * 0.3, 0, 80)
+    util = np.clip(50 + si * 1.2 + rng.normal(0, 5, (days, tickers)), 0, 100)
+    ctb = np.clip(si ** 1.3 / 8 + rng.normal(0, 1, (days, tickers)), 0.1, 200)
+    dtc = np.clip(si / 6 + rng.normal(0, 0.5, (days, tickers)), 0, 20)
+    drift = (si - si.mean()) * 2e-5  # a weak planted signal
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.03, (days, tickers)) + drift, axis=0))
+    names = [f"SYN{i:05d}" for i in range(tickers)]
+    return Panel(dates, pd.Index(names), close.astype(np.float32), {
+        'short_interest': si.astype(np.float32),
+        'utilization': util.astype(np.float32),
+        'cost_to_borrow': ctb.astype(np.float32),
+        'days_to_cover': dtc.astype(np.float32),
+    })
+
+
+def load_history(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the squeeze score thresholds")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--history', help="Daily short-interest + price history (.parquet/.csv)")
+    source.add_argument('--synthetic', help="TICKERSxDAYS of generated data, e.g. 3000x1260")
+    parser.add_argument('--si-lag', type=int, default=REPORTING_LAG['short_interest'],
+                        help="Trading days between short interest settlement and publication")
+    parser.add_argument('--horizons', default=','.join(map(str, HORIZONS)), help="Forward return horizons (days)")
+    parser.add_argument('--sweep', action='store_true', help="Sweep scaled threshold tables")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Sweep processes")
+    parser.add_argument('--output', help="Write the bucket table (or sweep results) to this CSV")
+    args = parser.parse_args(argv)
+
+    horizons = [int(h) for h in args.horizons.split(',')]
+    started = time.time()
+    if args.history:
+        lags = {**REPORTING_LAG, 'short_interest': args.si_lag, 'days_to_cover': args.si_lag}
+        panel = Panel.from_history(load_history(args.history), lags)
+    else:
+        tickers, days = (int(n) for n in args.synthetic.lower().split('x'))
+        panel = synthetic_history(tickers, days)
+    print(f"Loaded {panel.shape[1]} tickers x {panel.shape[0]} days ({time.time() - started:.1f}s)", file=sys.stderr)
+
+    started = time.time()
+    if args.sweep:
+        grid = sweep_grid()
+        table = run_sweep(panel, grid, horizons, max(1, args.workers or 1))
+        print(f"Swept {len(grid)} threshold tables ({time.time() - started:.1f}s)", file=sys.stderr)
+    else:
+        score = score_panel(panel)
+        tables = []
+        for horizon in horizons:
+            stats = bucket_stats(score, forward_returns(panel.close, horizon))
+            tables.append(stats.assign(horizon=horizon))
+        table = pd.concat(tables, ignore_index=True)
+        print(f"Scored {score.size} ticker-days ({time.time() - started:.1f}s)", file=sys.stderr)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', 30, 'display.float_format', '{:.4f}'.format):
+        print(table.head(20).to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
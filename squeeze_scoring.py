@@ -0,0 +1,48 @@
+"""
+Squeeze score threshold table
+Single definition of how short-interest metrics map to squeeze score points, shared by the live
+squeeze API (one ticker at a time) and squeeze_backtest.py (whole panels at once), so the
+thresholds being backtested are exactly the ones being served.
+"""
+
+# metric -> [(minimum value, points)], highest threshold first; a metric scores the points of the
+# first threshold it reaches
+SCORE_THRESHOLDS = {
+    'short_interest': [(30, 35), (20, 25), (15, 15), (10, 8)],  # 0-35 points
+    'utilization': [(95, 25), (85, 20), (75, 12), (60, 6)],  # 0-25 points
+    'cost_to_borrow': [(20, 25), (10, 18), (5, 10), (2, 5)],  # 0-25 points
+    'days_to_cover': [(5, 15), (3, 10), (2, 5)],  # 0-15 points
+}
+
+# (minimum score, label), highest first
+SQUEEZE_TYPES = [
+    (80, "EXTREME SQUEEZE RISK"),
+    (60, "High Squeeze Risk"),
+    (40, "Moderate Squeeze Risk"),
+    (0, "Low Squeeze Risk"),
+]
+
+DEFAULT_SCORE = 50  # when there is no short-interest data at all
+MAX_SCORE = 100
+
+
+def metric_points(value, thresholds):
+    for minimum, points in thresholds:
+        if value >= minimum:
+            return points
+    return 0
+
+
+def squeeze_score(metrics, thresholds=SCORE_THRESHOLDS):
+    """Score (0-100) for one ticker's short-interest metrics (missing metrics score 0)"""
+    if not metrics:
+        return DEFAULT_SCORE
+    score = sum(metric_points(metrics.get(metric) or 0, table) for metric, table in thresholds.items())
+    return min(MAX_SCORE, score)
+
+
+def squeeze_type(score):
+    for minimum, label in SQUEEZE_TYPES:
+        if score >= minimum:
+            return label
+    return SQUEEZE_TYPES[-1][1]
@@ -0,0 +1,98 @@
+"""
+Symbol master
+Sorted in-memory index of known ticker symbols, loaded once per process. Normalizes,
+de-duplicates and rejects unknown tickers before anything hits the network, and answers
+prefix (autocomplete) lookups with two bisections over the sorted symbol list.
+
+The master file (SYMBOL_MASTER_PATH, default data/symbols.txt) is pipe-delimited
+"SYMBOL|Name" lines; build it with tools/build_symbol_master.py. Without a master file only
+the symbol format is checked, so scans keep working on a fresh checkout.
+"""
+
+from bisect import bisect_left, bisect_right
+import os
+import re
+import threading
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'symbols.txt')
+SYMBOL_PATTERN = re.compile(r'^[A-Z][A-Z0-9.\-]{0,9}$')
+MAX_SUGGESTIONS = 10
+
+
+def normalize_symbol(raw):
+    """' $brk.b ' -> 'BRK.B'; None if it can't be a ticker symbol"""
+    symbol = str(raw).strip().upper().lstrip('$')
+    return symbol if SYMBOL_PATTERN.match(symbol) else None
+
+
+class SymbolMaster:
+    def __init__(self, entries=()):
+        pairs = sorted({symbol: name for symbol, name in entries}.items())
+        self.symbols = [symbol for symbol, _ in pairs]
+        self.names = [name for _, name in pairs]
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        entries = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                symbol, _, name = line.rstrip('\n').partition('|')
+                symbol = normalize_symbol(symbol)
+                if symbol:
+                    entries.append((symbol, name.strip()))
+        return cls(entries)
+
+    @property
+    def loaded(self):
+        return bool(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        i = bisect_left(self.symbols, symbol)
+        return i < len(self.symbols) and self.symbols[i] == symbol
+
+    def name(self, symbol):
+        i = bisect_left(self.symbols, symbol)
+        if i < len(self.symbols) and self.symbols[i] == symbol:
+            return self.names[i]
+        return None
+
+    def search(self, prefix, limit=MAX_SUGGESTIONS):
+        """[(symbol, name)] for symbols starting with prefix, exact match first"""
+        prefix = str(prefix).strip().upper().lstrip('$')
+        if not prefix:
+            return []
+        lo = bisect_left(self.symbols, prefix)
+        hi = bisect_right(self.symbols, prefix + '\uffff', lo)
+        return [(self.symbols[i], self.names[i]) for i in range(lo, min(hi, lo + limit))]
+
+    def validate(self, tickers):
+        """(valid tickers normalized and de-duplicated in order, rejected raw inputs)"""
+        valid = []
+        rejected = []
+        seen = set()
+        for raw in tickers:
+            symbol = normalize_symbol(raw)
+            if symbol is None or (self.loaded and symbol not in self):
+                rejected.append(str(raw).strip())
+            elif symbol not in seen:
+                seen.add(symbol)
+                valid.append(symbol)
+        return valid, rejected
+
+
+_master = None
+_master_lock = threading.Lock()
+
+
+def get_symbol_master():
+    """Process-wide symbol master, loaded on first use"""
+    global _master
+    with _master_lock:
+        if _master is None:
+            _master = SymbolMaster.load(os.environ.get('SYMBOL_MASTER_PATH', DEFAULT_PATH))
+        return _master
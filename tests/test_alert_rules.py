@@ -0,0 +1,95 @@
+"""
+AlertEngine rule matching: level operators fire on every changed value beyond the threshold,
+edge operators only when a value moves across it, and unchanged values are never re-evaluated.
+"""
+
+import json
+
+import pytest
+
+from alert_rules import AlertEngine, FileSink, Rule, squeeze_values
+
+
+def fired(alerts):
+    return sorted(alert['rule'] for alert in alerts)
+
+
+@pytest.fixture
+def engine():
+    engine = AlertEngine()
+    engine.add_rule(Rule('squeeze_score', 'above', 70, name='above 70'))
+    engine.add_rule(Rule('squeeze_score', 'below', 30, name='below 30'))
+    engine.add_rule(Rule('squeeze_score', 'crosses_above', 60, name='crosses above 60'))
+    engine.add_rule(Rule('squeeze_score', 'crosses_below', 40, name='crosses below 40'))
+    return engine
+
+
+def test_level_operators_fire_on_every_changed_value(engine):
+    assert fired(engine.observe('GME', {'squeeze_score': 75})) == ['above 70']
+    assert fired(engine.observe('GME', {'squeeze_score': 80})) == ['above 70']
+    assert fired(engine.observe('GME', {'squeeze_score': 20})) == ['below 30', 'crosses below 40']
+    assert fired(engine.observe('GME', {'squeeze_score': 25})) == ['below 30']
+
+
+def test_unchanged_values_do_not_refire(engine):
+    engine.observe('GME', {'squeeze_score': 75})
+    assert engine.observe('GME', {'squeeze_score': 75}) == []
+
+
+def test_edge_operators_need_a_previous_value_and_a_crossing(engine):
+    # First sighting: no previous value, so nothing has crossed
+    assert fired(engine.observe('AMC', {'squeeze_score': 65})) == []
+    assert fired(engine.observe('AMC', {'squeeze_score': 55})) == []
+    assert fired(engine.observe('AMC', {'squeeze_score': 60})) == ['crosses above 60']
+    assert fired(engine.observe('AMC', {'squeeze_score': 62})) == []
+    # Falling to exactly the threshold is not below it
+    assert fired(engine.observe('AMC', {'squeeze_score': 40})) == []
+    assert fired(engine.observe('AMC', {'squeeze_score': 39})) == ['crosses below 40']
+    # One jump across several thresholds fires every crossed rule
+    assert fired(engine.observe('AMC', {'squeeze_score': 90})) == ['above 70', 'crosses above 60']
+
+
+def test_ticker_scoped_rules_and_labels():
+    engine = AlertEngine()
+    engine.add_rule(Rule('utilization', 'above', 90, ticker='gme', name='GME utilization'))
+    engine.add_rule(Rule('squeeze_type', 'becomes', 'EXTREME SQUEEZE RISK', name='extreme'))
+    alerts = engine.evaluate({
+        'GME': {'utilization': 95, 'squeeze_type': 'High Squeeze Risk'},
+        'AMC': {'utilization': 99, 'squeeze_type': 'EXTREME SQUEEZE RISK'},
+    })
+    assert sorted((alert['ticker'], alert['rule']) for alert in alerts) == [('AMC', 'extreme'), ('GME', 'GME utilization')]
+
+
+def test_removed_rules_stop_firing(engine):
+    rule = engine.add_rule(Rule('squeeze_score', 'above', 50, name='above 50'))
+    assert engine.remove_rule(rule.id)
+    assert not engine.remove_rule(rule.id)
+    assert fired(engine.observe('GME', {'squeeze_score': 55})) == []
+
+
+def test_missing_values_are_skipped(engine):
+    assert engine.observe('GME', {'squeeze_score': None}) == []
+    assert engine.observe('GME', {'squeeze_score': float('nan')}) == []
+    assert fired(engine.observe('GME', {'squeeze_score': 75})) == ['above 70']
+
+
+@pytest.mark.parametrize('args', [
+    ('squeeze_score', 'equals', 5),
+    ('float', 'above', 5),
+    ('squeeze_score', 'above', 'high'),
+    ('squeeze_score', 'becomes', 'x'),
+])
+def test_invalid_rules(args):
+    with pytest.raises(ValueError):
+        Rule(*args)
+
+
+def test_file_sink_receives_each_batch(tmp_path):
+    path = tmp_path / 'alerts.jsonl'
+    engine = AlertEngine([FileSink(str(path))])
+    engine.add_rule(Rule('short_interest', 'above', 20))
+    row = {'ticker': 'GME', 'squeeze_score': 50, 'ortex_data': {'short_interest': 25}}
+    engine.evaluate({row['ticker']: squeeze_values(row)})
+    engine.flush()
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(line['ticker'], line['field'], line['value']) for line in lines] == [('GME', 'short_interest', 25.0)]
@@ -0,0 +1,68 @@
+"""
+Black-Scholes engine: Greeks against finite differences of bs_price, implied_vol round trips,
+and fill_chain_greeks only filling cells the provider left empty
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from greeks_engine import GreeksCache, bs_greeks, bs_price, fill_chain_greeks, implied_vol
+
+RATE = 0.045
+SPOT = np.array([100.0, 100.0, 250.0, 40.0])
+STRIKE = np.array([95.0, 110.0, 250.0, 30.0])
+T = np.array([30, 90, 7, 365]) / 365
+VOL = np.array([0.25, 0.4, 0.6, 0.15])
+
+
+@pytest.mark.parametrize('is_call', [True, False])
+def test_greeks_match_finite_differences(is_call):
+    greeks = bs_greeks(SPOT, STRIKE, T, VOL, RATE, is_call)
+    price = lambda spot=SPOT, t=T, vol=VOL, rate=RATE: bs_price(spot, STRIKE, t, vol, rate, is_call)
+    h = 1e-3
+    delta = (price(spot=SPOT + h) - price(spot=SPOT - h)) / (2 * h)
+    gamma = (price(spot=SPOT + h) - 2 * price() + price(spot=SPOT - h)) / h ** 2
+    theta = (price(t=T - h / 365) - price()) / h  # per calendar day
+    vega = (price(vol=VOL + h) - price(vol=VOL - h)) / (2 * h) / 100  # per 1 point
+    rho = (price(rate=RATE + h) - price(rate=RATE - h)) / (2 * h) / 100  # per 1 point
+
+    assert np.allclose(greeks['delta'], delta, atol=1e-5)
+    assert np.allclose(greeks['gamma'], gamma, rtol=1e-3, atol=1e-5)
+    assert np.allclose(greeks['theta'], theta, rtol=1e-3)
+    assert np.allclose(greeks['vega'], vega, rtol=1e-4)
+    assert np.allclose(greeks['rho'], rho, rtol=1e-4)
+
+
+@pytest.mark.parametrize('is_call', [True, False])
+def test_implied_vol_round_trips(is_call):
+    vols = np.array([0.05, 0.2, 0.8, 2.5])
+    prices = bs_price(SPOT, STRIKE, T, vols, RATE, is_call)
+    assert np.allclose(implied_vol(prices, SPOT, STRIKE, T, RATE, is_call), vols, atol=1e-4)
+
+
+def test_implied_vol_rejects_prices_outside_arbitrage_bounds():
+    # Below intrinsic value and above the spot price
+    vol = implied_vol(np.array([1.0, 150.0]), 100.0, np.array([80.0, 100.0]), 0.25, RATE, True)
+    assert np.isnan(vol).all()
+
+
+def test_fill_chain_greeks_keeps_provider_values():
+    premium = bs_price(100.0, 105.0, 30 / 365, 0.3, RATE, True)
+    chain = pd.DataFrame({
+        'ticker': ['A', 'A', 'A'],
+        'strategy': ['Long Call', 'Long Call', 'Bull Call Spread'],
+        'strike': [105.0, 105.0, 105.0],
+        'premium': [premium, premium, premium],
+        'current_price': [100.0, 100.0, 100.0],
+        'dte': [30, 30, 30],
+        'iv': [np.nan, 55.0, np.nan],
+        'delta': [np.nan, 0.123, np.nan],
+    })
+    filled = fill_chain_greeks(chain, rate=RATE, cache=GreeksCache())
+    assert filled.loc[0, 'iv'] == pytest.approx(30.0, abs=0.01)
+    assert filled.loc[0, 'delta'] == pytest.approx(bs_greeks(100.0, 105.0, 30 / 365, 0.3, RATE, True)['delta'])
+    # Provider values win; multi-leg rows can't be priced as one contract
+    assert (filled.loc[1, 'iv'], filled.loc[1, 'delta']) == (55.0, 0.123)
+    assert filled.loc[1, ['gamma', 'theta', 'vega', 'rho']].notna().all()
+    assert filled.loc[2, ['iv', 'delta']].isna().all()
@@ -0,0 +1,66 @@
+"""
+ProviderRouter outcomes and RoutedScanner fallbacks, with stand-in scanners
+An empty scan is an answer, not a miss: it must neither trigger a second scan nor count
+against the provider's error rate.
+"""
+
+import pandas as pd
+import pytest
+
+from provider_router import COMBINED, ProviderError, ProviderRouter, RoutedScanner
+
+
+class FakeScanner:
+    def __init__(self, name, fail=False, empty=False):
+        self.name = name
+        self.fail = fail
+        self.empty = empty
+        self.calls = 0
+
+    def scan_all_strategies(self, tickers, days=30, min_return=20):
+        self.calls += 1
+        if self.fail:
+            raise IOError(f"{self.name} is down")
+        return pd.DataFrame() if self.empty else pd.DataFrame({'ticker': tickers, 'source': self.name})
+
+
+def routed(**combined):
+    router = ProviderRouter()
+    primary = FakeScanner(COMBINED, **combined)
+    alternates = {'unusual_whales': FakeScanner('unusual_whales'), 'polygon': FakeScanner('polygon')}
+    return RoutedScanner(primary, alternates, router), router
+
+
+def test_empty_scans_are_answers():
+    scanner, router = routed(empty=True)
+    for _ in range(10):
+        assert scanner.scan_all_strategies(['GME']).empty
+    assert scanner.primary.calls == 10
+    assert all(alternate.calls == 0 for alternate in scanner.alternates.values())
+    assert router.snapshot()[COMBINED]['error_rate'] == 0.0
+
+
+def test_combined_scanner_is_the_primary_route():
+    scanner, _ = routed()
+    results = scanner.scan_all_strategies(['GME', 'AMC'])
+    assert list(results['source']) == [COMBINED, COMBINED]
+    assert scanner.last_provider == COMBINED
+
+
+def test_failures_fall_back_to_single_providers():
+    scanner, router = routed(fail=True)
+    results = scanner.scan_all_strategies(['GME'])
+    assert results['source'].iloc[0] in scanner.alternates
+    assert scanner.last_provider == results['source'].iloc[0]
+    assert router.snapshot()[COMBINED]['error_rate'] == 1.0
+
+
+def test_call_raises_when_every_provider_misses():
+    router = ProviderRouter()
+
+    def down():
+        raise IOError("down")
+
+    with pytest.raises(ProviderError) as raised:
+        router.call({'a': down, 'b': lambda: None}, hedge=False)
+    assert raised.value.errors == {'a': 'down', 'b': None}
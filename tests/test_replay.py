@@ -0,0 +1,71 @@
+"""
+Record / replay round trip: an archive recorded by scan_cli's chunked process pool has to
+replay the dashboard's single scan over the whole ticker list, with no scanner and no keys
+"""
+
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+import provider_router
+from replay import RECORD, REPLAY, ReplayLayer, ReplayMiss, ReplayScanner
+from scan_cli import run_batch
+from scan_pipeline import shared_scan
+
+TICKERS = ['AAPL', 'MSFT', 'TSLA', 'NVDA', 'AMD']
+DAYS, MIN_RETURN = 30, 20
+
+
+class FakeScanner:
+    """Two opportunities per ticker, except TSLA which has none"""
+
+    polygon_key = 'recording-key'
+    uw_key = None
+
+    def scan_all_strategies(self, tickers, days=30, min_return=20):
+        rows = [
+            {'ticker': ticker, 'strategy': strategy, 'strike': 100.0 + i, 'return': 25.0 + i + len(ticker)}
+            for i, ticker in enumerate(tickers) if ticker != 'TSLA'
+            for strategy in ('Long Call', 'Bull Call Spread')
+        ]
+        return pd.DataFrame(rows, columns=['ticker', 'strategy', 'strike', 'return'])
+
+
+def by_ticker(df):
+    return df.sort_values(['ticker', 'strategy'], ignore_index=True)[['ticker', 'strategy', 'return']]
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason="workers inherit the fake scanner via fork")
+def test_chunked_recording_replays_the_dashboard_scan(tmp_path, monkeypatch):
+    archive = str(tmp_path / 'archive')
+    monkeypatch.setenv('SCAN_REPLAY_MODE', RECORD)
+    monkeypatch.setenv('SCAN_REPLAY_ARCHIVE', archive)
+    monkeypatch.setattr(provider_router, 'routed_scanner', lambda polygon_key, uw_key, router: FakeScanner())
+
+    recorded, failures = run_batch(TICKERS, DAYS, MIN_RETURN, 'recording-key', None, workers=2, chunk_size=2)
+    assert failures == []
+
+    # Replayed the way the dashboard scans: one call over the full list, no scanner behind it
+    layer = ReplayLayer(REPLAY, archive, speed=0)
+    replayed = shared_scan(None, 'replay', ReplayScanner(None, layer), TICKERS, DAYS, MIN_RETURN)
+    assert len(replayed) == 8
+    pd.testing.assert_frame_equal(by_ticker(replayed), by_ticker(recorded), check_categorical=False, check_dtype=False)
+
+    # Any other batching of the same tickers replays too; unrecorded tickers still miss
+    assert ReplayScanner(None, layer).scan_all_strategies(['TSLA'], DAYS, MIN_RETURN).empty
+    assert list(ReplayScanner(None, layer).scan_all_strategies(['NVDA', 'AAPL'], DAYS, MIN_RETURN)['ticker'].unique()) == ['NVDA', 'AAPL']
+    with pytest.raises(ReplayMiss):
+        ReplayScanner(None, layer).scan_all_strategies(['GME'], DAYS, MIN_RETURN)
+
+
+def test_recorded_errors_replay_per_ticker(tmp_path):
+    class Down:
+        def scan_all_strategies(self, tickers, days=30, min_return=20):
+            raise IOError("upstream down")
+
+    archive = str(tmp_path / 'archive')
+    with pytest.raises(IOError):
+        ReplayScanner(Down(), ReplayLayer(RECORD, archive)).scan_all_strategies(['AAPL', 'MSFT'])
+    with pytest.raises(RuntimeError, match="upstream down"):
+        ReplayScanner(None, ReplayLayer(REPLAY, archive, speed=0)).scan_all_strategies(['MSFT'])
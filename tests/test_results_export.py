@@ -0,0 +1,56 @@
+"""
+Chunked export encoding: same output as a one-shot to_csv, cached bytes shared between
+callers, and no second full-size copy of the export while encoding
+"""
+
+import gzip
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from results_export import ExportCache, encode_csv
+
+
+def frame(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'ticker': rng.choice(['AAPL', 'MSFT', 'TSLA'], rows),
+        'expiration': pd.Timestamp('2026-11-20') + pd.to_timedelta(rng.integers(0, 60, rows), unit='D'),
+        'strike': rng.uniform(50, 500, rows).round(2),
+        'return': rng.uniform(0, 100, rows),
+    })
+
+
+def test_chunks_match_one_shot_csv():
+    df = frame(1234)
+    expected = df.to_csv(index=False, date_format='%Y-%m-%d').encode()
+    assert encode_csv(df, chunk_rows=100) == expected
+    assert gzip.decompress(encode_csv(df, compress=True, chunk_rows=100)) == expected
+
+
+def test_empty_frame_keeps_the_header():
+    assert encode_csv(frame(0)) == b'ticker,expiration,strike,return\n'
+
+
+def test_cache_returns_the_same_bytes_and_respects_its_budget():
+    df = frame(200)
+    cache = ExportCache(max_bytes=int(1.5 * len(encode_csv(df))))
+    first = cache.get_or_encode(df, 'a', 'CSV')
+    assert isinstance(first, bytes)
+    assert cache.get_or_encode(df, 'a', 'CSV') is first
+    cache.get_or_encode(df, 'b', 'CSV')
+    assert cache.size <= cache.max_bytes
+    assert cache.get_or_encode(df, 'a', 'CSV') is not first  # evicted, encoded again
+
+
+def test_encoding_keeps_no_second_copy():
+    df = frame(100000)
+    tracemalloc.start()
+    try:
+        payload = encode_csv(df, chunk_rows=2000)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Buffer growth and one chunk of text on top of the export, never a full duplicate
+    assert peak < 1.5 * len(payload)
@@ -0,0 +1,49 @@
+"""
+ScanQueue de-duplication and result expiry: finished results must not outlive result_ttl
+just because nobody submits another scan
+"""
+
+import threading
+import time
+
+from scan_queue import DONE, FAILED, ScanQueue
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_identical_scans_share_a_job():
+    release = threading.Event()
+    queue = ScanQueue(workers=1)
+    first = queue.submit('alice', 'same-config', lambda: release.wait(5) and 'result')
+    second = queue.submit('bob', 'same-config', lambda: 'never runs')
+    assert first == second
+    release.set()
+    wait_for(lambda: queue.get(first).status == DONE)
+    assert queue.get(first).result == 'result'
+    assert queue.get(first).users == {'alice', 'bob'}
+
+
+def test_failures_stay_in_their_job():
+    queue = ScanQueue(workers=1)
+
+    def fail():
+        raise IOError("upstream down")
+
+    failed = queue.submit('alice', 'a', fail)
+    ok = queue.submit('alice', 'b', lambda: 'fine')
+    wait_for(lambda: queue.get(ok).status == DONE)
+    assert queue.get(failed).status == FAILED and queue.get(failed).error == "upstream down"
+
+
+def test_finished_results_expire_without_new_submissions():
+    queue = ScanQueue(workers=1, result_ttl=0.2)
+    job_id = queue.submit('alice', 'a', lambda: 'result')
+    wait_for(lambda: queue.get(job_id) is not None and queue.get(job_id).status == DONE)
+    # Nobody polls or submits: the idle worker drops the result on its own
+    wait_for(lambda: not queue._jobs)
+    assert queue.get(job_id) is None
@@ -0,0 +1,254 @@
+"""
+spread_search against brute-force enumeration on small chains
+The vectorized search is checked against plain loops over every strike pair / leg
+combination, and every candidate's max profit / max loss against its expiration payoff.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import spread_search
+from greeks_engine import bs_price
+from scan_config import ALL_STRATEGIES
+from spread_search import (
+    MAX_WIDTH_PCT, MIN_PREMIUM, iron_condors, liquid_legs, monotone_mask, pareto_mask, search_chain,
+    strike_pairs, vertical_spreads,
+)
+
+SPOT = 100.0
+N = 10
+
+
+def make_chain(strikes=np.arange(70, 130.1, 2.5), spot=SPOT, days=30, vol=0.3):
+    """Black-Scholes mids with a spread wide enough to leave some pairs unprofitable (all legs liquid)"""
+    rows = []
+    for option_type in ('call', 'put'):
+        mid = bs_price(spot, strikes, np.full(len(strikes), days / 365), vol, 0.0, option_type == 'call')
+        bid = np.round(mid * 0.97 - 0.02, 2)
+        ask = np.round(mid * 1.03 + 0.02, 2)
+        keep = mid >= 0.25
+        rows.append(pd.DataFrame({
+            'strike': strikes[keep], 'option_type': option_type, 'bid': bid[keep], 'ask': ask[keep],
+            'volume': 50, 'open_interest': 500,
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def quotes(chain, option_type):
+    legs = chain[chain['option_type'] == option_type].sort_values('strike')
+    return list(zip(legs['strike'], legs['bid'], legs['ask']))
+
+
+def dominated(candidates, i):
+    """Pairwise dominance within i's group (cost no higher, payoff no lower; ties keep the first)"""
+    group, cost, payoff = candidates[i][:3]
+    for j, (other_group, other_cost, other_payoff) in enumerate(c[:3] for c in candidates):
+        if j == i or other_group != group or other_cost > cost or other_payoff < payoff:
+            continue
+        if other_cost < cost or other_payoff > payoff or j < i:
+            return True
+    return False
+
+
+def brute_force_top(candidates, n=N):
+    """Non-dominated candidates (group, cost, payoff, key, return), best n by return"""
+    kept = [c for i, c in enumerate(candidates) if not dominated(candidates, i)]
+    kept.sort(key=lambda c: -c[4])
+    return kept[:n]
+
+
+def payoff_at(legs, prices):
+    """Expiration value of [(type, strike, quantity)] legs, one leg at a time"""
+    value = np.zeros_like(prices)
+    for option_type, strike, quantity in legs:
+        if option_type == 'call':
+            value += quantity * np.maximum(prices - strike, 0)
+        else:
+            value += quantity * np.maximum(strike - prices, 0)
+    return value
+
+
+def row_legs(row):
+    strategy = row['strategy']
+    if strategy == 'Bull Call Spread':
+        return [('call', row['long_strike'], 1), ('call', row['short_strike'], -1)], -row['debit']
+    if strategy == 'Bear Put Spread':
+        return [('put', row['long_strike'], 1), ('put', row['short_strike'], -1)], -row['debit']
+    if strategy == 'Credit Spread':
+        kind = row['option_type']
+        return [(kind, row['short_strike'], -1), (kind, row['long_strike'], 1)], row['credit']
+    if strategy == 'Long Strangle':
+        return [('put', row['put_strike'], 1), ('call', row['call_strike'], 1)], -row['debit']
+    if strategy == 'Iron Condor':
+        return [
+            ('put', row['put_long_strike'], 1), ('put', row['short_strike'], -1),
+            ('call', row['call_short_strike'], -1), ('call', row['call_long_strike'], 1),
+        ], row['credit']
+    raise AssertionError(strategy)
+
+
+@pytest.fixture(scope='module')
+def chain():
+    return make_chain()
+
+
+@pytest.fixture(scope='module')
+def results(chain):
+    return search_chain(chain, 'TEST', '2026-11-20', SPOT, 30)
+
+
+def test_every_leg_is_liquid(chain):
+    for option_type in ('call', 'put'):
+        strikes = liquid_legs(chain, option_type, SPOT)[0]
+        assert len(strikes) == (chain['option_type'] == option_type).sum()
+
+
+@pytest.mark.parametrize('option_type, stale_strike', [('call', 95.0), ('call', 105.0), ('put', 105.0), ('put', 110.0)])
+def test_single_stale_quote_only_drops_itself(option_type, stale_strike):
+    strikes = np.arange(90, 120.1, 5)
+    chain = make_chain(strikes)
+    chain = chain[chain['option_type'] == option_type].reset_index(drop=True)
+    # Too cheap: out of order with at least two quotes on the side where it should be dearer
+    stale = chain['strike'] == stale_strike
+    chain.loc[stale, ['bid', 'ask']] = [0.05, 0.07]
+    kept = liquid_legs(chain, option_type, SPOT)[0]
+    assert kept.tolist() == [k for k in chain['strike'] if k != stale_strike]
+
+
+def test_monotone_mask_keeps_a_longest_ordered_subsequence():
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        values = rng.integers(0, 6, rng.integers(0, 9)).astype(float)
+        mask = monotone_mask(values)
+        kept = values[mask]
+        assert (np.diff(kept) >= 0).all()
+        longest = max(
+            (r for r in range(len(values) + 1)
+             for subset in itertools.combinations(values.tolist(), r) if list(subset) == sorted(subset)),
+            default=0,
+        )
+        assert mask.sum() == longest
+
+
+def test_strike_pairs_match_enumeration():
+    rng = np.random.default_rng(1)
+    strikes = np.unique(rng.integers(50, 150, 60)).astype(float)
+    for max_width in (0.5, 5, 12.5, 200):
+        lower, upper = strike_pairs(strikes, max_width)
+        expected = [
+            (i, j) for i, j in itertools.combinations(range(len(strikes)), 2)
+            if 0 < strikes[j] - strikes[i] <= max_width
+        ]
+        assert sorted(zip(lower.tolist(), upper.tolist())) == expected
+
+
+def test_pareto_mask_matches_pairwise_dominance():
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        size = rng.integers(1, 40)
+        # Small integer ranges so equal costs, equal payoffs and exact duplicates all occur
+        group = rng.integers(0, 4, size)
+        cost = rng.integers(0, 6, size).astype(float)
+        payoff = rng.integers(-3, 6, size).astype(float)
+        candidates = list(zip(group, cost, payoff))
+        expected = [not dominated(candidates, i) for i in range(size)]
+        assert pareto_mask(group, cost, payoff).tolist() == expected
+
+
+def test_verticals_match_brute_force(chain):
+    calls, puts = quotes(chain, 'call'), quotes(chain, 'put')
+    max_width = SPOT * MAX_WIDTH_PCT
+    brute = {'Bull Call Spread': [], 'Bear Put Spread': [], ('Credit Spread', 'call'): [], ('Credit Spread', 'put'): []}
+    for (lo_k, lo_bid, lo_ask), (hi_k, hi_bid, hi_ask) in itertools.combinations(calls, 2):
+        if hi_k - lo_k > max_width:
+            continue
+        debit, credit = lo_ask - hi_bid, lo_bid - hi_ask
+        profit, risk = hi_k - lo_k - debit, hi_k - lo_k - credit
+        if debit >= MIN_PREMIUM and profit > 0:
+            brute['Bull Call Spread'].append((lo_k, debit, profit, (lo_k, hi_k), profit / debit))
+        if credit >= MIN_PREMIUM and risk > 0 and lo_k > SPOT:
+            brute[('Credit Spread', 'call')].append((lo_k, risk, credit, (lo_k, hi_k), credit / risk))
+    for (lo_k, lo_bid, lo_ask), (hi_k, hi_bid, hi_ask) in itertools.combinations(puts, 2):
+        if hi_k - lo_k > max_width:
+            continue
+        debit, credit = hi_ask - lo_bid, hi_bid - lo_ask
+        profit, risk = hi_k - lo_k - debit, hi_k - lo_k - credit
+        if debit >= MIN_PREMIUM and profit > 0:
+            brute['Bear Put Spread'].append((hi_k, debit, profit, (hi_k, lo_k), profit / debit))
+        if credit >= MIN_PREMIUM and risk > 0 and hi_k < SPOT:
+            brute[('Credit Spread', 'put')].append((hi_k, risk, credit, (hi_k, lo_k), credit / risk))
+
+    frames, _, _ = vertical_spreads(
+        liquid_legs(chain, 'call', SPOT), liquid_legs(chain, 'put', SPOT), SPOT, max_width, N
+    )
+    found = {}
+    for frame in frames:
+        key = frame['strategy'].iloc[0]
+        key = (key, frame['option_type'].iloc[0]) if key == 'Credit Spread' else key
+        found[key] = frame
+
+    for key, candidates in brute.items():
+        expected = brute_force_top(candidates)
+        frame = found[key]
+        assert len(expected) > 0
+        first = 'short_strike' if key[0] == 'Credit Spread' else 'long_strike'
+        second = 'long_strike' if key[0] == 'Credit Spread' else 'short_strike'
+        assert np.allclose(frame['return'], [c[4] * 100 for c in expected])
+        # Equal returns may come in either order
+        assert sorted(zip(frame[first], frame[second])) == sorted(c[3] for c in expected)
+
+
+def test_iron_condors_match_brute_force(chain):
+    max_width = SPOT * MAX_WIDTH_PCT
+    _, put_credit, call_credit = vertical_spreads(
+        liquid_legs(chain, 'call', SPOT), liquid_legs(chain, 'put', SPOT), SPOT, max_width, N
+    )
+    # Every pruned credit spread on both sides: the cross is exhaustive
+    condors = iron_condors(put_credit, call_credit, N, side_candidates=10 ** 6)
+
+    expected = []
+    for put_long, put_short, put_cr in zip(*put_credit[:3]):
+        for call_short, call_long, call_cr in zip(*call_credit[:3]):
+            legs = [('put', put_long, 1), ('put', put_short, -1), ('call', call_short, -1), ('call', call_long, 1)]
+            prices = np.linspace(0, SPOT * 3, 30001)
+            credit = put_cr + call_cr
+            risk = -(payoff_at(legs, prices) + credit).min()
+            if risk > 0:
+                expected.append(credit / risk * 100)
+    expected = sorted(expected, reverse=True)[:N]
+    assert np.allclose(condors['return'], expected)
+
+
+def test_max_profit_and_loss_match_expiration_payoff(results):
+    prices = np.linspace(0, SPOT * 3, 30001)
+    assert set(results['strategy']) == set(spread_search.STRATEGIES)
+    for _, row in results.iterrows():
+        legs, cash = row_legs(row)
+        pnl = payoff_at(legs, prices) + cash
+        assert -pnl.min() == pytest.approx(row['max_loss'], abs=1e-6), row['strategy']
+        if pd.notna(row['max_profit']):
+            assert pnl.max() == pytest.approx(row['max_profit'], abs=1e-6), row['strategy']
+
+
+def test_strangles_have_no_vertical_strikes(results):
+    strangles = results[results['strategy'] == 'Long Strangle']
+    assert len(strangles) > 0
+    assert strangles[['long_strike', 'short_strike']].isna().all().all()
+    assert (strangles['put_strike'] < SPOT).all() and (strangles['call_strike'] > SPOT).all()
+
+
+def test_strategy_filter_accepts_scanner_labels(chain, results):
+    selected = ["Bull Call Spreads", "Iron Condors"]
+    assert set(selected) <= set(ALL_STRATEGIES)
+    filtered = search_chain(chain, 'TEST', '2026-11-20', SPOT, 30, strategies=selected)
+    assert set(filtered['strategy']) == {'Bull Call Spread', 'Iron Condor'}
+    expected = results[results['strategy'].isin(['Bull Call Spread', 'Iron Condor'])]
+    assert len(filtered) == len(expected)
+
+    # Credit spreads come from both sides; filtering is per row, not per frame
+    credit = search_chain(chain, 'TEST', '2026-11-20', SPOT, 30, strategies=["Credit Spreads"])
+    assert set(credit['strategy']) == {'Credit Spread'}
+    assert set(credit['option_type']) == {'call', 'put'}
@@ -0,0 +1,89 @@
+"""
+Backtest scoring against the live squeeze_score, and the statistics leaving out ticker-days
+with no published metric (before a ticker's first report and inside the reporting lag)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from squeeze_backtest import (
+    METRICS, MISSING_SCORE, REPORTING_LAG, TOP_BUCKET, Panel, ReturnStats, bucket_stats,
+    forward_returns, mean_information_coefficient, score_panel, scored_mask, summarize,
+)
+from squeeze_scoring import squeeze_score
+
+TICKERS = ['AAA', 'BBB', 'CCC', 'DDD']
+
+
+def history(days=60, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2026-01-05', periods=days)
+    rows = []
+    for t, ticker in enumerate(TICKERS):
+        close = 10 * np.exp(np.cumsum(rng.normal(0, 0.03, days)))
+        for d, date in enumerate(dates):
+            row = {'date': date, 'ticker': ticker, 'close': close[d]}
+            for metric in METRICS:
+                # DDD only starts reporting on day 20; CCC never reports utilization
+                missing = (ticker == 'DDD' and d < 20) or (ticker == 'CCC' and metric == 'utilization')
+                row[metric] = np.nan if missing else rng.uniform(0, 40 if metric != 'utilization' else 100)
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope='module')
+def panel():
+    return Panel.from_history(history())
+
+
+def test_scores_match_the_live_score(panel):
+    score = score_panel(panel)
+    scored = scored_mask(panel)
+    for d in range(panel.shape[0]):
+        for t in range(panel.shape[1]):
+            if not scored[d, t]:
+                assert score[d, t] == MISSING_SCORE
+                continue
+            metrics = {metric: panel.metrics[metric][d, t] for metric in METRICS}
+            metrics = {metric: float(value) for metric, value in metrics.items() if not np.isnan(value)}
+            assert score[d, t] == squeeze_score(metrics)
+
+
+def test_reporting_lag_leaves_the_first_days_unscored(panel):
+    score = score_panel(panel)
+    lag = min(REPORTING_LAG.values())
+    assert (score[:lag] == MISSING_SCORE).all()
+    ddd = list(panel.tickers).index('DDD')
+    assert (score[:20 + lag, ddd] == MISSING_SCORE).all()
+    assert (score[20 + lag:, ddd] >= 0).all()
+
+
+def test_statistics_leave_out_unscored_days(panel):
+    score = score_panel(panel)
+    returns = forward_returns(panel.close, 5)
+    scored = scored_mask(panel)
+    usable = np.isfinite(returns) & scored
+
+    table = bucket_stats(score, returns)
+    assert table['observations'].sum() == usable.sum()
+
+    stats = ReturnStats(returns, scored)
+    row = summarize(score, {5: stats})
+    top = usable & (score >= TOP_BUCKET)
+    rest = usable & (score < TOP_BUCKET)
+    expected_spread = returns[top].astype(np.float64).mean() - returns[rest].astype(np.float64).mean()
+    assert row['spread_5d'] == pytest.approx(expected_spread, rel=1e-4)
+
+    ics = []
+    for d in range(panel.shape[0]):
+        cols = usable[d]
+        if cols.sum() > 2 and np.std(score[d, cols]) > 0:
+            ics.append(np.corrcoef(score[d, cols], returns[d, cols])[0, 1])
+    assert row['ic_5d'] == pytest.approx(np.mean(ics), rel=1e-4)
+
+
+def test_ic_rejects_stats_that_include_unscored_days(panel):
+    returns = forward_returns(panel.close, 1)
+    with pytest.raises(ValueError):
+        mean_information_coefficient(score_panel(panel), ReturnStats(returns))
@@ -0,0 +1,151 @@
+"""
+parse_query and the indexed screens against a plain filter/sort over the same rows
+Includes the store's incremental merge: after every update its snapshot must screen exactly
+like a snapshot built from scratch over the store's rows.
+"""
+
+import random
+
+import pytest
+
+from api.squeeze_query import NUMERIC_FIELDS, SnapshotStore, SqueezeSnapshot, parse_query
+
+TYPES = ['High Squeeze Risk', 'Moderate Squeeze Risk', 'Low Squeeze Risk']
+
+
+def make_row(rng, ticker):
+    maybe = lambda value: None if rng.random() < 0.1 else value
+    return {
+        'ticker': ticker,
+        'squeeze_score': maybe(rng.randrange(0, 101)),
+        'squeeze_type': rng.choice(TYPES),
+        'data_source': rng.choice(['live_api', 'mock_data']),
+        'current_price': maybe(round(rng.uniform(1, 500), 2)),
+        'price_change': maybe(round(rng.uniform(-10, 10), 2)),
+        'volume': maybe(rng.randrange(0, 10 ** 6)),
+        'ortex_data': {
+            'short_interest': maybe(round(rng.uniform(0, 60), 1)),
+            'utilization': maybe(round(rng.uniform(0, 100), 1)),
+            'cost_to_borrow': maybe(round(rng.uniform(0, 200), 1)),
+            'days_to_cover': maybe(round(rng.uniform(0, 15), 1)),
+        },
+    }
+
+
+def brute_screen(rows, ranges, categories, sort_by='squeeze_score', descending=True, limit=None):
+    def keep(row):
+        for field, (lo, hi) in ranges.items():
+            value = NUMERIC_FIELDS[field](row)
+            if value is None or (lo is not None and value < lo) or (hi is not None and value > hi):
+                return False
+        return all(row.get(field) in wanted for field, wanted in categories.items())
+
+    kept = [row for row in rows if keep(row)]
+    valued = [row for row in kept if NUMERIC_FIELDS[sort_by](row) is not None]
+    valued.sort(key=lambda row: NUMERIC_FIELDS[sort_by](row), reverse=descending)
+    kept = valued + [row for row in kept if NUMERIC_FIELDS[sort_by](row) is None]
+    return kept[:limit] if limit is not None else kept
+
+
+QUERIES = [
+    {},
+    {'sort_by': 'price_change', 'descending': False},
+    {'min_score': 40},
+    {'filters': {'short_interest': {'min': 20}, 'utilization': {'min': 50, 'max': 90}}},
+    {'filters': {'squeeze_type': ['High Squeeze Risk']}, 'sort_by': 'cost_to_borrow'},
+    {'min_score': 30, 'filters': {'days_to_cover': {'max': 5}, 'data_source': 'live_api'}, 'limit': 7},
+    {'filters': {'volume': {'min': 10 ** 5}}, 'sort_by': 'volume', 'limit': 3},
+]
+
+
+def sort_values(rows, sort_by):
+    return [NUMERIC_FIELDS[sort_by](row) for row in rows]
+
+
+def assert_same_screen(snapshot, rows, query):
+    ranges, categories, sort_by, descending, limit = parse_query(query)
+    found = snapshot.screen(ranges, categories, sort_by, descending, limit=limit)
+    expected = brute_screen(rows, ranges, categories, sort_by, descending, limit=limit)
+    # Ties in the sort field may come in either order, so compare the sort values and the full set
+    assert sort_values(found, sort_by) == sort_values(expected, sort_by)
+    if limit is None:
+        assert sorted(row['ticker'] for row in found) == sorted(row['ticker'] for row in expected)
+
+
+def test_parse_query():
+    ranges, categories, sort_by, descending, limit = parse_query({
+        'min_score': '20', 'filters': {'short_interest': {'min': 15, 'max': 40}, 'squeeze_type': 'High Squeeze Risk'},
+        'sort_by': 'utilization', 'descending': False, 'limit': 5,
+    })
+    assert ranges == {'squeeze_score': (20.0, None), 'short_interest': (15.0, 40.0)}
+    assert categories == {'squeeze_type': {'High Squeeze Risk'}}
+    assert (sort_by, descending, limit) == ('utilization', False, 5)
+    assert parse_query({}) == ({}, {}, 'squeeze_score', True, None)
+    assert parse_query({'min_score': None, 'filters': {'volume': {'max': None}}})[0] == {'volume': (None, None)}
+
+
+@pytest.mark.parametrize('query', [
+    {'filters': {'float': {'min': 1}}},
+    {'filters': {'short_interest': 20}},
+    {'filters': {'short_interest': {'min': 30, 'max': 10}}},
+    {'sort_by': 'squeeze_type'},
+    {'limit': 'ten'},
+    {'limit': 0},
+    {'limit': -3},
+    {'limit': [1]},
+    {'limit': True},
+    {'filters': [1]},
+    {'filters': {'squeeze_type': [['a']]}},
+    {'filters': {'squeeze_type': 5}},
+    {'filters': {'volume': {'min': 'x'}}},
+    {'filters': {'volume': {'above': 5}}},
+    {'min_score': 'abc'},
+    {'min_score': [60]},
+    {'min_score': 'nan'},
+    {'sort_by': ['volume']},
+    {'descending': 'false'},
+    [],
+    'min_score',
+])
+def test_parse_query_rejects(query):
+    with pytest.raises(ValueError):
+        parse_query(query)
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_screen_matches_brute_force(query):
+    rng = random.Random(7)
+    rows = [make_row(rng, f'T{i}') for i in range(300)]
+    assert_same_screen(SqueezeSnapshot(rows), rows, query)
+
+
+def test_ascending_screen():
+    rng = random.Random(3)
+    rows = [make_row(rng, f'T{i}') for i in range(100)]
+    ranges, categories, _, _, _ = parse_query({'min_score': 50})
+    found = SqueezeSnapshot(rows).screen(ranges, categories, descending=False)
+    expected = brute_screen(rows, ranges, categories, descending=False)
+    assert sort_values(found, 'squeeze_score') == sort_values(expected, 'squeeze_score')
+
+
+def test_store_merges_updates_and_evictions():
+    rng = random.Random(11)
+    store = SnapshotStore(max_rows=60)
+    for _ in range(100):
+        # Repeats within a scan, rescans of known tickers and new tickers that evict the oldest
+        batch = [make_row(rng, f'T{rng.randrange(120)}') for _ in range(rng.randrange(1, 20))]
+        snapshot = store.update(batch)
+        rows = list(store._rows.values())
+        assert len(snapshot) == len(rows) <= 60
+        for query in QUERIES:
+            assert_same_screen(snapshot, rows, query)
+
+
+def test_store_update_leaves_previous_snapshot_intact():
+    rng = random.Random(5)
+    store = SnapshotStore()
+    first = store.update([make_row(rng, f'T{i}') for i in range(50)])
+    before = [row['ticker'] for row in first.screen()]
+    store.update([make_row(rng, f'T{i}') for i in range(25, 75)])
+    assert [row['ticker'] for row in first.screen()] == before
+    assert len(first) == 50 and len(store.snapshot) == 75
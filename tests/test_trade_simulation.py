@@ -0,0 +1,72 @@
+"""
+simulate_trades against closed-form Black-Scholes probabilities and expiration payoffs
+With zero drift the terminal price is lognormal, so a single leg's probability of finishing
+beyond its breakeven is known exactly; the simulated pop has to land within sampling error.
+"""
+
+from math import erf, log, sqrt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_simulation import RISK_COLUMNS, annual_volatility, simulate_trades
+
+SPOT = 100.0
+
+
+def prob_above(level, vol, dte, spot=SPOT):
+    """P(S_T > level) for a driftless lognormal price"""
+    t = dte / 365
+    d2 = (log(spot / level) - vol ** 2 * t / 2) / (vol * sqrt(t))
+    return (1 + erf(d2 / sqrt(2))) / 2
+
+
+def trade(strategy, **fields):
+    return {'ticker': 'TEST', 'strategy': strategy, 'current_price': SPOT, 'dte': 30, 'iv': 30.0, **fields}
+
+
+def test_single_leg_pop_matches_lognormal_probability():
+    results = pd.DataFrame([
+        trade('Long Call', strike=105.0, premium=2.0),
+        trade('Long Put', strike=95.0, premium=1.5),
+        trade('Cash-Secured Put', strike=90.0, premium=0.8, iv=45.0),
+    ])
+    risk = simulate_trades(results, workers=1)
+    expected = [
+        prob_above(107.0, 0.30, 30),
+        1 - prob_above(93.5, 0.30, 30),
+        prob_above(89.2, 0.45, 30),
+    ]
+    assert np.allclose(risk['pop'], np.array(expected) * 100, atol=1.0)
+
+
+def test_expected_value_and_tail_of_a_defined_risk_spread():
+    results = pd.DataFrame([trade('Bull Call Spread', long_strike=100.0, short_strike=110.0, debit=4.0)])
+    risk = simulate_trades(results, workers=1).iloc[0]
+    # Worst case loses the debit, best case keeps width - debit
+    assert risk['tail_loss'] == pytest.approx(4.0, abs=1e-4)
+    assert -4.0 <= risk['expected_value'] <= 6.0
+    assert risk['risk_adjusted'] == pytest.approx(risk['expected_value'] / risk['tail_loss'], rel=1e-5)
+
+
+def test_unsupported_rows_get_nan_and_keep_the_index():
+    results = pd.DataFrame(
+        [trade('Long Call', strike=100.0, premium=3.0), trade('Butterfly', strike=100.0, premium=1.0)],
+        index=[10, 20],
+    )
+    risk = simulate_trades(results, workers=1)
+    assert list(risk.columns) == RISK_COLUMNS
+    assert list(risk.index) == [10, 20]
+    assert risk.loc[10].notna().all() and risk.loc[20].isna().all()
+
+
+def test_results_are_reproducible_with_a_seed():
+    results = pd.DataFrame([trade('Long Straddle', strike=100.0, premium=7.0)])
+    first = simulate_trades(results, workers=1, seed=3)
+    assert first.equals(simulate_trades(results, workers=1, seed=3))
+
+
+def test_annual_volatility_reads_percent():
+    results = pd.DataFrame({'ticker': ['A', 'A', 'B', 'C'], 'iv': [4.0, np.nan, 80.0, None]})
+    assert np.allclose(annual_volatility(results, default=0.3), [0.04, 0.04, 0.8, 0.3])
@@ -0,0 +1,63 @@
+"""
+Build the symbol master file (data/symbols.txt) used to validate tickers and serve autocomplete
+Reads Nasdaq Trader's symbol directory (all US-listed securities, pipe-delimited) from the web
+or a downloaded copy, drops test issues and writes sorted "SYMBOL|Name" lines.
+Run with: python tools/build_symbol_master.py [--source nasdaqtraded.txt] [--output data/symbols.txt]
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from symbol_master import DEFAULT_PATH, normalize_symbol  # noqa: E402
+
+NASDAQ_TRADED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqtraded.txt"
+
+
+def read_source(source):
+    if source.startswith(('http://', 'https://')):
+        req = urllib.request.Request(source, headers={'User-Agent': 'Ultimate-Squeeze-Scanner/1.0'})
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return response.read().decode('utf-8', errors='replace')
+    with open(source, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def parse_symbols(text):
+    """{symbol: name} from a Nasdaq Trader symbol directory file"""
+    symbols = {}
+    for row in csv.DictReader(io.StringIO(text), delimiter='|'):
+        if row.get('Test Issue') == 'Y':
+            continue
+        symbol = normalize_symbol(row.get('Symbol') or '')  # Footer ("File Creation Time") is rejected here
+        if symbol:
+            symbols[symbol] = (row.get('Security Name') or '').replace('|', ' ').strip()
+    return symbols
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the ticker symbol master")
+    parser.add_argument('--source', default=NASDAQ_TRADED_URL, help="URL or path of nasdaqtraded.txt")
+    parser.add_argument('--output', default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    symbols = parse_symbols(read_source(args.source))
+    if not symbols:
+        raise SystemExit(f"No symbols parsed from {args.source}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for symbol in sorted(symbols):
+            f.write(f"{symbol}|{symbols[symbol]}\n")
+    print(f"Wrote {len(symbols)} symbols to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
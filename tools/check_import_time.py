@@ -0,0 +1,93 @@
+"""
+Cold-start import budget for the Streamlit app
+Imports everything app.py imports at module level in a fresh interpreter, fails if that takes
+longer than the budget or if a module that should stay deferred (plotly, scipy, ...) is pulled in.
+Run with: python tools/check_import_time.py [--budget 2.5] [--runs 5]
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, 'app.py')
+DEFAULT_BUDGET = float(os.environ.get('STARTUP_IMPORT_BUDGET', 2.5))  # seconds
+
+# Modules that must only be imported by the views that use them. Some frameworks pull a few
+# of these in themselves, so only imports beyond what the framework baseline loads count.
+DEFERRED_MODULES = ['plotly', 'scipy', 'pyarrow', 'options_scanner', 'charts', 'greeks_engine']
+FRAMEWORK_BASELINE = "import streamlit\nimport pandas\nimport numpy"
+
+
+def startup_imports(path=APP_PATH):
+    """Source of every top-level import statement in app.py"""
+    with open(path) as f:
+        source = f.read()
+    tree = ast.parse(source)
+    return '\n'.join(
+        ast.get_source_segment(source, node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def run_imports(code, importtime=False):
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    started = time.perf_counter()
+    proc = subprocess.run(args, cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise SystemExit(f"Startup imports failed:\n{proc.stderr}")
+    return elapsed, proc
+
+
+def slowest_imports(importtime_output, limit=10):
+    """Top-level packages by cumulative import time from -X importtime output"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        if not name.startswith('  '):  # Nested imports are indented further
+            rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check app.py cold-start import time")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="Seconds allowed")
+    parser.add_argument('--runs', type=int, default=3, help="Best of N fresh interpreters")
+    args = parser.parse_args(argv)
+
+    code = startup_imports()
+    timings = [run_imports(code)[0] for _ in range(max(1, args.runs))]
+    best = min(timings)
+
+    _, proc = run_imports(code, importtime=True)
+    print("Slowest startup imports (cumulative):")
+    for cumulative_us, name in slowest_imports(proc.stderr):
+        print(f"  {cumulative_us / 1e6:7.3f}s  {name}")
+
+    probe = "\nimport sys\nprint(','.join(m for m in %r if m in sys.modules))" % DEFERRED_MODULES
+    baseline = set(run_imports(FRAMEWORK_BASELINE + probe)[1].stdout.strip().split(','))
+    loaded = run_imports(code + probe)[1].stdout.strip().split(',')
+    leaked = [m for m in loaded if m and m not in baseline]
+
+    print(f"Startup imports: best {best:.3f}s over {len(timings)} runs (budget {args.budget:.3f}s)")
+    failed = False
+    if best > args.budget:
+        print(f"FAIL: startup imports exceed budget by {best - args.budget:.3f}s")
+        failed = True
+    if leaked:
+        print(f"FAIL: deferred modules imported at startup: {', '.join(leaked)}")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Monte Carlo probability of profit for scanned trades
+Every result row is decomposed into option/stock legs (trade_legs), and expiration prices
+are simulated for all trades at once: lognormal terminal prices driven by each trade's
+implied volatility, one seeded set of antithetic normal draws shared by every trade (common
+random numbers keep the ranking stable between reruns), and payoffs evaluated as
+(trades x paths) arrays in chunks. Large result sets are split across a process pool.
+
+Outputs per trade (per share, like premium/max_profit): pop (% of paths that finish
+profitable), expected_value, tail_loss (average loss over the worst 5% of paths) and
+risk_adjusted (expected_value / tail_loss).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from results_aggregates import store_results
+from scan_config import normalize_strategy
+
+PATHS = 20000
+SEED = 7
+TAIL = 0.05  # tail_loss averages the worst 5% of paths
+DEFAULT_VOLATILITY = 0.30  # when neither the trade nor its ticker has an IV
+CHUNK_TRADES = 128  # trades per (trades x paths) block; bounds memory to ~20 MB per block
+PARALLEL_MIN_TRADES = 5000
+WORKERS = int(os.environ.get('SIMULATION_WORKERS', os.cpu_count() or 1))
+
+MAX_LEGS = 4
+CALL, PUT, STOCK = 1, 2, 3
+RISK_COLUMNS = ['pop', 'expected_value', 'tail_loss', 'risk_adjusted']
+
+
+def _value(trade, *names):
+    """First present, non-NaN field among names"""
+    for name in names:
+        value = trade.get(name)
+        if value is not None and pd.notna(value):
+            return float(value)
+    return None
+
+
+def trade_legs(trade):
+    """
+    ([(kind, strike, quantity)], net cash per share) for a result row, or None when the
+    strategy or its strikes aren't known. Cash is positive for credits; STOCK legs use
+    the entry price as their strike.
+    """
+    strategy = normalize_strategy(trade.get('strategy', ''))
+    strike = _value(trade, 'strike')
+    long_strike = _value(trade, 'long_strike')
+    short_strike = _value(trade, 'short_strike')
+    debit = _value(trade, 'debit', 'premium')
+    credit = _value(trade, 'credit', 'premium')
+
+    if strategy in ('long call', 'long put') and strike is not None and debit is not None:
+        return [(CALL if strategy == 'long call' else PUT, strike, 1)], -debit
+    if strategy in ('short call', 'short put', 'cash-secured put') and strike is not None and credit is not None:
+        return [(CALL if strategy == 'short call' else PUT, strike, -1)], credit
+    if strategy == 'covered call' and strike is not None and credit is not None:
+        price = _value(trade, 'current_price')
+        if price is None:
+            return None
+        return [(STOCK, price, 1), (CALL, strike, -1)], credit
+    if strategy == 'long straddle' and strike is not None and debit is not None:
+        return [(CALL, strike, 1), (PUT, strike, 1)], -debit
+    if strategy == 'long strangle' and debit is not None:
+        put_strike = _value(trade, 'put_strike')
+        call_strike = _value(trade, 'call_strike')
+        if put_strike is None or call_strike is None:
+            return None
+        return [(PUT, put_strike, 1), (CALL, call_strike, 1)], -debit
+
+    if long_strike is None or short_strike is None:
+        return None
+    if strategy == 'bull call spread' and debit is not None:
+        return [(CALL, long_strike, 1), (CALL, short_strike, -1)], -debit
+    if strategy == 'bear put spread' and debit is not None:
+        return [(PUT, long_strike, 1), (PUT, short_strike, -1)], -debit
+    if strategy == 'credit spread' and credit is not None:
+        option_type = str(trade.get('option_type') or '').lower()
+        if option_type not in ('call', 'put'):
+            # Bear call spreads protect above the short strike, bull put spreads below it
+            option_type = 'call' if long_strike > short_strike else 'put'
+        kind = CALL if option_type == 'call' else PUT
+        return [(kind, short_strike, -1), (kind, long_strike, 1)], credit
+    if strategy == 'iron condor' and credit is not None:
+        wings = [_value(trade, name) for name in ('put_long_strike', 'call_short_strike', 'call_long_strike')]
+        if None in wings:
+            return None
+        put_long, call_short, call_long = wings
+        return [(PUT, put_long, 1), (PUT, short_strike, -1), (CALL, call_short, -1), (CALL, call_long, 1)], credit
+    return None
+
+
+def leg_arrays(results):
+    """(kinds, strikes, quantities) as (trades x MAX_LEGS) arrays plus cash and a supported mask"""
+    n = len(results)
+    kinds = np.zeros((n, MAX_LEGS), dtype=np.int8)
+    strikes = np.zeros((n, MAX_LEGS))
+    quantities = np.zeros((n, MAX_LEGS))
+    cash = np.zeros(n)
+    supported = np.zeros(n, dtype=bool)
+    for i, trade in enumerate(results.to_dict('records')):
+        decomposed = trade_legs(trade)
+        if decomposed is None:
+            continue
+        legs, cash[i] = decomposed
+        for j, (kind, strike, quantity) in enumerate(legs):
+            kinds[i, j], strikes[i, j], quantities[i, j] = kind, strike, quantity
+        supported[i] = True
+    return kinds, strikes, quantities, cash, supported
+
+
+def leg_payoff(kinds, strikes, quantities, prices):
+    """
+    Expiration value of the legs at each price. Leg arrays carry the legs on their last axis
+    and broadcast against prices. With max(K - S, 0) = max(S - K, 0) - (S - K) every leg is a
+    call term plus a linear term, so each leg costs one pass over the prices.
+    """
+    calls = np.where(kinds == STOCK, 0.0, quantities)
+    linear = np.where(kinds == PUT, -quantities, np.where(kinds == STOCK, quantities, 0.0))
+    value = linear.sum(axis=-1) * prices - (linear * strikes).sum(axis=-1)
+    for j in range(np.shape(kinds)[-1]):
+        weight = calls[..., j]
+        if np.any(weight):
+            value = value + weight * np.maximum(prices - strikes[..., j], 0)
+    return value
+
+
+def annual_volatility(results, default=DEFAULT_VOLATILITY):
+    """Per-trade volatility (fraction): the trade's IV in %, else its ticker's median IV, else the default"""
+    if 'iv' not in results.columns:
+        return np.full(len(results), default)
+    # IV is in percent throughout the scanner (provider values and fill_chain_greeks alike)
+    iv = pd.to_numeric(results['iv'], errors='coerce').astype(np.float64) / 100
+    iv = iv.where(iv > 0)
+    ticker_iv = iv.groupby(results['ticker'].astype(str).to_numpy()).transform('median')
+    return iv.fillna(ticker_iv).fillna(default).to_numpy()
+
+
+def normal_draws(paths=PATHS, seed=SEED):
+    """Antithetic standard normals: the same draws for every trade and every worker"""
+    half = np.random.default_rng(seed).standard_normal((paths + 1) // 2)
+    return np.concatenate([half, -half])[:paths]
+
+
+def _simulate_block(spot, volatility, years, kinds, strikes, quantities, cash, draws, drift):
+    """(pop, expected_value, tail_loss) for one block of trades"""
+    sigma_t = volatility * np.sqrt(years)
+    log_drift = (drift - volatility ** 2 / 2) * years
+    prices = spot[:, None] * np.exp(log_drift[:, None] + sigma_t[:, None] * draws[None, :])
+    pnl = leg_payoff(kinds[:, None, :], strikes[:, None, :], quantities[:, None, :], prices) + cash[:, None]
+
+    tail_paths = max(1, int(len(draws) * TAIL))
+    worst = np.partition(pnl, tail_paths - 1, axis=1)[:, :tail_paths]
+    return np.column_stack([
+        (pnl > 0).mean(axis=1) * 100,
+        pnl.mean(axis=1),
+        np.maximum(-worst.mean(axis=1), 0),
+    ])
+
+
+def _simulate_chunk(args):
+    """Process-pool entry point: regenerates the shared draws, then runs the chunk block by block"""
+    arrays, paths, seed, drift = args
+    draws = normal_draws(paths, seed)
+    blocks = [
+        _simulate_block(*(a[start:start + CHUNK_TRADES] for a in arrays), draws, drift)
+        for start in range(0, len(arrays[0]), CHUNK_TRADES)
+    ]
+    return np.vstack(blocks) if blocks else np.empty((0, 3))
+
+
+def simulate_trades(results, paths=PATHS, seed=SEED, drift=0.0, workers=WORKERS):
+    """
+    Risk columns (RISK_COLUMNS) for every row of a results frame, index-aligned with it.
+    Rows whose legs can't be reconstructed get NaN. drift is the annual expected return
+    of the underlying (0 = risk-neutral with no rates).
+    """
+    kinds, strikes, quantities, cash, supported = leg_arrays(results)
+    risk = np.full((len(results), 3), np.nan)
+    rows = np.flatnonzero(supported)
+    if len(rows):
+        arrays = (
+            pd.to_numeric(results['current_price'], errors='coerce').to_numpy(dtype=np.float64)[rows],
+            annual_volatility(results)[rows],
+            np.clip(pd.to_numeric(results['dte'], errors='coerce').to_numpy(dtype=np.float64)[rows], 0, None) / 365,
+            kinds[rows], strikes[rows], quantities[rows], cash[rows],
+        )
+        if workers > 1 and len(rows) >= PARALLEL_MIN_TRADES:
+            bounds = np.linspace(0, len(rows), workers + 1, dtype=int)
+            chunks = [(tuple(a[lo:hi] for a in arrays), paths, seed, drift) for lo, hi in zip(bounds[:-1], bounds[1:])]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                risk[rows] = np.vstack(list(pool.map(_simulate_chunk, chunks)))
+        else:
+            risk[rows] = _simulate_chunk((arrays, paths, seed, drift))
+
+    frame = pd.DataFrame(risk[:, :3], columns=RISK_COLUMNS[:3], index=results.index)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frame['risk_adjusted'] = frame['expected_value'] / frame['tail_loss'].where(frame['tail_loss'] > 0)
+    return frame.astype(np.float32)
+
+
+def add_trade_risk(session_state):
+    """
+    Add the risk columns to the stored results once per scan result (they're dropped
+    whenever a new result is stored). The frame is stored through store_results, so its
+    fingerprint, aggregates, pager and exports all describe the frame with the columns.
+    """
+    results = session_state.results
+    if results.empty or 'pop' in results.columns:
+        return results
+    risk = simulate_trades(results)
+    results = results.assign(**{column: risk[column].to_numpy() for column in RISK_COLUMNS})
+    store_results(session_state, results)
+    return results